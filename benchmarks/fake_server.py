@@ -0,0 +1,75 @@
+"""
+Measure the client side cost of the API against the in-process fake server
+of :mod:`pypulseaudio.fake`, without requiring pulseaudio: the latency of a
+single call, list throughput at 10, 100 and 1000 sinks, and the memory
+allocated whilst listing.  With the default zero server latency the figures
+are the library's own overhead.
+
+Usage::
+
+    python benchmarks/fake_server.py [n_calls] [latency_ms]
+"""
+from __future__ import print_function, unicode_literals
+
+import gc
+import sys
+import timeit
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.fake import FakeBackend
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def connect(n_sinks, latency, **options):
+    backend = FakeBackend(n_sinks=n_sinks, latency=latency)
+    pulse = PulseAudio('benchmark', backend=backend, **options)
+    pulse.connect()
+    return pulse
+
+
+def measure_memory(f):
+    if (tracemalloc is None):
+        return None
+    gc.collect()
+    tracemalloc.start()
+    f()
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) / 1000.0 if len(sys.argv) > 2 else 0.0
+    print('server latency %.3f ms' % (latency * 1000))
+    print()
+    print('%-10s %14s' % ('', 'us/call'))
+    for threaded in (False, True):
+        pulse = connect(10, latency, threaded=threaded)
+        seconds = min(timeit.repeat(lambda: pulse.get_sink_info_by_index(0),
+                                    number=n, repeat=3))
+        print('%-10s %14.1f' % ('threaded' if threaded else 'plain',
+                                seconds * 1000000 / n))
+        pulse.disconnect()
+    print()
+    print('%-10s %-8s %14s %14s %14s' % ('sinks', '', 'list (ms)',
+                                         'sinks/s', 'peak (KiB)'))
+    for n_sinks in (10, 100, 1000):
+        for records in (False, True):
+            pulse = connect(n_sinks, latency, records=records)
+            f = pulse.get_sink_info_list
+            seconds = min(timeit.repeat(f, number=1, repeat=5))
+            memory = measure_memory(f)
+            print('%-10d %-8s %14.2f %14.0f %14s' %
+                  (n_sinks, 'record' if records else 'dict', seconds * 1000,
+                   n_sinks / seconds,
+                   '%.1f' % (memory / 1024.0) if memory else 'n/a'))
+            pulse.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare time and memory taken to decode and hold introspection results as
+per-entry dicts versus the compact records of :mod:`pypulseaudio.records`.
+The info structures decoded are those of the in-process fake server of
+:mod:`pypulseaudio.fake`, hence pulseaudio is not required.
+
+Usage::
+
+    python benchmarks/records.py [n_entries]
+"""
+from __future__ import print_function, unicode_literals
+
+import gc
+import sys
+import timeit
+
+from pypulseaudio import dict_decoders
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.records import record_decoders
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def make_structs(n):
+    """
+    Build n sink, card and module info structures as held by the fake
+    server, with 5 profiles and 3 ports per card and 6 module arguments.
+    """
+    backend = FakeBackend(n_sinks=n, n_sources=0, n_modules=0)
+    for i in range(n):
+        backend.add('module', name='module-null-sink',
+                    argument=('sink_name=null%d rate=48000 channels=2 format=s16le '
+                              'channel_map=front-left,front-right '
+                              'sink_properties=device.description=Null%d' % (i, i)))
+    return dict((facility, list(backend.objects[facility].values()))
+                for facility in ('sink', 'card', 'module'))
+
+
+def decode_all(decoders, structs):
+    return dict((facility, [decoders[facility](i) for i in structs[facility]])
+                for facility in structs)
+
+
+def measure_memory(decoders, structs):
+    if (tracemalloc is None):
+        return None
+    gc.collect()
+    tracemalloc.start()
+    held = decode_all(decoders, structs)
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    structs = make_structs(n)
+    print('%d sinks, cards and modules' % n)
+    print('%-8s %14s %14s' % ('', 'decode (ms)', 'held (KiB)'))
+    for (name, decoders) in (('dict', dict_decoders), ('record', record_decoders)):
+        seconds = min(timeit.repeat(lambda: decode_all(decoders, structs),
+                                    number=1, repeat=5))
+        memory = measure_memory(decoders, structs)
+        print('%-8s %14.2f %14s' % (name, seconds * 1000,
+                                    '%.1f' % (memory / 1024.0) if memory else 'n/a'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure the start-up cost of short-lived invocations, each run as a fresh
+python process: importing pypulseaudio alone, importing, connecting and
+calling get_server_info(), and making the same call through a warm
+:mod:`pypulseaudio.helper` process instead.  With ``--fake`` the in-process
+fake server of :mod:`pypulseaudio.fake` stands in for libpulse and the
+pulseaudio server, which excludes their own costs.
+
+Each invocation reports whether it loaded the libpulse bindings.  Where
+they are installed, importing them alone is also timed: the cost which
+``import pypulseaudio`` paid up front before the bindings were imported
+lazily, and which invocations not loading them are spared.
+
+Usage::
+
+    python benchmarks/startup.py [--fake] [n_runs]
+"""
+from __future__ import print_function, unicode_literals
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT = 'import pypulseaudio'
+
+BINDINGS = 'import pulseaudio.lib_pulseaudio'
+
+# Appended to each invocation, reporting whether the bindings were loaded
+LOADED = '''
+import sys
+sys.stdout.write('%d' % ('pulseaudio.lib_pulseaudio' in sys.modules))
+'''
+
+DIRECT = '''
+from pypulseaudio import PulseAudio
+%s
+pulse = PulseAudio('benchmark'%s)
+pulse.connect()
+pulse.get_server_info()
+'''
+
+HELPER = '''
+from pypulseaudio.helper import HelperClient
+HelperClient(%r).get_server_info()
+'''
+
+SERVE = '''
+from pypulseaudio.helper import HelperServer
+%s
+HelperServer(%r%s).serve_forever()
+'''
+
+
+def run(code, n):
+    """
+    Best wall time in seconds of running the code in a new interpreter,
+    and whether it loaded the libpulse bindings.
+    """
+    best = None
+    for i in range(n):
+        start = time.time()
+        output = subprocess.check_output([sys.executable, '-c', code + LOADED])
+        seconds = time.time() - start
+        best = seconds if best is None else min(best, seconds)
+    return (best, output.endswith(b'1'))
+
+
+def available(code):
+    """
+    Whether the code runs without error in a new interpreter.
+    """
+    with open(os.devnull, 'w') as null:
+        return subprocess.call([sys.executable, '-c', code],
+                               stdout=null, stderr=null) == 0
+
+
+def main():
+    args = sys.argv[1:]
+    fake = '--fake' in args
+    args = [i for i in args if i != '--fake']
+    n = int(args[0]) if args else 10
+    setup = 'from pypulseaudio.fake import FakeBackend' if fake else ''
+    option = ', backend=FakeBackend()' if fake else ''
+    path = os.path.join(tempfile.mkdtemp(), 'helper')
+    server = subprocess.Popen([sys.executable, '-c', SERVE % (setup, path, option)])
+    try:
+        while (not os.path.exists(path)):
+            if (server.poll() is not None):
+                raise Exception('Helper failed to start')
+            time.sleep(0.01)
+        (baseline, loaded) = run('pass', n)
+        print('%s, best of %d runs' % ('fake server' if fake else 'libpulse', n))
+        print()
+        print('%-28s %12s %12s %10s' % ('', 'wall (ms)', 'less python', 'bindings'))
+        cases = [('python', 'pass'),
+                 ('import', IMPORT),
+                 ('import, connect and call', DIRECT % (setup, option)),
+                 ('call through helper', HELPER % path)]
+        if (available(BINDINGS)):
+            cases.insert(2, ('import bindings alone', BINDINGS))
+        for (name, code) in cases:
+            (seconds, loaded) = run(code, n)
+            print('%-28s %12.1f %12.1f %10s' % (name, seconds * 1000,
+                                                (seconds - baseline) * 1000,
+                                                'loaded' if loaded else '-'))
+    finally:
+        server.terminate()
+        server.wait()
+        if (os.path.exists(path)):
+            os.unlink(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Measure the per-call cost of obtaining the ctypes callback thunk of a
+getter, allocating a new thunk for every call, as done previously, versus
+looking up the instance's shared thunk, by timing whole getter calls
+against the in-process fake server of :mod:`pypulseaudio.fake`.
+
+The fake server passes python callables straight through in place of
+thunks.  Here a real ctypes thunk, of the same signature as libpulse's
+pa_sink_info_cb_t, is allocated alongside each callable such that its
+cost is counted as with libpulse.
+
+Usage::
+
+    python benchmarks/thunks.py [n_calls] [n_sinks]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+
+from ctypes import CFUNCTYPE, c_int, c_void_p
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.fake import FakeBackend
+
+sink_info_cb_t = CFUNCTYPE(None, c_void_p, c_void_p, c_int, c_void_p)
+
+
+class Thunk(object):
+    """
+    Callable holding a ctypes thunk, which the fake server calls directly.
+    """
+    __slots__ = ('f', 'thunk')
+
+    def __init__(self, f):
+        self.f = f
+        self.thunk = sink_info_cb_t(f)
+
+    def __call__(self, *args):
+        return self.f(*args)
+
+
+class ThunkBackend(FakeBackend):
+    pa_sink_info_cb_t = Thunk
+
+
+class PerCallPulseAudio(PulseAudio):
+    """
+    Allocates a new thunk for every call.
+    """
+    def _thunk(self, name):
+        cb_type = getattr(self._lib, getattr(type(self), name).cb_type)
+        return cb_type(getattr(self, name))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_sinks = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print('%d calls, %d sinks' % (n, n_sinks))
+    print()
+    print('%-10s %20s %20s' % ('', 'by index (us/call)', 'list (us/call)'))
+    for (name, cls) in (('per-call', PerCallPulseAudio), ('shared', PulseAudio)):
+        pulse = cls('benchmark', backend=ThunkBackend(n_sinks=n_sinks))
+        pulse.connect()
+        times = [min(timeit.repeat(f, number=n, repeat=5)) * 1000000 / n
+                 for f in (lambda: pulse.get_sink_info_by_index(0),
+                           pulse.get_sink_info_list)]
+        print('%-10s %20.2f %20.2f' % (name, times[0], times[1]))
+        pulse.disconnect()
+
+
+if __name__ == '__main__':
+    main()
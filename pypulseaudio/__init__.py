@@ -1,7 +1,26 @@
 from __future__ import unicode_literals
 
+import itertools
+from collections import deque
+from contextlib import contextmanager
 from ctypes import *
-from pulseaudio.lib_pulseaudio import *
+
+from pypulseaudio.backend import get_default_backend
+from pypulseaudio.cache import ModuleRegistry, ObjectCache
+from pypulseaudio.constants import *
+from pypulseaudio.metrics import Trace
+from pypulseaudio.profiles import choose_profile
+from pypulseaudio.records import (copy_entry, format_module_argument, parse_module_argument,
+                                  raw_card_ports, raw_card_profiles, record_decoders)
+from pypulseaudio.snapshot import Snapshot
+from pypulseaudio.stream import UploadStream
+from pypulseaudio.subscription import Event, Subscription
+from pypulseaudio.volume import converters
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
 
 __version__ = '0.1.0'
 
@@ -18,24 +37,101 @@ state_map = {
     PA_CONTEXT_UNCONNECTED: "unconnected",
 }
 
-PULSEAUDIO_TIMEOUT = 1000000  # Expressed in milliseconds
+PULSEAUDIO_TIMEOUT = 1000000  # Expressed in milliseconds, default for all calls
+
+facility_map = {
+    PA_SUBSCRIPTION_EVENT_SINK: 'sink',
+    PA_SUBSCRIPTION_EVENT_SOURCE: 'source',
+    PA_SUBSCRIPTION_EVENT_SINK_INPUT: 'sink_input',
+    PA_SUBSCRIPTION_EVENT_SOURCE_OUTPUT: 'source_output',
+    PA_SUBSCRIPTION_EVENT_MODULE: 'module',
+    PA_SUBSCRIPTION_EVENT_CLIENT: 'client',
+    PA_SUBSCRIPTION_EVENT_SAMPLE_CACHE: 'sample_cache',
+    PA_SUBSCRIPTION_EVENT_SERVER: 'server',
+    PA_SUBSCRIPTION_EVENT_CARD: 'card',
+}
+
+event_type_map = {
+    PA_SUBSCRIPTION_EVENT_NEW: 'new',
+    PA_SUBSCRIPTION_EVENT_CHANGE: 'change',
+    PA_SUBSCRIPTION_EVENT_REMOVE: 'remove',
+}
+
+CACHE_SUBSCRIPTION_MASK = (PA_SUBSCRIPTION_MASK_SINK |
+                           PA_SUBSCRIPTION_MASK_SOURCE |
+                           PA_SUBSCRIPTION_MASK_CARD |
+                           PA_SUBSCRIPTION_MASK_MODULE |
+                           PA_SUBSCRIPTION_MASK_SERVER)
+
+
+class PulseAudioTimeout(Exception):
+    """
+    Raised when a call has not completed within its timeout.  Any server
+    operations it started have been cancelled.
+    """
+    pass
 
 
-def callback(cb):
+def callback(cb_type):
     """
     Decorator for wrapping a callback function and handling return
-    value storage and termination of sequenced callbacks.
+    value storage and termination of sequenced callbacks.  The
+    decorator must be passed the name of the callback's ctypes function
+    type, which is looked up on the instance's backend for creating the
+    instance's callback thunk.  Return
+    values are stored against the :class:`Operation` identified by the
+    callback's userdata.
     See also:: :meth:`wait_callback`
-    """ 
-    def cb_func(*args):
-        self = args[0]
-        (value, is_last) = cb(*args)
-        if (value is not None):
-            self._cb_return[cb.__name__] = self._cb_return.get(cb.__name__, []) + \
-                [value]
-        if (is_last):
-            self._cb_event[cb.__name__] = True
-    return cb_func
+    """
+    def cb_decorator(cb):
+        def cb_func(*args):
+            self = args[0]
+            op = self._operations.get(args[-1])
+            if (op is None):
+                return
+            if (op.trace is None):
+                (value, is_last) = cb(*args)
+            else:
+                start = monotonic()
+                (value, is_last) = cb(*args)
+                op.trace.decode += monotonic() - start
+            if (value is not None):
+                op.result.append(value)
+            if (is_last):
+                op.done = True
+                del self._operations[args[-1]]
+                self._operation_done(op)
+        cb_func.cb_type = cb_type
+        return cb_func
+    return cb_decorator
+
+
+def issue_args(f, args, kwargs):
+    """
+    Positional arguments, following self, for the function wrapped by
+    :meth:`wait_callback`, given the arguments of a call.  Keyword
+    arguments are put in their places and omitted arguments take their
+    defaults.  The cb and userdata arguments may not be passed.
+    """
+    if (not kwargs):
+        return tuple(args)
+    code = f.__code__
+    names = code.co_varnames[1:code.co_argcount - 2]
+    unexpected = [name for name in kwargs if (name not in names[len(args):])]
+    if (unexpected):
+        raise TypeError('%s() got unexpected keyword arguments: %s' %
+                        (f.__name__, ', '.join(sorted(unexpected))))
+    defaults = f.__defaults__ or ()
+    first_default = code.co_argcount - 1 - len(defaults)
+    values = list(args)
+    for i in range(len(args), len(names)):
+        if (names[i] in kwargs):
+            values.append(kwargs[names[i]])
+        elif (i >= first_default):
+            values.append(defaults[i - first_default])
+        else:
+            raise TypeError('%s() missing argument: %s' % (f.__name__, names[i]))
+    return tuple(values)
 
 
 def wait_callback(cb):
@@ -47,44 +143,404 @@ def wait_callback(cb):
     an argument, in order to access the correct location for
     retrieving the callback return value.  This complements
     the procedure carried out by :meth:`callback`.
-    """ 
+
+    The wrapped function is passed the callback thunk and userdata
+    as the keyword arguments cb and userdata, and must return the
+    resulting pa_operation.  It is retained as the ``issue`` attribute
+    of the decorated function so that the operation may also be
+    pipelined.  See also:: :class:`Batch`
+
+    The decorated function accepts an optional timeout keyword argument,
+    in seconds, overriding the instance timeout.  Its other arguments may
+    be passed by position or keyword.  See also:: :meth:`issue_args`
+    """
     def cb_decorator(f):
-        def cb_func(*args):
+        def cb_func(*args, **kwargs):
             self = args[0]
+            timeout = kwargs.pop('timeout', None)
+            f_args = issue_args(f, args[1:], kwargs)
             if (self.state == PA_CONTEXT_READY):
-                self._cb_event[cb] = False
-                f(*args)
-                while (True):
-                    if (self._cb_event[cb]):
-                        return self._cb_return.pop(cb)
-                    pa_mainloop_prepare(self._main_loop, PULSEAUDIO_TIMEOUT)
-                    pa_mainloop_poll(self._main_loop)
-                    if (pa_mainloop_dispatch(self._main_loop) <= 0):
-                        raise Exception('State Change Timed Out')
+                deadline = self._deadline(timeout)
+                with self._locked():
+                    if (self._metrics is not None):
+                        return self._traced(f.__name__, [(cb, f, f_args)],
+                                            deadline)[0]
+                    op = self._issue(cb, f, f_args)
+                    self._wait_operations([op], deadline)
+                return op.result
+        cb_func.issue = f
+        cb_func.callback_name = cb
         return cb_func
     return cb_decorator
 
 
-def wait_state_change(required_state):
+def cached(facility, key=None):
+    """
+    Decorator for wrapping an introspection function such that it is
+    served from the local object cache whenever the cache is enabled
+    and populated.  The key argument selects how the function's first
+    argument is looked up in the cache ('index' or 'name'); with no
+    key the whole facility is returned, as copies of the cached entries.
+    Lookups that miss the cache fall through to the wrapped server call.
+    See also:: :class:`pypulseaudio.cache.ObjectCache`
+    """
+    def cache_decorator(f):
+        def cache_func(*args, **kwargs):
+            self = args[0]
+            if (self._cache is None or not self._cache.populated):
+                return f(*args, **kwargs)
+            with self._locked():
+                self._dispatch_pending()
+                if (key is None):
+                    return self._cache.list(facility)
+                elif (key == 'index'):
+                    value = self._cache.get(facility, args[1])
+                else:
+                    value = self._cache.find(facility, args[1])
+            if (value is None):
+                return f(*args, **kwargs)
+            return [value]
+        cache_func.__dict__.update(f.__dict__)
+        return cache_func
+    return cache_decorator
+
+
+def wait_state_change(required_state, name):
     """
     Decorator for wrapping a function such that its termination
     depends on a pulseaudio state change.  The required_state
     argument is substituted with the actual desired value when
-    the decorator is used.
+    the decorator is used, and name is the call's name as reported
+    to the metrics hook.  The decorated function accepts an optional
+    timeout keyword argument, in seconds, overriding the instance timeout.
     """
     def cb_decorator(f):
-        def cb_func(*args):
+        def cb_func(*args, **kwargs):
             self = args[0]
-            f(*args)
-            while (self.state != required_state):
-                pa_mainloop_prepare(self._main_loop, PULSEAUDIO_TIMEOUT)
-                pa_mainloop_poll(self._main_loop)
-                if (pa_mainloop_dispatch(self._main_loop) <= 0):
-                    raise Exception('State Change Timed Out')
+            deadline = self._deadline(kwargs.pop('timeout', None))
+            with self._locked():
+                if (self._metrics is None):
+                    f(*args, **kwargs)
+                    self._wait_state(required_state, deadline)
+                    return
+                trace = Trace(name)
+                start = monotonic()
+                try:
+                    f(*args, **kwargs)
+                    sent = monotonic()
+                    trace.send = sent - start
+                    self._wait_state(required_state, deadline, trace)
+                    trace.wait = monotonic() - sent
+                except PulseAudioTimeout:
+                    trace.outcome = 'timeout'
+                    raise
+                except Exception:
+                    trace.outcome = 'failure'
+                    raise
+                finally:
+                    self._metrics.observe(trace)
         return cb_func
     return cb_decorator
 
 
+class Operation(object):
+    """
+    Result slot for a single in-flight server operation.  The slot is
+    identified to the operation's callback through its userdata, so
+    that any number of operations may be outstanding at once, sharing
+    the same callback thunk.
+    An optional notify function is called with the slot on completion,
+    from the main loop thread when the threaded main loop is used.
+    """
+    def __init__(self, op_id, name, cb):
+        self.id = op_id
+        self.name = name
+        self.cb = cb
+        self.result = []
+        self.done = False
+        self.notify = None
+        self.pa_operation = None
+        self.trace = None
+
+
+class Batch(object):
+    """
+    Pipeline of server operations which are all sent to the server
+    before waiting on any of them, such that the total latency is
+    close to a single round trip rather than one round trip per
+    operation.  Any :class:`PulseAudio` method that waits on a server
+    callback may be queued by calling it on the batch, e.g.::
+
+        batch = pulse.batch()
+        batch.set_card_profile_by_index(0, 'a2dp_sink')
+        batch.set_default_sink('bluez_sink.00_11_22_33_44_55')
+        batch.get_sink_info_by_index(3)
+        results = batch.execute()
+
+    or equivalently, executing on leaving the block::
+
+        with pulse.batch() as batch:
+            ...
+        results = batch.results
+
+    Queued getters are always sent to the server, even when the object
+    cache is enabled.
+    """
+    def __init__(self, pulse):
+        self._pulse = pulse
+        self._queue = []
+        self.results = None
+
+    def __getattr__(self, name):
+        method = getattr(type(self._pulse), name, None)
+        if (not hasattr(method, 'issue')):
+            raise AttributeError(name)
+        def queue(*args, **kwargs):
+            self._queue.append((method.callback_name, method.issue,
+                                issue_args(method.issue, args, kwargs)))
+            return self
+        return queue
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if (exc_type is None):
+            self.execute()
+
+    def execute(self, timeout=None):
+        """
+        Send all queued operations and wait for every one of them to
+        complete.  The queue is emptied.
+
+        :param timeout: time in seconds allowed for all operations to
+            complete, defaults to the connection's timeout
+        :type timeout: float
+
+        :return: per-operation results, in the order queued, each taking
+            the form returned by the corresponding :class:`PulseAudio` method
+        :rtype: list
+        """
+        pulse = self._pulse
+        (queue, self._queue) = (self._queue, [])
+        if (pulse.state != PA_CONTEXT_READY):
+            return None
+        deadline = pulse._deadline(timeout)
+        with pulse._locked():
+            if (pulse._metrics is not None):
+                self.results = pulse._traced('batch', queue, deadline)
+                return self.results
+            ops = []
+            try:
+                for (name, f, args) in queue:
+                    ops.append(pulse._issue(name, f, args))
+            except:
+                pulse._release_operations(ops)
+                raise
+            pulse._wait_operations(ops, deadline)
+        self.results = [op.result for op in ops]
+        return self.results
+
+
+def card_info_dict(card_info):
+    """
+    Convert a pa_card_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_card_info_list`
+    """
+    ret = {}
+    ret['name'] = card_info.name
+    ret['index'] = card_info.index
+    ret['profiles'] = []
+    for (name, desc, n_sinks, n_sources, priority, available) in raw_card_profiles(card_info):
+        ret['profiles'].append({'name': name,
+                                'desc': desc,
+                                'n_sinks': n_sinks,
+                                'n_sources': n_sources,
+                                'priority': priority,
+                                'available': available
+                                })
+    active_profile = card_info.active_profile
+    if (active_profile):
+        ret['active_profile'] = active_profile.contents.name
+    else:
+        ret['active_profile'] = None
+    ret['ports'] = []
+    for (name, desc, priority, available, direction, profiles) in raw_card_ports(card_info):
+        ret['ports'].append({'name': name,
+                             'desc': desc,
+                             'priority': priority,
+                             'available': available,
+                             'direction': direction,
+                             'profiles': list(profiles)
+                             })
+    return ret
+
+
+def sink_info_dict(sink_info):
+    """
+    Convert a pa_sink_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_sink_info_list`
+    """
+    ret = {}
+    ret['name'] = sink_info.name
+    ret['index'] = sink_info.index
+    ret['card'] = sink_info.card
+    ret['mute'] = True if sink_info.mute else False
+    ret['latency'] = sink_info.latency
+    ret['configured_latency'] = sink_info.configured_latency
+    ret['monitor_source'] = sink_info.monitor_source
+    ret['monitor_source_name'] = sink_info.monitor_source_name
+    ret['volume'] = {}
+    ret['volume']['channels'] = sink_info.volume.channels
+    ret['volume']['values'] = [sink_info.volume.values[i]
+                               for i in range(ret['volume']['channels'])]
+    ret['n_volume_steps'] = sink_info.n_volume_steps
+    ret['state'] = sink_info.state
+    ret['desc'] = sink_info.description
+    return ret
+
+
+def source_info_dict(source_info):
+    """
+    Convert a pa_source_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_source_info_list`
+    """
+    ret = {}
+    ret['name'] = source_info.name
+    ret['index'] = source_info.index
+    ret['card'] = source_info.card
+    ret['desc'] = source_info.description
+    ret['mute'] = True if source_info.mute else False
+    ret['latency'] = source_info.latency
+    ret['configured_latency'] = source_info.configured_latency
+    ret['monitor_of_sink'] = source_info.monitor_of_sink
+    ret['monitor_of_sink_name'] = source_info.monitor_of_sink_name
+    ret['volume'] = {}
+    ret['volume']['channels'] = source_info.volume.channels
+    ret['volume']['values'] = [source_info.volume.values[i]
+                               for i in range(ret['volume']['channels'])]
+    return ret
+
+
+def sink_input_info_dict(sink_input_info):
+    """
+    Convert a pa_sink_input_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_sink_input_info_list`
+    """
+    ret = {}
+    ret['name'] = sink_input_info.name
+    ret['index'] = sink_input_info.index
+    ret['owner_module'] = sink_input_info.owner_module
+    ret['client'] = sink_input_info.client
+    ret['sink'] = sink_input_info.sink
+    ret['volume'] = {}
+    ret['volume']['channels'] = sink_input_info.volume.channels
+    ret['volume']['values'] = [sink_input_info.volume.values[i]
+                               for i in range(ret['volume']['channels'])]
+    ret['buffer_latency'] = sink_input_info.buffer_usec
+    ret['sink_latency'] = sink_input_info.sink_usec
+    ret['driver'] = sink_input_info.driver
+    ret['mute'] = True if sink_input_info.mute else False
+    ret['corked'] = True if sink_input_info.corked else False
+    return ret
+
+
+def source_output_info_dict(source_output_info):
+    """
+    Convert a pa_source_output_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_source_output_info_list`
+    """
+    ret = {}
+    ret['name'] = source_output_info.name
+    ret['index'] = source_output_info.index
+    ret['owner_module'] = source_output_info.owner_module
+    ret['client'] = source_output_info.client
+    ret['source'] = source_output_info.source
+    ret['volume'] = {}
+    ret['volume']['channels'] = source_output_info.volume.channels
+    ret['volume']['values'] = [source_output_info.volume.values[i]
+                               for i in range(ret['volume']['channels'])]
+    ret['buffer_latency'] = source_output_info.buffer_usec
+    ret['source_latency'] = source_output_info.source_usec
+    ret['driver'] = source_output_info.driver
+    ret['mute'] = True if source_output_info.mute else False
+    ret['corked'] = True if source_output_info.corked else False
+    return ret
+
+
+def module_info_dict(module_info):
+    """
+    Convert a pa_module_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_module_info_list`
+    """
+    ret = {}
+    ret['name'] = module_info.name
+    ret['index'] = module_info.index
+    ret['n_used'] = module_info.n_used
+    ret['argument'] = parse_module_argument(module_info.argument)
+    return ret
+
+
+def sample_info_dict(sample_info):
+    """
+    Convert a pa_sample_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_sample_info_list`
+    """
+    ret = {}
+    ret['name'] = sample_info.name
+    ret['index'] = sample_info.index
+    ret['volume'] = {}
+    ret['volume']['channels'] = sample_info.volume.channels
+    ret['volume']['values'] = [sample_info.volume.values[i]
+                               for i in range(ret['volume']['channels'])]
+    ret['rate'] = sample_info.sample_spec.rate
+    ret['channels'] = sample_info.sample_spec.channels
+    ret['duration'] = sample_info.duration
+    ret['bytes'] = sample_info.bytes
+    ret['lazy'] = True if sample_info.lazy else False
+    ret['filename'] = sample_info.filename
+    return ret
+
+
+def server_info_dict(server_info):
+    """
+    Convert a pa_server_info structure into a dict.
+    See also:: :meth:`PulseAudio.get_server_info`
+    """
+    ret = {}
+    ret['user_name'] = server_info.user_name
+    ret['host_name'] = server_info.host_name
+    ret['server_version'] = server_info.server_version
+    ret['server_name'] = server_info.server_name
+    ret['default_sink_name'] = server_info.default_sink_name
+    ret['default_source_name'] = server_info.default_source_name
+    ret['cookie'] = server_info.cookie
+    return ret
+
+
+volume_setters = {
+    'sink': 'set_sink_volume_by_index',
+    'source': 'set_source_volume_by_index',
+    'sink_input': 'set_sink_input_volume',
+    'source_output': 'set_source_output_volume',
+}
+
+
+dict_decoders = {
+    'card': card_info_dict,
+    'sink': sink_info_dict,
+    'source': source_info_dict,
+    'sink_input': sink_input_info_dict,
+    'source_output': source_output_info_dict,
+    'module': module_info_dict,
+    'sample': sample_info_dict,
+    'server': server_info_dict,
+}
+
+
 class PulseAudio(object):
     """
     Wrapper around lib_pulseaudio for allowing calls to be made synchronously and
@@ -94,31 +550,125 @@ class PulseAudio(object):
     if only a single item value is returned.  It is the responsibility of the
     caller to remove return value(s) from the list.
 
-    .. warning:: This wrapper is not thread-safe, overlapped API calls are
-        not advised.
+    When created with ``cache=True`` the sinks, sources, cards, modules and
+    server information are mirrored locally.  The mirror is filled once by
+    :meth:`connect` and kept up-to-date from server subscription events by
+    re-fetching only the affected object, so that the corresponding getters
+    are answered without a server round trip.  Events are processed whenever
+    the main loop runs, hence cached reads are eventually consistent with
+    the server.
+
+    When created with ``threaded=True`` the connection is serviced by a
+    pa_threaded_mainloop thread and may be shared by any number of threads
+    issuing calls concurrently.  Each in-flight operation has its own result
+    slot and callers wait on the main loop's condition for their own
+    operation to complete.  Blocking calls must not be made from the main
+    loop thread itself, i.e. from within a callback.
+
+    When created with ``records=True`` entries are returned as the compact
+    record types of :mod:`pypulseaudio.records` rather than dicts.  Records
+    support the same read-only dict style access, so existing callers
+    continue to work.
+
+    Every call waiting on the server is bounded by a timeout, given in seconds
+    per instance or per call with the timeout keyword argument.  Should it
+    expire, the call's server operations are cancelled and
+    :class:`PulseAudioTimeout` is raised.
+
+    The libpulse functions are taken from a backend, by default the system
+    libpulse.  Passing ``backend=FakeBackend(...)`` (see
+    :mod:`pypulseaudio.fake`) runs against an in-process fake server instead,
+    for testing and benchmarking without pulseaudio.
+
+    A metrics hook passed with ``metrics=...``, see :mod:`pypulseaudio.metrics`,
+    is given a trace of every call to the server, split into send, wait and
+    decode time.  Cached reads are not traced.
+
+    Instances created with ``mainloop=...`` share the given
+    :class:`pypulseaudio.mainloop.MainLoop` and its backend, such that one
+    thread may service many connections with a single poll set, running
+    :meth:`pypulseaudio.mainloop.MainLoop.run_forever` rather than
+    :meth:`process_events` on each instance.
+
+    .. warning:: Unless created with ``threaded=True`` this wrapper is not
+        thread-safe, overlapped API calls from different threads are not
+        advised.
     """
     __main_loop = None
     __api = None
     __context = None
     _app_name = None
-    _cb_event = {}
-    _cb_return = {}
+    _running = False
+    _server = None
+    _flags = 0
     state = None
 
-    def __init__(self, app_name):
+    def __init__(self, app_name, cache=False, threaded=False, records=False,
+                 timeout=PULSEAUDIO_TIMEOUT / 1000.0, backend=None, metrics=None,
+                 mainloop=None):
+        if (metrics is not None and not callable(getattr(metrics, 'observe', None))):
+            raise Exception('The metrics hook has no observe method')
+        if (mainloop is not None):
+            if (threaded):
+                raise Exception('A shared main loop cannot be threaded')
+            if (backend is not None and backend is not mainloop._lib):
+                raise Exception('A shared main loop requires its own backend')
+            backend = mainloop._lib
+            mainloop.attach(self)
+        self._driver = mainloop
+        self._lib = backend if backend is not None else get_default_backend()
+        self._metrics = metrics
         self._app_name = app_name
-        self._state_changed = pa_context_notify_cb_t(self._state_changed_cb)
+        self._threaded = threaded
+        self._timeout = timeout
+        self._wakeup = self._lib.pa_time_event_cb_t(self._wakeup_cb)
+        self._decoders = record_decoders if records else dict_decoders
+        self._state_changed = self._lib.pa_context_notify_cb_t(self._state_changed_cb)
+        self._operations = {}
+        self._op_ids = itertools.count(1)
+        self._thunks = {}
+        self._subscription = self._lib.pa_context_subscribe_cb_t(self._subscription_cb)
+        self._subscriptions = []
+        self._cache = ObjectCache() if cache else None
+        if (self._cache is not None):
+            self._cache_fetch = {
+                'sink': (self._lib.pa_context_get_sink_info_by_index,
+                         self._lib.pa_sink_info_cb_t(self._cache_info_cb('sink'))),
+                'source': (self._lib.pa_context_get_source_info_by_index,
+                           self._lib.pa_source_info_cb_t(self._cache_info_cb('source'))),
+                'card': (self._lib.pa_context_get_card_info_by_index,
+                         self._lib.pa_card_info_cb_t(self._cache_info_cb('card'))),
+                'module': (self._lib.pa_context_get_module_info,
+                           self._lib.pa_module_info_cb_t(self._cache_info_cb('module'))),
+            }
+            self._cache_server_info = self._lib.pa_server_info_cb_t(self._cache_server_info_cb)
+
+    @property
+    def cache(self):
+        """
+        The local :class:`pypulseaudio.cache.ObjectCache` or None if caching
+        was not enabled.
+        """
+        return self._cache
 
     @property
     def _main_loop(self):
         if not self.__main_loop:
-            self.__main_loop = pa_mainloop_new()
+            if (self._driver is not None):
+                self.__main_loop = self._driver._main_loop
+            elif (self._threaded):
+                self.__main_loop = self._lib.pa_threaded_mainloop_new()
+            else:
+                self.__main_loop = self._lib.pa_mainloop_new()
         return self.__main_loop
 
     @property
     def _api(self):
         if not self.__api:
-            self.__api = pa_mainloop_get_api(self._main_loop)
+            if (self._threaded):
+                self.__api = self._lib.pa_threaded_mainloop_get_api(self._main_loop)
+            else:
+                self.__api = self._lib.pa_mainloop_get_api(self._main_loop)
         return self.__api
  
     @property
@@ -127,15 +677,273 @@ class PulseAudio(object):
             if not self._app_name:
                 raise NameError("No pa_context or app name to create it with "
                                 "has been given")
-            self.__context = pa_context_new(self._api, self._app_name)
-            pa_context_set_state_callback(self._context, self._state_changed, None)
+            self.__context = self._lib.pa_context_new(self._api, self._app_name)
+            self._lib.pa_context_set_state_callback(self._context, self._state_changed, None)
+            self._lib.pa_context_set_subscribe_callback(self.__context, self._subscription, None)
         return self.__context
 
-    @wait_state_change(PA_CONTEXT_READY)
-    def connect(self, server=None, flags=0):
+    def _dispatch_pending(self):
+        """
+        Dispatch any events that are already pending on the main loop
+        without blocking.  The threaded main loop dispatches events itself.
+        """
+        if (self._threaded):
+            return
+        if (self._driver is not None):
+            self._driver._dispatch_pending()
+            return
+        while (self._lib.pa_mainloop_iterate(self._main_loop, 0, None) > 0):
+            pass
+
+    def _thunk(self, name):
+        """
+        Obtain the callback thunk for the named callback.  Thunks are created
+        once per instance and shared by all operations using the callback,
+        which are told apart by their userdata.
+        """
+        thunk = self._thunks.get(name)
+        if (thunk is None):
+            cb_type = getattr(self._lib, getattr(type(self), name).cb_type)
+            thunk = cb_type(getattr(self, name))
+            self._thunks[name] = thunk
+        return thunk
+
+    def _issue(self, name, f, args):
+        """
+        Send a server operation, allocating a result slot for it.
+        """
+        op_id = next(self._op_ids)
+        op = Operation(op_id, name, self._thunk(name))
+        self._operations[op_id] = op
+        op.pa_operation = f(self, *args, cb=op.cb, userdata=op_id)
+        if (not op.pa_operation):
+            del self._operations[op_id]
+            raise Exception(self._lib.pa_strerror(self._lib.pa_context_errno(self._context)))
+        return op
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the threaded main loop lock, if the threaded main loop is used.
+        """
+        if (not self._threaded or not self._running):
+            yield
+            return
+        self._lib.pa_threaded_mainloop_lock(self._main_loop)
+        try:
+            yield
+        finally:
+            self._lib.pa_threaded_mainloop_unlock(self._main_loop)
+
+    def _deadline(self, timeout=None):
+        """
+        Absolute monotonic deadline for a call with the given timeout in
+        seconds, or with the instance's timeout if None.
+        """
+        if (timeout is None):
+            timeout = self._timeout
+        return monotonic() + timeout
+
+    def _iterate(self, deadline):
+        """
+        Block until the main loop has dispatched some events or the deadline
+        has been reached.  When the threaded main loop is used the lock must
+        be held, and is released while waiting to be signalled.
+        """
+        remaining = deadline - monotonic()
+        if (remaining <= 0):
+            raise PulseAudioTimeout('Operation timed out')
+        if (self._threaded):
+            if (self._lib.pa_threaded_mainloop_in_thread(self._main_loop)):
+                raise Exception('Blocking call made from the main loop thread')
+            self._lib.pa_threaded_mainloop_wait(self._main_loop)
+            return
+        if (self._driver is not None):
+            self._driver._run(deadline)
+            return
+        # pa_mainloop_prepare() takes its timeout in microseconds
+        self._lib.pa_mainloop_prepare(self._main_loop, int(remaining * 1000000))
+        self._lib.pa_mainloop_poll(self._main_loop)
+        self._lib.pa_mainloop_dispatch(self._main_loop)
+
+    def _wait_operations(self, ops, deadline, trace=None):
+        """
+        Run the main loop until all of the given operations have completed.
+        Should the deadline pass or the connection be lost, any operations
+        still in flight are cancelled.
+        """
+        try:
+            for op in ops:
+                self._wait_until(lambda: op.done, deadline, trace=trace)
+        finally:
+            self._release_operations(ops)
+
+    def _release_operations(self, ops):
+        """
+        Cancel any of the given operations still in flight, dropping their
+        result slots, and release all of them.
+        """
+        for op in ops:
+            if (not op.done):
+                self._lib.pa_operation_cancel(op.pa_operation)
+                self._operations.pop(op.id, None)
+            self._lib.pa_operation_unref(op.pa_operation)
+
+    def _traced(self, name, queue, deadline):
+        """
+        Send and wait for the queued operations, as :meth:`Batch.execute`
+        does, reporting a :class:`pypulseaudio.metrics.Trace` of the call to
+        the metrics hook.  The lock must be held.
+        """
+        trace = Trace(name)
+        ops = []
+        sent = None
+        start = monotonic()
+        try:
+            try:
+                for (cb_name, f, args) in queue:
+                    op = self._issue(cb_name, f, args)
+                    op.trace = trace
+                    ops.append(op)
+            except:
+                self._release_operations(ops)
+                raise
+            sent = monotonic()
+            trace.send = sent - start
+            self._wait_operations(ops, deadline, trace)
+            trace.entries = sum(len(op.result) for op in ops)
+        except PulseAudioTimeout:
+            trace.outcome = 'timeout'
+            raise
+        except Exception:
+            trace.outcome = 'failure'
+            raise
+        finally:
+            if (sent is not None):
+                trace.wait = monotonic() - sent - trace.decode
+            self._metrics.observe(trace)
+        return [op.result for op in ops]
+
+    def _wait_until(self, condition, deadline, connected=True, trace=None):
+        """
+        Run the main loop until the condition holds.  Unless connected is
+        False, the context must remain connected throughout.  Iterations
+        are counted against the trace, if given.
+        """
+        timer = None
+        try:
+            while (not condition()):
+                if (connected and self.state != PA_CONTEXT_READY):
+                    raise Exception('Connection ' + state_map.get(self.state, 'lost'))
+                if (self._threaded and timer is None):
+                    timer = self._start_timer(deadline)
+                self._iterate(deadline)
+                if (trace is not None):
+                    trace.iterations += 1
+        finally:
+            if (timer is not None):
+                self._api.contents.time_free(timer)
+
+    def _start_timer(self, deadline):
+        """
+        Create a main loop timer which wakes up waiting callers at the
+        deadline, as pa_threaded_mainloop_wait() itself has no timeout.
+        """
+        remaining = max(0, int((deadline - monotonic()) * 1000000))
+        return self._lib.pa_context_rttime_new(self._context,
+                                               self._lib.pa_rtclock_now() + remaining,
+                                               self._wakeup,
+                                               None)
+
+    def _wakeup_cb(self, api, event, tv, userdata):
+        self._lib.pa_threaded_mainloop_signal(self._main_loop, 0)
+
+    def _iter_info(self, name, timeout=None):
+        """
+        Generator issuing the named list getter and yielding each entry as
+        soon as its callback has fired.  The operation is cancelled if the
+        generator is closed early or the deadline passes.
+        """
+        method = getattr(type(self), name)
+        if (self._cache is not None and self._cache.populated):
+            for value in method(self):
+                yield value
+            return
+        if (self.state != PA_CONTEXT_READY):
+            return
+        deadline = self._deadline(timeout)
+        if (self._metrics is not None):
+            trace = Trace(name.replace('get_', 'iter_', 1).replace('_list', ''))
+        else:
+            trace = None
+        start = monotonic()
+        with self._locked():
+            op = self._issue(method.callback_name, method.issue, ())
+            op.result = deque()
+            op.trace = trace
+        sent = monotonic()
+        waited = 0.0
+        try:
+            while (True):
+                with self._locked():
+                    before = monotonic()
+                    self._wait_until(lambda: op.result or op.done, deadline,
+                                     trace=trace)
+                    waited += monotonic() - before
+                    if (not op.result):
+                        return
+                    value = op.result.popleft()
+                if (trace is not None):
+                    trace.entries += 1
+                yield value
+        except PulseAudioTimeout:
+            if (trace is not None):
+                trace.outcome = 'timeout'
+            raise
+        except Exception:
+            if (trace is not None):
+                trace.outcome = 'failure'
+            raise
+        finally:
+            with self._locked():
+                self._release_operations([op])
+                if (trace is not None):
+                    trace.send = sent - start
+                    trace.wait = waited - trace.decode
+                    self._metrics.observe(trace)
+
+    def _wait_state(self, required_state, deadline, trace=None):
+        """
+        Run the main loop until the context has reached the required state.
+        """
+        def reached():
+            if (self.state == required_state):
+                return True
+            if (self.state in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+                raise Exception('Connection ' + state_map[self.state])
+            return False
+        self._wait_until(reached, deadline, connected=False, trace=trace)
+
+    def _operation_done(self, op):
+        if (op.notify is not None):
+            op.notify(op)
+        if (self._threaded):
+            self._lib.pa_threaded_mainloop_signal(self._main_loop, 0)
+
+    def batch(self):
+        """
+        Create a new, empty pipeline of server operations.
+
+        :return: batch bound to this connection
+        :rtype: :class:`Batch`
+        """
+        return Batch(self)
+
+    def connect(self, server=None, flags=0, timeout=None):
         """
         Connect to a pulseaudio server.  The connection operation is considered complete
-        only following the state transition to PA_CONTEXT_READY.
+        only following the state transition to PA_CONTEXT_READY.  If the object cache
+        is enabled it is populated before returning.
 
         :param server: Refer to
             http://www.freedesktop.org/wiki/Software/PulseAudio/Documentation/User/ServerStrings/
@@ -144,104 +952,357 @@ class PulseAudio(object):
         :param flags: Refer to
             http://freedesktop.org/software/pulseaudio/doxygen/def_8h.html#abe3b87f73f6de46609b059e10827863b
         :type flags: pa_context_flags
+        :param timeout: time in seconds allowed for connecting, defaults to the
+            instance timeout
+        :type timeout: float
+        """
+        self._server = server
+        self._flags = flags
+        self._connect(server, flags, timeout)
+        if (self._cache is not None):
+            self._populate_cache(timeout)
+        elif (self._subscriptions):
+            self._subscribe(self._subscription_mask(), timeout=timeout)
+
+    def reconnect(self, timeout=None):
+        """
+        Connect again to the server last connected to, e.g. once the
+        connection has failed because the server was restarted.  A context
+        which has failed or terminated is first discarded.  Subscriptions
+        are re-established and the object cache, if enabled, re-populated.
+
+        :param timeout: time in seconds allowed for connecting, defaults to the
+            instance timeout
+        :type timeout: float
+        """
+        if (self.state in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+            with self._locked():
+                self._reset_context()
+        self.connect(self._server, self._flags, timeout)
+
+    def _connect(self, server, flags, timeout):
+        if (self._threaded and not self._running):
+            # The context is created before the main loop thread is started
+            self._context
+            self._lib.pa_threaded_mainloop_start(self._main_loop)
+            self._running = True
+        try:
+            self._connect_context(server, flags, timeout=timeout)
+        except:
+            with self._locked():
+                self._reset_context()
+            if (self._running):
+                self._free_threaded_main_loop()
+            raise
+
+    def _free_threaded_main_loop(self):
+        """
+        Stop and free the threaded main loop, such that an instance which
+        failed to connect holds no thread.  A new main loop is created
+        should the instance connect again.
+        """
+        self._lib.pa_threaded_mainloop_stop(self.__main_loop)
+        self._running = False
+        self._lib.pa_threaded_mainloop_free(self.__main_loop)
+        self.__main_loop = None
+        self.__api = None
+
+    def _free(self):
+        """
+        Free the context and the threaded main loop, if any, of an instance
+        which has disconnected, failed or never connected.  A new context
+        and main loop are created should the instance connect again.
+        """
+        if (self.__context is not None):
+            with self._locked():
+                self._reset_context()
+        if (self._threaded and self.__main_loop is not None):
+            self._free_threaded_main_loop()
+
+    def _reset_context(self):
         """
+        Discard a context which failed to connect, as a context cannot be
+        connected more than once.
+        """
+        context = self.__context
+        self.__context = None
+        self.state = None
+        self._lib.pa_context_set_state_callback(context, None, None)
+        self._lib.pa_context_disconnect(context)
+        self._lib.pa_context_unref(context)
+
+    @wait_state_change(PA_CONTEXT_READY, 'connect')
+    def _connect_context(self, server, flags):
         if server is not None:
+            if (not isinstance(server, bytes)):
+                server = server.encode('utf-8')
             server = c_char_p(server)
-        pa_context_connect(self._context, server, flags, None)
+        self._lib.pa_context_connect(self._context, server, flags, None)
 
-    @wait_state_change(PA_CONTEXT_TERMINATED)
-    def disconnect(self):
+    def disconnect(self, timeout=None):
         """
         Disconnect the current pulseaudio connection context.  The disconnect operation is
         considered complete only following the state transition to PA_CONTEXT_TERMINATED.
+        The threaded main loop, if used, is stopped.  A context which has already
+        failed or terminated, or was never connected, is not waited on.
+
+        :param timeout: time in seconds allowed for disconnecting, defaults to the
+            instance timeout
+        :type timeout: float
+        """
+        if (self.state not in (None, PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+            self._disconnect(timeout=timeout)
+        if (self._running):
+            self._lib.pa_threaded_mainloop_stop(self._main_loop)
+            self._running = False
+
+    @wait_state_change(PA_CONTEXT_TERMINATED, 'disconnect')
+    def _disconnect(self):
+        if (self._cache is not None):
+            self._cache.clear()
+        self._lib.pa_context_disconnect(self._context)
+
+    @wait_callback('_context_success_cb')
+    def _subscribe(self, mask, cb=None, userdata=None):
+        return self._lib.pa_context_subscribe(self._context,
+                                              mask,
+                                              cb,
+                                              userdata)
+
+    def _subscription_mask(self):
+        mask = CACHE_SUBSCRIPTION_MASK if self._cache is not None else 0
+        for subscription in self._subscriptions:
+            mask |= subscription.mask
+        return mask
+
+    def subscribe(self, mask, handler, window=0):
+        """
+        Register a handler for server change notifications.  Handlers are
+        called by :meth:`process_events` with a single
+        :class:`pypulseaudio.subscription.Event` argument.  Bursts of events
+        for the same object are coalesced over the given window, see also::
+        :class:`pypulseaudio.subscription.Subscription`.
+
+        :param mask: object kinds of interest, a combination of
+            PA_SUBSCRIPTION_MASK_* values
+        :type mask: integer
+        :param handler: function called with each event
+        :type handler: callable
+        :param window: coalescing window in seconds, 0 for none
+        :type window: float
+        :return: subscription, to be passed to :meth:`unsubscribe`
+        :rtype: :class:`pypulseaudio.subscription.Subscription`
+        """
+        subscription = Subscription(mask, handler, window)
+        self._subscriptions.append(subscription)
+        self._subscribe(self._subscription_mask())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a handler registered with :meth:`subscribe`.  Events held
+        back for it are discarded.
+
+        :param subscription: as returned by :meth:`subscribe`
         """
-        pa_context_disconnect(self._context)
+        self._subscriptions.remove(subscription)
+        self._subscribe(self._subscription_mask())
+
+    def process_events(self, timeout=0):
+        """
+        Run the main loop for up to timeout seconds, until subscription
+        events are due, and deliver them to their handlers.  Handlers are
+        called from the calling thread, outside of any pulseaudio callback,
+        and may therefore make further calls on this connection.
+
+        :param timeout: maximum time in seconds to wait for events
+        :type timeout: float
+        :return: number of events delivered
+        :rtype: integer
+        """
+        end = monotonic() + timeout
+        while (True):
+            with self._locked():
+                due = self._pop_due()
+                if (not due):
+                    if (monotonic() >= end or self.state != PA_CONTEXT_READY):
+                        return 0
+                    next_due = self._next_due()
+                    self._run_once(end if next_due is None else min(end, next_due))
+                    continue
+            return self._deliver(due)
+
+    def _pop_due(self):
+        """
+        Take the subscription events which are due, as (handler, event)
+        tuples.  The lock must be held.
+        """
+        now = monotonic()
+        return [(subscription.handler, event)
+                for subscription in list(self._subscriptions)
+                for event in subscription.pop_due(now)]
+
+    def _next_due(self):
+        """
+        Time at which the next held back subscription event falls due, or
+        None if there is none.
+        """
+        due = [subscription.next_due() for subscription in self._subscriptions]
+        due = [i for i in due if i is not None]
+        return min(due) if due else None
+
+    def _deliver(self, due):
+        for (handler, event) in due:
+            handler(event)
+        return len(due)
+
+    def _deliver_due(self):
+        """
+        Deliver the subscription events which are due, without running the
+        main loop, as :meth:`pypulseaudio.mainloop.MainLoop.iterate` does.
+        """
+        with self._locked():
+            due = self._pop_due()
+        return self._deliver(due)
+
+    def _run_once(self, deadline):
+        """
+        Run a single main loop iteration, or wait for a single signal from
+        the threaded main loop, bounded by the deadline.
+        """
+        timer = self._start_timer(deadline) if self._threaded else None
+        try:
+            self._iterate(deadline)
+        except PulseAudioTimeout:
+            pass
+        finally:
+            if (timer is not None):
+                self._api.contents.time_free(timer)
+
+    def _populate_cache(self, timeout=None):
+        self._cache.clear()
+        facilities = ('sink', 'source', 'card', 'module', 'server')
+        batch = self.batch()
+        batch._subscribe(self._subscription_mask())
+        batch.get_sink_info_list()
+        batch.get_source_info_list()
+        batch.get_card_info_list()
+        batch.get_module_info_list()
+        batch.get_server_info()
+        results = batch.execute(timeout)
+        for (facility, values) in zip(facilities, results[1:]):
+            for value in values:
+                self._cache.update(facility, value)
+        self._cache.populated = True
 
     @wait_callback('_context_index_cb')
-    def load_module(self, module_name, module_args={}):
+    def load_module(self, module_name, module_args={}, cb=None, userdata=None):
         """
         Load a pulseaudio module.
 
         :param module_name: a valid module name.  See also:: :meth:`get_module_info_list`
         :type module name: string
-        :param module_args: a dictionary that defines the arguments to be passed and their values.
-            These must be valid in the context of the module being loaded.  No error checking
-            is performed.
-        :type module_args: dictionary
-        :return: module index number assigned for newly loaded module
+        :param module_args: a dictionary that defines the arguments to be passed and their values,
+            or a module argument string.  These must be valid in the context of the module being
+            loaded.  No error checking is performed.  Values are quoted as needed.
+        :type module_args: dictionary or string
+        :return: module index number assigned for newly loaded module, or
+            INVALID_INDEX if the module failed to load
         :rtype: a list containing module index integer
         """
-        # Convert module args dict to a string of form "arg1=val1 ..."
-        args = ' '.join([str(i) + '=' + str(module_args[i])
-                         for i in module_args.keys()])
-        self._load_module = pa_context_index_cb_t(self._context_index_cb)
-        pa_context_load_module(self._context,
-                               module_name,
-                               args,
-                               self._load_module,
-                               None)
-
+        if (isinstance(module_args, dict)):
+            args = format_module_argument(module_args)
+        else:
+            args = module_args
+        return self._lib.pa_context_load_module(self._context,
+                                                module_name,
+                                                args,
+                                                cb,
+                                                userdata)
+
+    @cached('card')
     @wait_callback('_card_info_cb')
-    def get_card_info_list(self):
+    def get_card_info_list(self, cb=None, userdata=None):
         """
         Obtain a list of all available card_info entries.  Supported
         fields are:
         - name
         - index
         - profiles each containing profile name, description,
-            n_sinks and n_sources
+            n_sinks, n_sources, priority and availability
+        - ports each containing port name, description, priority,
+            availability, direction and profile names
         - active_profile
 
         :return: cards and an associated card profile list per card
         :rtype: list of dict items with one dict per card
         """
-        self._get_card_info_list = pa_card_info_cb_t(self._card_info_cb)
-        pa_context_get_card_info_list(self._context,
-                                      self._get_card_info_list,
-                                      None)
+        return self._lib.pa_context_get_card_info_list(self._context,
+                                                       cb,
+                                                       userdata)
 
+    def iter_card_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_card_info_list` which yields each
+        card as soon as it is received from the server, rather than buffering
+        the complete list first.  Closing the generator early cancels the
+        server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: card information
+        :rtype: iterator of dict items, with one dict per card
+        """
+        return self._iter_info('get_card_info_list', timeout)
+
+    @cached('card', 'index')
     @wait_callback('_card_info_cb')
-    def get_card_info_by_index(self, index):
+    def get_card_info_by_index(self, index, cb=None, userdata=None):
         """
         Obtain card_info entry.  Supported fields are:
         - name
         - index
         - profiles each containing profile name, description,
-            n_sinks and n_sources
+            n_sinks, n_sources, priority and availability
+        - ports each containing port name, description, priority,
+            availability, direction and profile names
 
         :param name: Card index
         :type name: integer
         :return: card info and card profile list
         :rtype: list containing single dict item
         """
-        self._get_card_info_by_index = pa_card_info_cb_t(self._card_info_cb)
-        pa_context_get_card_info_by_index(self._context,
-                                          index,
-                                          self._get_card_info_by_index,
-                                          None)
+        return self._lib.pa_context_get_card_info_by_index(self._context,
+                                                           index,
+                                                           cb,
+                                                           userdata)
 
+    @cached('card', 'name')
     @wait_callback('_card_info_cb')
-    def get_card_info_by_name(self, name):
+    def get_card_info_by_name(self, name, cb=None, userdata=None):
         """
         Obtain card_info entry.  Supported fields are:
         - name
         - index
         - profiles each containing profile name, description,
-            n_sinks and n_sources
+            n_sinks, n_sources, priority and availability
+        - ports each containing port name, description, priority,
+            availability, direction and profile names
 
         :param name: Card name
         :type name: string
         :return: card info and card profile list
         :rtype: list containing single dict item
         """
-        self._get_card_info_by_name = pa_card_info_cb_t(self._card_info_cb)
-        pa_context_get_card_info_by_name(self._context,
-                                         name,
-                                         self._get_card_info_by_name,
-                                         None)
+        return self._lib.pa_context_get_card_info_by_name(self._context,
+                                                          name,
+                                                          cb,
+                                                          userdata)
 
+    @cached('sink')
     @wait_callback('_sink_info_cb')
-    def get_sink_info_list(self):
+    def get_sink_info_list(self, cb=None, userdata=None):
         """
         Obtain a list of all available sinks.  Supported
         fields are:
@@ -261,13 +1322,28 @@ class PulseAudio(object):
         :return: sink information
         :rtype: list of dict items, with one dict per sink
         """
-        self._get_sink_info_list = pa_sink_info_cb_t(self._sink_info_cb)
-        pa_context_get_sink_info_list(self._context,
-                                      self._get_sink_info_list,
-                                      None)
+        return self._lib.pa_context_get_sink_info_list(self._context,
+                                                       cb,
+                                                       userdata)
+
+    def iter_sink_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_sink_info_list` which yields each
+        sink as soon as it is received from the server, rather than buffering
+        the complete list first.  Closing the generator early cancels the
+        server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: sink information
+        :rtype: iterator of dict items, with one dict per sink
+        """
+        return self._iter_info('get_sink_info_list', timeout)
 
+    @cached('sink', 'index')
     @wait_callback('_sink_info_cb')
-    def get_sink_info_by_index(self, index):
+    def get_sink_info_by_index(self, index, cb=None, userdata=None):
         """
         Obtain sink info by index.  Supported fields are:
         - name
@@ -288,14 +1364,14 @@ class PulseAudio(object):
         :return: sink information
         :rtype: list with single dict item
         """
-        self._get_sink_info_by_index = pa_sink_info_cb_t(self._sink_info_cb)
-        pa_context_get_sink_info_by_index(self._context,
-                                          index,
-                                          self._get_sink_info_by_index,
-                                          None)
+        return self._lib.pa_context_get_sink_info_by_index(self._context,
+                                                           index,
+                                                           cb,
+                                                           userdata)
 
+    @cached('sink', 'name')
     @wait_callback('_sink_info_cb')
-    def get_sink_info_by_name(self, name):
+    def get_sink_info_by_name(self, name, cb=None, userdata=None):
         """
         Obtain sink info by name.  Supported fields are:
         - name
@@ -316,14 +1392,14 @@ class PulseAudio(object):
         :return: sink information
         :rtype: list with single dict item
         """
-        self._get_sink_info_by_name = pa_sink_info_cb_t(self._sink_info_cb)
-        pa_context_get_sink_info_by_name(self._context,
-                                         name,
-                                         self._get_sink_info_by_name,
-                                         None)
+        return self._lib.pa_context_get_sink_info_by_name(self._context,
+                                                          name,
+                                                          cb,
+                                                          userdata)
 
+    @cached('source')
     @wait_callback('_source_info_cb')
-    def get_source_info_list(self):
+    def get_source_info_list(self, cb=None, userdata=None):
         """
         Obtain a list of all available sources.  Supported
         fields are:
@@ -336,18 +1412,34 @@ class PulseAudio(object):
         - configured_latency
         - monitor_of_sink
         - monitor_of_sink_name
+        - volume levels per channel
         - state enum
 
         :return: source information
         :rtype: list of dict items, with one dict per source
         """
-        self._get_source_info_list = pa_source_info_cb_t(self._source_info_cb)
-        pa_context_get_source_info_list(self._context,
-                                        self._get_source_info_list,
-                                        None)
+        return self._lib.pa_context_get_source_info_list(self._context,
+                                                         cb,
+                                                         userdata)
 
+    def iter_source_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_source_info_list` which yields each
+        source as soon as it is received from the server, rather than buffering
+        the complete list first.  Closing the generator early cancels the
+        server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: source information
+        :rtype: iterator of dict items, with one dict per source
+        """
+        return self._iter_info('get_source_info_list', timeout)
+
+    @cached('source', 'index')
     @wait_callback('_source_info_cb')
-    def get_source_info_by_index(self, index):
+    def get_source_info_by_index(self, index, cb=None, userdata=None):
         """
         Obtain source info by index.  Supported fields are:
         - name
@@ -359,6 +1451,7 @@ class PulseAudio(object):
         - configured_latency
         - monitor_of_sink
         - monitor_of_sink_name
+        - volume levels per channel
         - state enum
 
         :param index: source index
@@ -366,14 +1459,14 @@ class PulseAudio(object):
         :return: source information
         :rtype: list of single dict item
         """
-        self._get_source_info_by_index = pa_source_info_cb_t(self._source_info_cb)
-        pa_context_get_source_info_by_index(self._context,
-                                            index,
-                                            self._get_source_info_by_index,
-                                            None)
+        return self._lib.pa_context_get_source_info_by_index(self._context,
+                                                             index,
+                                                             cb,
+                                                             userdata)
 
+    @cached('source', 'name')
     @wait_callback('_source_info_cb')
-    def get_source_info_by_name(self, name):
+    def get_source_info_by_name(self, name, cb=None, userdata=None):
         """
         Obtain source info by name.  Supported fields are:
         - name
@@ -385,6 +1478,7 @@ class PulseAudio(object):
         - configured_latency
         - monitor_of_sink
         - monitor_of_sink_name
+        - volume levels per channel
         - state enum
 
         :param name: source name
@@ -392,14 +1486,308 @@ class PulseAudio(object):
         :return: source information
         :rtype: list of single dict item
         """
-        self._get_source_info_by_name = pa_source_info_cb_t(self._source_info_cb)
-        pa_context_get_source_info_by_name(self._context,
-                                           name,
-                                           self._get_source_info_by_name,
-                                           None)
+        return self._lib.pa_context_get_source_info_by_name(self._context,
+                                                            name,
+                                                            cb,
+                                                            userdata)
+
+    @wait_callback('_sink_input_info_cb')
+    def get_sink_input_info_list(self, cb=None, userdata=None):
+        """
+        Obtain a list of all sink inputs.  Supported fields are:
+        - name
+        - index
+        - owner_module (index)
+        - client (index)
+        - sink (index)
+        - volume levels per channel
+        - buffer_latency
+        - sink_latency
+        - driver
+        - mute boolean
+        - corked boolean
+
+        :return: sink input information
+        :rtype: list of dict items, with one dict per sink input
+        """
+        return self._lib.pa_context_get_sink_input_info_list(self._context,
+                                                             cb,
+                                                             userdata)
+
+    def iter_sink_input_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_sink_input_info_list` which yields each
+        sink input as soon as it is received from the server, rather than
+        buffering the complete list first.  Closing the generator early cancels
+        the server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: sink input information
+        :rtype: iterator of dict items, with one dict per sink input
+        """
+        return self._iter_info('get_sink_input_info_list', timeout)
+
+    @wait_callback('_sink_input_info_cb')
+    def get_sink_input_info(self, index, cb=None, userdata=None):
+        """
+        Obtain sink input info by index.  Supported fields are:
+        - name
+        - index
+        - owner_module (index)
+        - client (index)
+        - sink (index)
+        - volume levels per channel
+        - buffer_latency
+        - sink_latency
+        - driver
+        - mute boolean
+        - corked boolean
+
+        :param index: sink input index
+        :type index: integer
+        :return: sink input information
+        :rtype: list of single dict item
+        """
+        return self._lib.pa_context_get_sink_input_info(self._context,
+                                                        index,
+                                                        cb,
+                                                        userdata)
+
+    @wait_callback('_context_success_cb')
+    def move_sink_input_by_index(self, index, sink_index, cb=None, userdata=None):
+        """
+        Move a sink input to another sink, identified by index.
+
+        :param index: index of sink input
+        :type index: integer
+        :param sink_index: index of sink
+            See also:: :meth:`get_sink_info_list`
+        :type sink_index: integer
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_move_sink_input_by_index(self._context,
+                                                             index,
+                                                             sink_index,
+                                                             cb,
+                                                             userdata)
+
+    @wait_callback('_context_success_cb')
+    def move_sink_input_by_name(self, index, sink_name, cb=None, userdata=None):
+        """
+        Move a sink input to another sink, identified by name.
+
+        :param index: index of sink input
+        :type index: integer
+        :param sink_name: name of sink
+            See also:: :meth:`get_sink_info_list`
+        :type sink_name: string
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_move_sink_input_by_name(self._context,
+                                                            index,
+                                                            sink_name,
+                                                            cb,
+                                                            userdata)
+
+    @wait_callback('_context_success_cb')
+    def kill_sink_input(self, index, cb=None, userdata=None):
+        """
+        Disconnect a sink input, terminating its stream.
+
+        :param index: index of sink input
+        :type index: integer
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_kill_sink_input(self._context,
+                                                    index,
+                                                    cb,
+                                                    userdata)
 
+    @wait_callback('_source_output_info_cb')
+    def get_source_output_info_list(self, cb=None, userdata=None):
+        """
+        Obtain a list of all source outputs.  Supported fields are:
+        - name
+        - index
+        - owner_module (index)
+        - client (index)
+        - source (index)
+        - volume levels per channel
+        - buffer_latency
+        - source_latency
+        - driver
+        - mute boolean
+        - corked boolean
+
+        :return: source output information
+        :rtype: list of dict items, with one dict per source output
+        """
+        return self._lib.pa_context_get_source_output_info_list(self._context,
+                                                                cb,
+                                                                userdata)
+
+    def iter_source_output_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_source_output_info_list` which yields each
+        source output as soon as it is received from the server, rather than
+        buffering the complete list first.  Closing the generator early cancels
+        the server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: source output information
+        :rtype: iterator of dict items, with one dict per source output
+        """
+        return self._iter_info('get_source_output_info_list', timeout)
+
+    @wait_callback('_source_output_info_cb')
+    def get_source_output_info(self, index, cb=None, userdata=None):
+        """
+        Obtain source output info by index.  Supported fields are:
+        - name
+        - index
+        - owner_module (index)
+        - client (index)
+        - source (index)
+        - volume levels per channel
+        - buffer_latency
+        - source_latency
+        - driver
+        - mute boolean
+        - corked boolean
+
+        :param index: source output index
+        :type index: integer
+        :return: source output information
+        :rtype: list of single dict item
+        """
+        return self._lib.pa_context_get_source_output_info(self._context,
+                                                           index,
+                                                           cb,
+                                                           userdata)
+
+    @wait_callback('_context_success_cb')
+    def move_source_output_by_index(self, index, source_index, cb=None, userdata=None):
+        """
+        Move a source output to another source, identified by index.
+
+        :param index: index of source output
+        :type index: integer
+        :param source_index: index of source
+            See also:: :meth:`get_source_info_list`
+        :type source_index: integer
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_move_source_output_by_index(self._context,
+                                                                index,
+                                                                source_index,
+                                                                cb,
+                                                                userdata)
+
+    @wait_callback('_context_success_cb')
+    def move_source_output_by_name(self, index, source_name, cb=None, userdata=None):
+        """
+        Move a source output to another source, identified by name.
+
+        :param index: index of source output
+        :type index: integer
+        :param source_name: name of source
+            See also:: :meth:`get_source_info_list`
+        :type source_name: string
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_move_source_output_by_name(self._context,
+                                                               index,
+                                                               source_name,
+                                                               cb,
+                                                               userdata)
+
+    @wait_callback('_context_success_cb')
+    def kill_source_output(self, index, cb=None, userdata=None):
+        """
+        Disconnect a source output, terminating its stream.
+
+        :param index: index of source output
+        :type index: integer
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_kill_source_output(self._context,
+                                                       index,
+                                                       cb,
+                                                       userdata)
+
+    def move_sink_inputs(self, predicate, sink, timeout=None):
+        """
+        Move every sink input for which the predicate holds to a sink, e.g.
+        for failing over all streams of a sink that has gone away::
+
+            pulse.move_sink_inputs(lambda i: i['sink'] == 3, 'backup_sink')
+
+        The sink inputs are listed once and all of the moves are then sent
+        before waiting on any of them.
+
+        :param predicate: function called with each sink input's information,
+            returning True for those to be moved
+        :type predicate: callable
+        :param sink: index or name of the destination sink
+        :type sink: integer or string
+        :param timeout: time in seconds allowed for listing and for moving,
+            each, defaults to the instance timeout
+        :type timeout: float
+        :return: success status per sink input moved, keyed by index
+        :rtype: dict
+        """
+        return self._move_streams('sink_input', predicate, sink, timeout)
+
+    def move_source_outputs(self, predicate, source, timeout=None):
+        """
+        Move every source output for which the predicate holds to a source.
+        See also:: :meth:`move_sink_inputs`
+
+        :param predicate: function called with each source output's
+            information, returning True for those to be moved
+        :type predicate: callable
+        :param source: index or name of the destination source
+        :type source: integer or string
+        :param timeout: time in seconds allowed for listing and for moving,
+            each, defaults to the instance timeout
+        :type timeout: float
+        :return: success status per source output moved, keyed by index
+        :rtype: dict
+        """
+        return self._move_streams('source_output', predicate, source, timeout)
+
+    def _move_streams(self, kind, predicate, target, timeout):
+        streams = getattr(self, 'get_%s_info_list' % kind)(timeout=timeout)
+        if (streams is None):
+            return None
+        key = 'index' if isinstance(target, int) else 'name'
+        batch = self.batch()
+        indexes = []
+        for stream in streams:
+            if (predicate(stream)):
+                getattr(batch, 'move_%s_by_%s' % (kind, key))(stream['index'], target)
+                indexes.append(stream['index'])
+        if (not indexes):
+            return {}
+        results = batch.execute(timeout)
+        if (results is None):
+            return None
+        return dict((index, bool(result and result[0]))
+                    for (index, result) in zip(indexes, results))
+
+    @cached('module')
     @wait_callback('_module_info_cb')
-    def get_module_info_list(self):
+    def get_module_info_list(self, cb=None, userdata=None):
         """
         Obtain a list of all available sources.  Supported
         fields are:
@@ -411,13 +1799,28 @@ class PulseAudio(object):
         :return: module information
         :rtype: list of dict items, with one dict per module
         """
-        self._get_module_info_list = pa_module_info_cb_t(self._module_info_cb)
-        pa_context_get_module_info_list(self._context,
-                                        self._get_module_info_list,
-                                        None)
+        return self._lib.pa_context_get_module_info_list(self._context,
+                                                         cb,
+                                                         userdata)
+
+    def iter_module_info(self, timeout=None):
+        """
+        Generator variant of :meth:`get_module_info_list` which yields each
+        module as soon as it is received from the server, rather than buffering
+        the complete list first.  Closing the generator early cancels the
+        server operation.
+
+        :param timeout: time in seconds allowed for the complete list, defaults
+            to the instance timeout
+        :type timeout: float
+        :return: module information
+        :rtype: iterator of dict items, with one dict per module
+        """
+        return self._iter_info('get_module_info_list', timeout)
 
+    @cached('module', 'index')
     @wait_callback('_module_info_cb')
-    def get_module_info(self, index):
+    def get_module_info(self, index, cb=None, userdata=None):
         """
         Obtain module info by module index.  Supported fields are:
         - name
@@ -430,14 +1833,195 @@ class PulseAudio(object):
         :return: module information
         :rtype: list of single dict item
         """
-        self._get_module_info = pa_module_info_cb_t(self._module_info_cb)
-        pa_context_get_module_info(self._context,
-                                   index,
-                                   self._get_module_info,
-                                   None)
+        return self._lib.pa_context_get_module_info(self._context,
+                                                    index,
+                                                    cb,
+                                                    userdata)
+
+    def snapshot(self, timeout=None):
+        """
+        Capture the server information, cards, sinks, sources and modules
+        in a single round trip.  See also:: :mod:`pypulseaudio.snapshot`
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        :return: the topology, or None if not connected
+        :rtype: :class:`pypulseaudio.snapshot.Snapshot`
+        """
+        batch = self.batch()
+        batch.get_server_info()
+        batch.get_card_info_list()
+        batch.get_sink_info_list()
+        batch.get_source_info_list()
+        batch.get_module_info_list()
+        results = batch.execute(timeout)
+        if (results is None):
+            return None
+        return Snapshot(dict(zip(('server', 'card', 'sink', 'source', 'module'),
+                                 results)))
+
+    def find_modules(self, name, args=None, timeout=None):
+        """
+        Find the loaded modules of a name whose arguments include all of
+        those given, e.g.::
+
+            pulse.find_modules('module-null-sink', {'sink_name': 'x'})
+
+        When the object cache is enabled the lookup is answered from its
+        module index without contacting the server.
+
+        :param name: module name
+        :type name: string
+        :param args: module arguments to match, values being compared as strings
+        :type args: dict
+        :return: matching modules in index order
+        :rtype: list of dict items
+        """
+        if (self._cache is not None and self._cache.populated):
+            with self._locked():
+                self._dispatch_pending()
+                return copy_entry(self._cache.modules.find(name, **(args or {})))
+        modules = self.get_module_info_list(timeout=timeout)
+        if (modules is None):
+            return None
+        return ModuleRegistry(modules).find(name, **(args or {}))
+
+    @wait_callback('_sample_info_cb')
+    def get_sample_info_list(self, cb=None, userdata=None):
+        """
+        Obtain a list of all samples in the server's sample cache.  Supported
+        fields are:
+        - name
+        - index
+        - volume levels per channel
+        - rate
+        - channels
+        - duration
+        - bytes
+        - lazy boolean
+        - filename (lazy samples only)
+
+        :return: sample information
+        :rtype: list of dict items, with one dict per sample
+        """
+        return self._lib.pa_context_get_sample_info_list(self._context,
+                                                         cb,
+                                                         userdata)
+
+    @wait_callback('_sample_info_cb')
+    def get_sample_info_by_index(self, index, cb=None, userdata=None):
+        """
+        Obtain sample info by index.  Supported fields are:
+        - name
+        - index
+        - volume levels per channel
+        - rate
+        - channels
+        - duration
+        - bytes
+        - lazy boolean
+        - filename (lazy samples only)
+
+        :param index: sample index
+        :type index: integer
+        :return: sample information
+        :rtype: list of single dict item
+        """
+        return self._lib.pa_context_get_sample_info_by_index(self._context,
+                                                             index,
+                                                             cb,
+                                                             userdata)
+
+    @wait_callback('_sample_info_cb')
+    def get_sample_info_by_name(self, name, cb=None, userdata=None):
+        """
+        Obtain sample info by name.  Supported fields are:
+        - name
+        - index
+        - volume levels per channel
+        - rate
+        - channels
+        - duration
+        - bytes
+        - lazy boolean
+        - filename (lazy samples only)
+
+        :param name: sample name
+        :type name: string
+        :return: sample information
+        :rtype: list of single dict item
+        """
+        return self._lib.pa_context_get_sample_info_by_name(self._context,
+                                                            name,
+                                                            cb,
+                                                            userdata)
+
+    def upload_sample(self, name, data, rate=44100, channels=2, format='s16le',
+                      timeout=None):
+        """
+        Upload a sample into the server's sample cache, from where it may be
+        played any number of times with :meth:`play_sample`.  A sample of the
+        same name is replaced.  See also:: :class:`pypulseaudio.samples.SampleCache`
+
+        :param name: sample name
+        :type name: string
+        :param data: audio data
+        :type data: buffer, e.g. bytes, bytearray or numpy array
+        :param rate: sample rate in Hz
+        :type rate: int
+        :param channels: number of channels
+        :type channels: int
+        :param format: sample format, see also:: :data:`pypulseaudio.stream.sample_formats`
+        :type format: string
+        :param timeout: time in seconds allowed for the whole upload, defaults
+            to the instance timeout
+        :type timeout: float
+        """
+        UploadStream(self, name, rate, channels, format).upload(data, timeout)
+
+    @wait_callback('_context_success_cb')
+    def play_sample(self, name, device=None, volume=None, cb=None, userdata=None):
+        """
+        Play a sample from the server's sample cache, which takes a single
+        small request.
+
+        :param name: sample name
+        :type name: string
+        :param device: name of the sink, None for the default sink
+        :type device: string
+        :param volume: pa_volume_t value, None for the sample's own volume
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        if (volume is None):
+            volume = PA_VOLUME_INVALID
+        return self._lib.pa_context_play_sample(self._context,
+                                                name,
+                                                device,
+                                                volume,
+                                                cb,
+                                                userdata)
 
+    @wait_callback('_context_success_cb')
+    def remove_sample(self, name, cb=None, userdata=None):
+        """
+        Remove a sample from the server's sample cache.
+
+        :param name: sample name
+        :type name: string
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_remove_sample(self._context,
+                                                  name,
+                                                  cb,
+                                                  userdata)
+
+    @cached('server')
     @wait_callback('_server_info_cb')
-    def get_server_info(self):
+    def get_server_info(self, cb=None, userdata=None):
         """
         Obtain server info.  Supported fields are:
         - user_name
@@ -449,13 +2033,12 @@ class PulseAudio(object):
         :return: server information
         :rtype: list of single dict item
         """
-        self._get_server_info = pa_server_info_cb_t(self._server_info_cb)
-        pa_context_get_server_info(self._context,
-                                   self._get_server_info,
-                                   None)
+        return self._lib.pa_context_get_server_info(self._context,
+                                                    cb,
+                                                    userdata)
 
     @wait_callback('_context_success_cb')
-    def unload_module(self, index):
+    def unload_module(self, index, cb=None, userdata=None):
         """
         Unload a pulseaudio module.
 
@@ -464,14 +2047,13 @@ class PulseAudio(object):
         :return: success status
         :rtype: a list containing 1=>success, 0=>failure
         """
-        self._unload_module = pa_context_success_cb_t(self._context_success_cb)
-        pa_context_unload_module(self._context,
-                                 index,
-                                 self._unload_module,
-                                 None)
+        return self._lib.pa_context_unload_module(self._context,
+                                                  index,
+                                                  cb,
+                                                  userdata)
 
     @wait_callback('_context_success_cb')
-    def set_card_profile_by_index(self, index, profile):
+    def set_card_profile_by_index(self, index, profile, cb=None, userdata=None):
         """
         Set card profile by profile index.
 
@@ -483,15 +2065,14 @@ class PulseAudio(object):
         :return: success status
         :rtype: a list containing 1=>success, 0=>failure
         """
-        self._set_card_profile_by_index = pa_context_success_cb_t(self._context_success_cb)
-        pa_context_set_card_profile_by_index(self._context,
-                                             index,
-                                             profile,
-                                             self._set_card_profile_by_index,
-                                             None)
+        return self._lib.pa_context_set_card_profile_by_index(self._context,
+                                                              index,
+                                                              profile,
+                                                              cb,
+                                                              userdata)
 
     @wait_callback('_context_success_cb')
-    def set_card_profile_by_name(self, name, profile):
+    def set_card_profile_by_name(self, name, profile, cb=None, userdata=None):
         """
         Set card profile by profile index.
 
@@ -503,15 +2084,53 @@ class PulseAudio(object):
         :return: success status
         :rtype: a list containing 1=>success, 0=>failure
         """
-        self._set_card_profile_by_name = pa_context_success_cb_t(self._context_success_cb)
-        pa_context_set_card_profile_by_name(self._context,
-                                            name,
-                                            profile,
-                                            self._set_card_profile_by_name,
-                                            None)
+        return self._lib.pa_context_set_card_profile_by_name(self._context,
+                                                             name,
+                                                             profile,
+                                                             cb,
+                                                             userdata)
+
+    def select_card_profile(self, card, output_channels=0, input_channels=0,
+                            timeout=None):
+        """
+        Switch a card to its best available profile meeting a requirement,
+        e.g. duplex with at least two output channels::
+
+            pulse.select_card_profile('bluez_card.00_11_22_33_44_55',
+                                      output_channels=2, input_channels=1)
+
+        The profile is chosen from the card's information, which is read
+        from the object cache when enabled, and set with a single operation,
+        or none if already active.  See also:: :func:`pypulseaudio.profiles.choose_profile`
+
+        :param card: card name or index
+        :type card: string or integer
+        :param output_channels: minimum output channels, 0 if output is not required
+        :type output_channels: integer
+        :param input_channels: minimum input channels, 0 if input is not required
+        :type input_channels: integer
+        :return: name of the profile set, or None if no profile meets the requirement
+        :rtype: string
+        """
+        if (isinstance(card, int)):
+            info = self.get_card_info_by_index(card, timeout=timeout)
+        else:
+            info = self.get_card_info_by_name(card, timeout=timeout)
+        if (not info):
+            raise Exception('No such card: %s' % card)
+        profile = choose_profile(info[0], output_channels, input_channels)
+        if (profile is None):
+            return None
+        if (profile['name'] != info[0]['active_profile']):
+            result = self.set_card_profile_by_index(info[0]['index'], profile['name'],
+                                                    timeout=timeout)
+            if (not result or not result[0]):
+                raise Exception('Failed to set profile %s of card %s' %
+                                (profile['name'], card))
+        return profile['name']
 
     @wait_callback('_context_success_cb')
-    def set_default_source(self, name):
+    def set_default_source(self, name, cb=None, userdata=None):
         """
         Set default source by name.
 
@@ -520,14 +2139,13 @@ class PulseAudio(object):
         :return: success status
         :rtype: a list containing 1=>success, 0=>failure
         """
-        self._set_default_source = pa_context_success_cb_t(self._context_success_cb)
-        pa_context_set_default_source(self._context,
-                                      name,
-                                      self._set_default_source,
-                                      None)
+        return self._lib.pa_context_set_default_source(self._context,
+                                                       name,
+                                                       cb,
+                                                       userdata)
 
     @wait_callback('_context_success_cb')
-    def set_default_sink(self, name):
+    def set_default_sink(self, name, cb=None, userdata=None):
         """
         Set default sink by name.
 
@@ -536,108 +2154,384 @@ class PulseAudio(object):
         :return: success status
         :rtype: a list containing 1=>success, 0=>failure
         """
-        self._set_default_source = pa_context_success_cb_t(self._context_success_cb)
-        pa_context_set_default_sink(self._context,
-                                    name,
-                                    self._set_default_source,
-                                    None)
+        return self._lib.pa_context_set_default_sink(self._context,
+                                                     name,
+                                                     cb,
+                                                     userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_volume_by_index(self, index, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a sink by index.
+
+        :param index: index of sink
+        :type index: integer
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_volume_by_index(self._context,
+                                                             index,
+                                                             self._cvolume(volume),
+                                                             cb,
+                                                             userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_mute_by_index(self, index, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a sink by index.
+
+        :param index: index of sink
+        :type index: integer
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_mute_by_index(self._context,
+                                                           index,
+                                                           1 if mute else 0,
+                                                           cb,
+                                                           userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_volume_by_name(self, name, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a sink by name.
+
+        :param name: name of sink
+        :type name: string
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_volume_by_name(self._context,
+                                                            name,
+                                                            self._cvolume(volume),
+                                                            cb,
+                                                            userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_mute_by_name(self, name, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a sink by name.
+
+        :param name: name of sink
+        :type name: string
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_mute_by_name(self._context,
+                                                          name,
+                                                          1 if mute else 0,
+                                                          cb,
+                                                          userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_volume_by_index(self, index, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a source by index.
+
+        :param index: index of source
+        :type index: integer
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_volume_by_index(self._context,
+                                                               index,
+                                                               self._cvolume(volume),
+                                                               cb,
+                                                               userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_mute_by_index(self, index, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a source by index.
+
+        :param index: index of source
+        :type index: integer
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_mute_by_index(self._context,
+                                                             index,
+                                                             1 if mute else 0,
+                                                             cb,
+                                                             userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_volume_by_name(self, name, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a source by name.
+
+        :param name: name of source
+        :type name: string
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_volume_by_name(self._context,
+                                                              name,
+                                                              self._cvolume(volume),
+                                                              cb,
+                                                              userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_mute_by_name(self, name, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a source by name.
+
+        :param name: name of source
+        :type name: string
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_mute_by_name(self._context,
+                                                            name,
+                                                            1 if mute else 0,
+                                                            cb,
+                                                            userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_input_volume(self, index, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a sink input.
+
+        :param index: index of sink input
+        :type index: integer
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_input_volume(self._context,
+                                                          index,
+                                                          self._cvolume(volume),
+                                                          cb,
+                                                          userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_sink_input_mute(self, index, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a sink input.
+
+        :param index: index of sink input
+        :type index: integer
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_sink_input_mute(self._context,
+                                                        index,
+                                                        1 if mute else 0,
+                                                        cb,
+                                                        userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_output_volume(self, index, volume, cb=None, userdata=None):
+        """
+        Set the per-channel volume of a source output.
+
+        :param index: index of source output
+        :type index: integer
+        :param volume: volume per channel as pa_volume_t values
+            See also:: :mod:`pypulseaudio.volume`
+        :type volume: list of int
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_output_volume(self._context,
+                                                             index,
+                                                             self._cvolume(volume),
+                                                             cb,
+                                                             userdata)
+
+    @wait_callback('_context_success_cb')
+    def set_source_output_mute(self, index, mute, cb=None, userdata=None):
+        """
+        Set the mute state of a source output.
+
+        :param index: index of source output
+        :type index: integer
+        :param mute: True to mute, False to unmute
+        :type mute: bool
+        :return: success status
+        :rtype: a list containing 1=>success, 0=>failure
+        """
+        return self._lib.pa_context_set_source_output_mute(self._context,
+                                                           index,
+                                                           1 if mute else 0,
+                                                           cb,
+                                                           userdata)
+
+    def set_volumes(self, targets, gains, scale='db', timeout=None):
+        """
+        Set the per-channel volumes of many sinks, sources, sink inputs and
+        source outputs at once, sending all of the operations before waiting
+        on any of them.  The gains of all targets are converted together,
+        see also:: :mod:`pypulseaudio.volume`.
+
+        :param targets: (facility, index) tuples, facility being one of
+            'sink', 'source', 'sink_input' or 'source_output'
+        :type targets: list
+        :param gains: for each target, in the same order, a gain per channel,
+            e.g. a list of lists or a 2-D numpy array
+        :type gains: sequence of sequences of float
+        :param scale: 'db' or 'linear' gains, or 'volume' for pa_volume_t values
+        :type scale: string
+        :param timeout: time in seconds allowed for all operations to
+            complete, defaults to the instance timeout
+        :type timeout: float
+        :return: success status per target
+        :rtype: list of bool
+        """
+        rows = [list(row) for row in gains]
+        if (len(rows) != len(targets)):
+            raise Exception('Expected gains for %d targets, got %d' %
+                            (len(targets), len(rows)))
+        volumes = converters[scale]([gain for row in rows for gain in row])
+        batch = self.batch()
+        start = 0
+        for ((facility, index), row) in zip(targets, rows):
+            setter = getattr(batch, volume_setters[facility])
+            setter(index, volumes[start:start + len(row)])
+            start += len(row)
+        results = batch.execute(timeout)
+        if (results is None):
+            return None
+        return [bool(result and result[0]) for result in results]
+
+    def _cvolume(self, volume):
+        """
+        Build a pa_cvolume from a list of per-channel pa_volume_t values.
+        """
+        if (not 0 < len(volume) <= PA_CHANNELS_MAX):
+            raise Exception('Invalid number of volume channels: %d' % len(volume))
+        cvolume = self._lib.pa_cvolume()
+        cvolume.channels = len(volume)
+        for (i, value) in enumerate(volume):
+            cvolume.values[i] = value
+        return cvolume
 
     def _state_changed_cb(self, context, userdata):
-        state = pa_context_get_state(context)
+        state = self._lib.pa_context_get_state(context)
         self.state = state
-
-    @callback
+        if (self._threaded):
+            self._lib.pa_threaded_mainloop_signal(self._main_loop, 0)
+
+    def _subscription_cb(self, context, event_type, index, userdata):
+        code = event_type & PA_SUBSCRIPTION_EVENT_FACILITY_MASK
+        kind = event_type & PA_SUBSCRIPTION_EVENT_TYPE_MASK
+        facility = facility_map.get(code)
+        if (self._cache is not None and
+            (facility == 'server' or facility in self._cache_fetch)):
+            self._update_cache(facility, kind, index)
+        if (self._subscriptions and facility is not None):
+            event = Event(facility, event_type_map.get(kind), index)
+            now = monotonic()
+            for subscription in self._subscriptions:
+                if (subscription.mask & (1 << code)):
+                    subscription.add(event, now)
+            if (self._threaded):
+                self._lib.pa_threaded_mainloop_signal(self._main_loop, 0)
+
+    def _update_cache(self, facility, event, index):
+        if (facility == 'server'):
+            op = self._lib.pa_context_get_server_info(self._context,
+                                                      self._cache_server_info,
+                                                      None)
+        elif (event == PA_SUBSCRIPTION_EVENT_REMOVE):
+            self._cache.remove(facility, index)
+            return
+        else:
+            (fetch, info_cb) = self._cache_fetch[facility]
+            op = fetch(self._context, index, info_cb, None)
+        if (op):
+            self._lib.pa_operation_unref(op)
+
+    def _cache_info_cb(self, facility):
+        decode = self._decoders[facility]
+        def info_cb(context, info, eol, userdata):
+            if (not eol):
+                self._cache.update(facility, decode(info.contents))
+        return info_cb
+
+    def _cache_server_info_cb(self, context, server_info, userdata):
+        self._cache.update('server', self._decoders['server'](server_info.contents))
+
+    @callback('pa_card_info_cb_t')
     def _card_info_cb(self, context, card_info, eol, user_data):
         if (eol):
             return (None, True)
-        ret = {}
-        ret['name'] = card_info.contents.name
-        ret['index'] = card_info.contents.index
-        profiles = cast(card_info.contents.profiles, POINTER(pa_card_profile_info))
-        ret['profiles'] = []
-        for i in range(card_info.contents.n_profiles):
-            ret['profiles'].append({'name': profiles[i].name,
-                                    'desc': profiles[i].description,
-                                    'n_sinks': profiles[i].n_sinks,
-                                    'n_sources': profiles[i].n_sources
-                                    })
-        active_profile = cast(card_info.contents.active_profile, POINTER(pa_card_profile_info))
-        if (hasattr(active_profile, 'contents') and
-            hasattr(active_profile.contents, 'name')):
-            ret['active_profile'] = active_profile.contents.name
-        else:
-            ret['active_profile'] = None
-        return (ret, False)
+        return (self._decoders['card'](card_info.contents), False)
 
-    @callback
+    @callback('pa_sink_info_cb_t')
     def _sink_info_cb(self, context, sink_info, eol, user_data):
         if (eol):
             return (None, True)
-        ret = {}
-        ret['name'] = sink_info.contents.name
-        ret['index'] = sink_info.contents.index
-        ret['card'] = sink_info.contents.card
-        ret['mute'] = True if sink_info.contents.mute else False
-        ret['latency'] = sink_info.contents.latency
-        ret['configured_latency'] = sink_info.contents.configured_latency
-        ret['monitor_source'] = sink_info.contents.monitor_source
-        ret['monitor_source_name'] = sink_info.contents.monitor_source_name
-        ret['volume'] = {}
-        ret['volume']['channels'] = sink_info.contents.volume.channels
-        ret['volume']['values'] = [sink_info.contents.volume.values[i]
-                                    for i in range(ret['volume']['channels'])]
-        ret['n_volume_steps'] = sink_info.contents.n_volume_steps
-        ret['state'] = sink_info.contents.state
-        ret['desc'] = sink_info.contents.description
-        return (ret, False)
-
-    @callback
+        return (self._decoders['sink'](sink_info.contents), False)
+
+    @callback('pa_source_info_cb_t')
     def _source_info_cb(self, context, source_info, eol, user_data):
         if (eol):
             return (None, True)
-        ret = {}
-        ret['name'] = source_info.contents.name
-        ret['index'] = source_info.contents.index
-        ret['card'] = source_info.contents.card
-        ret['desc'] = source_info.contents.description
-        ret['mute'] = True if source_info.contents.mute else False
-        ret['latency'] = source_info.contents.latency
-        ret['configured_latency'] = source_info.contents.configured_latency
-        ret['monitor_of_sink'] = source_info.contents.monitor_of_sink
-        ret['monitor_of_sink_name'] = source_info.contents.monitor_of_sink_name
-        return (ret, False)
-
-    @callback
+        return (self._decoders['source'](source_info.contents), False)
+
+    @callback('pa_sink_input_info_cb_t')
+    def _sink_input_info_cb(self, context, sink_input_info, eol, user_data):
+        if (eol):
+            return (None, True)
+        return (self._decoders['sink_input'](sink_input_info.contents), False)
+
+    @callback('pa_source_output_info_cb_t')
+    def _source_output_info_cb(self, context, source_output_info, eol, user_data):
+        if (eol):
+            return (None, True)
+        return (self._decoders['source_output'](source_output_info.contents), False)
+
+    @callback('pa_module_info_cb_t')
     def _module_info_cb(self, context, module_info, eol, user_data):
         if (eol):
             return (None, True)
-        ret = {}
-        ret['name'] = module_info.contents.name
-        ret['index'] = module_info.contents.index
-        ret['n_used'] = module_info.contents.n_used
-        if (module_info.contents.argument is not None):
-            ret['argument'] = {i[0]:i[1] for i in
-                          [i.split('=') for i in module_info.contents.argument.split()]}
-        else:
-            ret['argument'] = None
-        return (ret, False)
+        return (self._decoders['module'](module_info.contents), False)
 
-    @callback
+    @callback('pa_sample_info_cb_t')
+    def _sample_info_cb(self, context, sample_info, eol, user_data):
+        if (eol):
+            return (None, True)
+        return (self._decoders['sample'](sample_info.contents), False)
+
+    @callback('pa_server_info_cb_t')
     def _server_info_cb(self, context, server_info, user_data):
-        ret = {}
-        ret['user_name'] = server_info.contents.user_name
-        ret['host_name'] = server_info.contents.host_name
-        ret['server_version'] = server_info.contents.server_version
-        ret['server_name'] = server_info.contents.server_name
-        ret['default_sink_name'] = server_info.contents.default_sink_name
-        ret['default_source_name'] = server_info.contents.default_source_name
-        ret['cookie'] = server_info.contents.cookie
-        return (ret, True)
-
-    @callback
+        return (self._decoders['server'](server_info.contents), True)
+
+    @callback('pa_context_index_cb_t')
     def _context_index_cb(self, context, index, userdata):
-        return (c_int32(index).value, True)
+        if (index == PA_INVALID_INDEX):
+            return (INVALID_INDEX, True)
+        return (index, True)
 
-    @callback
+    @callback('pa_context_success_cb_t')
     def _context_success_cb(self, context, success, userdata):
         return (True if success else False, True)
+
+    @callback('pa_stream_success_cb_t')
+    def _stream_success_cb(self, stream, success, userdata):
+        return (True if success else False, True)
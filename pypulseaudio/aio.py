@@ -0,0 +1,259 @@
+"""
+asyncio front-end for pypulseaudio.  Requires Python 3.7 or later, and is
+not installed for earlier versions.
+"""
+from __future__ import unicode_literals
+
+import asyncio
+import select
+
+from ctypes import *
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout, issue_args, state_map
+from pypulseaudio.constants import *
+
+
+POLL_ERRORS = select.POLLERR | select.POLLHUP | select.POLLNVAL
+
+
+class pollfd(Structure):
+    _fields_ = [('fd', c_int),
+                ('events', c_short),
+                ('revents', c_short)]
+
+
+class AsyncPulseAudio(object):
+    """
+    Wrapper around :class:`pypulseaudio.PulseAudio` that drives the
+    pulseaudio main loop from an asyncio event loop, rather than blocking
+    the calling thread, so that one thread may serve many connections and
+    overlapping requests.
+
+    Every :class:`pypulseaudio.PulseAudio` method carrying out a single
+    server operation, i.e. the getters and setters, load_module(),
+    unload_module(), play_sample() and the like, is available as a
+    coroutine of the same name, taking the same arguments and returning the
+    same result, e.g.::
+
+        pulse = AsyncPulseAudio('myapp')
+        await pulse.connect()
+        sinks = await pulse.get_sink_info_list()
+
+    Methods built on several operations or on the blocking main loop, i.e.
+    the iter_* generators, batch(), process_events(), subscribe(),
+    snapshot(), find_modules(), select_card_profile(), set_volumes(),
+    move_sink_inputs(), move_source_outputs() and upload_sample(), are not
+    available.  Operations are sent as soon as their coroutine starts
+    running, hence coroutines gathered with :func:`asyncio.gather` are
+    pipelined, in place of batches.
+    Cancelling a coroutine cancels its server operation.  As with the
+    blocking methods, each coroutine accepts an optional timeout keyword
+    argument, in seconds, overriding the instance timeout, past which its
+    operation is cancelled and :class:`pypulseaudio.PulseAudioTimeout` is
+    raised.  Should the connection fail or terminate, every coroutine
+    awaiting an operation raises.
+
+    The pulseaudio main loop is bridged using its poll function: each
+    iteration records the file descriptors and timeout that the main loop
+    would block on, which are then watched by the asyncio event loop.
+
+    :param app_name: application name of the connection
+    :type app_name: string
+    :param loop: asyncio event loop, defaults to the loop running when the
+        instance is first used
+    :param options: further keyword arguments passed to
+        :class:`pypulseaudio.PulseAudio`, e.g. timeout or backend
+    """
+    def __init__(self, app_name, loop=None, **options):
+        self._pulse = PulseAudio(app_name, **options)
+        self._lib = self._pulse._lib
+        self._loop = loop
+        self._pending = {}
+        self._watched = {}
+        self._wanted = {}
+        self._timeout = -1
+        self._timer = None
+        self._scheduled = False
+        self._state_waiters = []
+        self._poll = self._lib.pa_poll_func(self._poll_cb)
+        self._lib.pa_mainloop_set_poll_func(self._pulse._main_loop, self._poll, None)
+
+    @property
+    def state(self):
+        """
+        Current pulseaudio context state.
+        """
+        return self._pulse.state
+
+    def __getattr__(self, name):
+        method = getattr(PulseAudio, name, None)
+        if (not hasattr(method, 'issue')):
+            if (method is not None and not name.startswith('_')):
+                raise AttributeError('%s is not available as a coroutine' % name)
+            raise AttributeError(name)
+        async def call(*args, timeout=None, **kwargs):
+            return await self._call(method.callback_name, method.issue,
+                                    issue_args(method.issue, args, kwargs),
+                                    timeout)
+        call.__name__ = name
+        call.__doc__ = method.issue.__doc__
+        return call
+
+    async def connect(self, server=None, flags=0, timeout=None):
+        """
+        Connect to a pulseaudio server.  Completes following the state
+        transition to PA_CONTEXT_READY.
+        See also:: :meth:`pypulseaudio.PulseAudio.connect`
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        """
+        waiter = self._wait_state(PA_CONTEXT_READY)
+        if server is not None:
+            if (not isinstance(server, bytes)):
+                server = server.encode('utf-8')
+            server = c_char_p(server)
+        self._lib.pa_context_connect(self._pulse._context, server, flags, None)
+        self._schedule()
+        await self._wait_for(waiter, timeout)
+
+    async def disconnect(self, timeout=None):
+        """
+        Disconnect the current pulseaudio connection context.  Completes
+        following the state transition to PA_CONTEXT_TERMINATED.
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        """
+        waiter = self._wait_state(PA_CONTEXT_TERMINATED)
+        self._lib.pa_context_disconnect(self._pulse._context)
+        self._schedule()
+        await self._wait_for(waiter, timeout)
+        self.close()
+
+    def close(self):
+        """
+        Stop watching the main loop's file descriptors and timers.
+        """
+        self._wanted = {}
+        self._timeout = -1
+        self._watch()
+
+    def _event_loop(self):
+        """
+        The asyncio event loop driving the main loop, which unless given
+        is the one running when the instance is first used.
+        """
+        if (self._loop is None):
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    async def _wait_for(self, future, timeout):
+        """
+        Await a future for at most timeout seconds, or the instance's
+        timeout if None, cancelling it should the timeout pass.
+        """
+        if (timeout is None):
+            timeout = self._pulse._timeout
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise PulseAudioTimeout('Operation timed out')
+
+    async def _call(self, name, f, args, timeout):
+        if (self._pulse.state != PA_CONTEXT_READY):
+            return None
+        future = self._event_loop().create_future()
+        op = self._pulse._issue(name, f, args)
+        op.notify = lambda op: future.done() or future.set_result(op.result)
+        self._pending[op.id] = (op, future)
+        self._schedule()
+        try:
+            return await self._wait_for(future, timeout)
+        finally:
+            # Cancels the operation unless it has completed
+            del self._pending[op.id]
+            self._pulse._release_operations([op])
+
+    def _wait_state(self, required_state):
+        future = self._event_loop().create_future()
+        self._state_waiters.append((required_state, future))
+        return future
+
+    def _check_state(self):
+        state = self._pulse.state
+        if (state in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+            # Operations in flight will never complete
+            for (op, future) in self._pending.values():
+                self._pulse._operations.pop(op.id, None)
+                if (not future.done()):
+                    future.set_exception(Exception('Connection ' + state_map[state]))
+        waiters = []
+        for (required_state, future) in self._state_waiters:
+            if (future.done()):
+                continue
+            if (state == required_state):
+                future.set_result(state)
+            elif (state in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+                future.set_exception(Exception('Connection ' + state_map[state]))
+            else:
+                waiters.append((required_state, future))
+        self._state_waiters = waiters
+
+    def _schedule(self):
+        if (not self._scheduled):
+            self._scheduled = True
+            self._event_loop().call_soon(self._run_once)
+
+    def _run_once(self):
+        self._scheduled = False
+        main_loop = self._pulse._main_loop
+        if (self._lib.pa_mainloop_prepare(main_loop, -1) < 0):
+            return
+        self._lib.pa_mainloop_poll(main_loop)
+        self._lib.pa_mainloop_dispatch(main_loop)
+        self._watch()
+        self._check_state()
+
+    def _watch(self):
+        for fd in list(self._watched):
+            if (self._watched[fd] != self._wanted.get(fd)):
+                self._loop.remove_reader(fd)
+                self._loop.remove_writer(fd)
+                del self._watched[fd]
+        for (fd, events) in self._wanted.items():
+            if (fd in self._watched):
+                continue
+            if (events & (select.POLLIN | select.POLLPRI)):
+                self._loop.add_reader(fd, self._schedule)
+            if (events & select.POLLOUT):
+                self._loop.add_writer(fd, self._schedule)
+            self._watched[fd] = events
+        if (self._timer is not None):
+            self._timer.cancel()
+            self._timer = None
+        if (self._timeout == 0):
+            self._schedule()
+        elif (self._timeout > 0):
+            self._timer = self._loop.call_later(self._timeout / 1000.0,
+                                                self._schedule)
+
+    def _poll_cb(self, ufds, nfds, timeout, userdata):
+        # Records what the main loop is waiting on and polls it without
+        # blocking; the asyncio event loop does the actual waiting.
+        fds = cast(ufds, POINTER(pollfd))
+        wanted = {}
+        for i in range(nfds):
+            wanted[fds[i].fd] = wanted.get(fds[i].fd, 0) | fds[i].events
+        poller = select.poll()
+        for (fd, events) in wanted.items():
+            poller.register(fd, events)
+        ready = dict(poller.poll(0))
+        count = 0
+        for i in range(nfds):
+            fds[i].revents = ready.get(fds[i].fd, 0) & (fds[i].events | POLL_ERRORS)
+            if (fds[i].revents):
+                count += 1
+        self._wanted = wanted
+        self._timeout = timeout
+        return count
@@ -0,0 +1,61 @@
+"""
+Backends supply the libpulse functions and callback types used by
+:class:`pypulseaudio.PulseAudio`, which accesses them as attributes of its
+backend, e.g. ``self._lib.pa_context_connect(...)``.  The default backend
+binds to the system libpulse; :class:`pypulseaudio.fake.FakeBackend` is an
+in-process stand-in for testing and benchmarking without a server.
+"""
+from __future__ import unicode_literals
+
+
+class LibPulseBackend(object):
+    """
+    Backend binding to the system libpulse through the
+    ``pulseaudio.lib_pulseaudio`` ctypes bindings.  The bindings are only
+    imported once a symbol is first used, and each symbol is then resolved
+    once and kept as an attribute of the backend, such that later uses are
+    plain attribute lookups.
+
+    The bindings are imported whole rather than each prototype being
+    declared against libpulse on demand, as the prototypes refer to the
+    structure and callback types defined there.  Invocations which never
+    touch the backend, e.g. those served by :mod:`pypulseaudio.helper`,
+    thereby never load libpulse; ``benchmarks/startup.py`` reports the
+    time this saves.
+    """
+    def __init__(self):
+        self._lib = None
+
+    def __getattr__(self, name):
+        if (name.startswith('__')):
+            raise AttributeError(name)
+        if (self._lib is None):
+            import pulseaudio.lib_pulseaudio
+            self._lib = pulseaudio.lib_pulseaudio
+        value = getattr(self._lib, name)
+        setattr(self, name, value)
+        return value
+
+
+_default_backend = None
+
+
+def get_default_backend():
+    """
+    Obtain the backend used by instances created without one, creating a
+    :class:`LibPulseBackend` on first use.
+    """
+    global _default_backend
+    if (_default_backend is None):
+        _default_backend = LibPulseBackend()
+    return _default_backend
+
+
+def set_default_backend(backend):
+    """
+    Replace the backend used by instances created without one.
+
+    :param backend: backend instance, or None to restore the libpulse backend
+    """
+    global _default_backend
+    _default_backend = backend
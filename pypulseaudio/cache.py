@@ -0,0 +1,187 @@
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from pypulseaudio.records import copy_entry
+
+
+class ModuleRegistry(object):
+    """
+    Index of loaded modules by name and by argument value, answering
+    lookups such as "is module-null-sink with sink_name=x loaded?" without
+    scanning every module, e.g.::
+
+        registry.find('module-null-sink', sink_name='x')
+
+    Modules are stored in the form returned by
+    :meth:`pypulseaudio.PulseAudio.get_module_info_list`.
+    """
+    def __init__(self, modules=()):
+        self.clear()
+        for module in modules:
+            self.add(module)
+
+    def clear(self):
+        """
+        Discard all modules.
+        """
+        self._modules = OrderedDict()
+        self._names = {}
+        self._args = {}
+
+    def _keys(self, module):
+        name = module['name']
+        args = module['argument'] or {}
+        return [(name, key, value) for (key, value) in args.items()]
+
+    def add(self, module):
+        """
+        Insert or replace a module.
+        """
+        index = module['index']
+        self.remove(index)
+        self._modules[index] = module
+        self._names.setdefault(module['name'], set()).add(index)
+        for key in self._keys(module):
+            self._args.setdefault(key, set()).add(index)
+
+    def remove(self, index):
+        """
+        Remove a module, if present.
+        """
+        module = self._modules.pop(index, None)
+        if (module is None):
+            return
+        for (table, key) in ([(self._names, module['name'])] +
+                             [(self._args, key) for key in self._keys(module)]):
+            indexes = table[key]
+            indexes.discard(index)
+            if (not indexes):
+                del table[key]
+
+    def find(self, name, **args):
+        """
+        Look up the modules of a name whose arguments include all those
+        given, values being compared as strings.
+
+        :param name: module name
+        :type name: string
+        :return: matching modules in index order
+        :rtype: list
+        """
+        sets = [self._names.get(name, set())]
+        sets.extend(self._args.get((name, key, '%s' % value), set())
+                    for (key, value) in args.items())
+        sets.sort(key=len)
+        indexes = sets[0].intersection(*sets[1:])
+        return [self._modules[i] for i in sorted(indexes)]
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self._modules)
+
+    def __iter__(self):
+        return iter(list(self._modules.values()))
+
+
+class ObjectCache(object):
+    """
+    Local mirror of the server's sinks, sources, cards, modules and
+    server information.  Entries are stored in exactly the same dict
+    form returned by the :class:`pypulseaudio.PulseAudio` getters and
+    are indexed by object index and, where the object has a unique name,
+    by name too.  Modules are further indexed by name and argument values
+    in :attr:`modules`.  Lookups return copies of the entries, such that
+    callers may modify them without corrupting the cache.
+
+    The cache itself performs no server communication; it is filled
+    and kept up-to-date by :class:`pypulseaudio.PulseAudio` when the
+    latter is created with ``cache=True``.
+    """
+    facilities = ('sink', 'source', 'card', 'module')
+    named_facilities = ('sink', 'source', 'card')
+
+    def __init__(self):
+        self.populated = False
+        self.clear()
+
+    def clear(self):
+        """
+        Discard all cached entries and mark the cache as unpopulated.
+        """
+        self._objects = dict((f, OrderedDict()) for f in self.facilities)
+        self._names = dict((f, {}) for f in self.named_facilities)
+        self.modules = ModuleRegistry()
+        self.server_info = None
+        self.populated = False
+
+    def update(self, facility, value):
+        """
+        Insert or replace a cached entry.
+
+        :param facility: one of :attr:`facilities` or 'server'
+        :type facility: string
+        :param value: the entry as returned by the corresponding getter
+        :type value: dict
+        """
+        if (facility == 'server'):
+            self.server_info = value
+            return
+        index = value['index']
+        if (facility in self._names):
+            previous = self._objects[facility].get(index)
+            if (previous is not None):
+                self._names[facility].pop(previous['name'], None)
+            self._names[facility][value['name']] = index
+        self._objects[facility][index] = value
+        if (facility == 'module'):
+            self.modules.add(value)
+
+    def remove(self, facility, index):
+        """
+        Remove a cached entry, if present.
+
+        :param facility: one of :attr:`facilities`
+        :type facility: string
+        :param index: object index
+        :type index: integer
+        """
+        value = self._objects[facility].pop(index, None)
+        if (value is not None and facility in self._names):
+            self._names[facility].pop(value['name'], None)
+        if (facility == 'module'):
+            self.modules.remove(index)
+
+    def get(self, facility, index):
+        """
+        Look up a cached entry by index.
+
+        :return: a copy of the cached entry or None
+        :rtype: dict
+        """
+        return copy_entry(self._objects[facility].get(index))
+
+    def find(self, facility, name):
+        """
+        Look up a cached entry by name.
+
+        :return: a copy of the cached entry or None
+        :rtype: dict
+        """
+        index = self._names[facility].get(name)
+        if (index is None):
+            return None
+        return copy_entry(self._objects[facility].get(index))
+
+    def list(self, facility):
+        """
+        Obtain all cached entries of a facility in index order.
+
+        :return: copies of the cached entries
+        :rtype: list of dict items
+        """
+        if (facility == 'server'):
+            return [copy_entry(self.server_info)] if self.server_info is not None else []
+        return [copy_entry(i) for i in self._objects[facility].values()]
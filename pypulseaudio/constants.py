@@ -0,0 +1,141 @@
+"""
+pulseaudio enumeration values, as defined by the libpulse headers.
+
+These are defined here, rather than taken from the libpulse bindings, so
+that they are available regardless of which backend is used.
+See also:: :mod:`pypulseaudio.backend`
+"""
+from __future__ import unicode_literals
+
+# pa_context_state
+PA_CONTEXT_UNCONNECTED = 0
+PA_CONTEXT_CONNECTING = 1
+PA_CONTEXT_AUTHORIZING = 2
+PA_CONTEXT_SETTING_NAME = 3
+PA_CONTEXT_READY = 4
+PA_CONTEXT_FAILED = 5
+PA_CONTEXT_TERMINATED = 6
+
+# pa_context_flags
+PA_CONTEXT_NOFLAGS = 0x0000
+PA_CONTEXT_NOAUTOSPAWN = 0x0001
+PA_CONTEXT_NOFAIL = 0x0002
+
+# pa_operation_state
+PA_OPERATION_RUNNING = 0
+PA_OPERATION_DONE = 1
+PA_OPERATION_CANCELLED = 2
+
+# pa_subscription_mask
+PA_SUBSCRIPTION_MASK_NULL = 0x0000
+PA_SUBSCRIPTION_MASK_SINK = 0x0001
+PA_SUBSCRIPTION_MASK_SOURCE = 0x0002
+PA_SUBSCRIPTION_MASK_SINK_INPUT = 0x0004
+PA_SUBSCRIPTION_MASK_SOURCE_OUTPUT = 0x0008
+PA_SUBSCRIPTION_MASK_MODULE = 0x0010
+PA_SUBSCRIPTION_MASK_CLIENT = 0x0020
+PA_SUBSCRIPTION_MASK_SAMPLE_CACHE = 0x0040
+PA_SUBSCRIPTION_MASK_SERVER = 0x0080
+PA_SUBSCRIPTION_MASK_AUTOLOAD = 0x0100
+PA_SUBSCRIPTION_MASK_CARD = 0x0200
+PA_SUBSCRIPTION_MASK_ALL = 0x02ff
+
+# pa_subscription_event_type
+PA_SUBSCRIPTION_EVENT_SINK = 0x0000
+PA_SUBSCRIPTION_EVENT_SOURCE = 0x0001
+PA_SUBSCRIPTION_EVENT_SINK_INPUT = 0x0002
+PA_SUBSCRIPTION_EVENT_SOURCE_OUTPUT = 0x0003
+PA_SUBSCRIPTION_EVENT_MODULE = 0x0004
+PA_SUBSCRIPTION_EVENT_CLIENT = 0x0005
+PA_SUBSCRIPTION_EVENT_SAMPLE_CACHE = 0x0006
+PA_SUBSCRIPTION_EVENT_SERVER = 0x0007
+PA_SUBSCRIPTION_EVENT_AUTOLOAD = 0x0008
+PA_SUBSCRIPTION_EVENT_CARD = 0x0009
+PA_SUBSCRIPTION_EVENT_FACILITY_MASK = 0x000F
+PA_SUBSCRIPTION_EVENT_NEW = 0x0000
+PA_SUBSCRIPTION_EVENT_CHANGE = 0x0010
+PA_SUBSCRIPTION_EVENT_REMOVE = 0x0020
+PA_SUBSCRIPTION_EVENT_TYPE_MASK = 0x0030
+
+# pa_sink_state / pa_source_state
+PA_SINK_INVALID_STATE = -1
+PA_SINK_RUNNING = 0
+PA_SINK_IDLE = 1
+PA_SINK_SUSPENDED = 2
+PA_SOURCE_INVALID_STATE = -1
+PA_SOURCE_RUNNING = 0
+PA_SOURCE_IDLE = 1
+PA_SOURCE_SUSPENDED = 2
+
+# pa_port_available
+PA_PORT_AVAILABLE_UNKNOWN = 0
+PA_PORT_AVAILABLE_NO = 1
+PA_PORT_AVAILABLE_YES = 2
+
+# pa_direction
+PA_DIRECTION_OUTPUT = 0x0001
+PA_DIRECTION_INPUT = 0x0002
+
+# pa_error_code
+PA_OK = 0
+PA_ERR_ACCESS = 1
+PA_ERR_COMMAND = 2
+PA_ERR_INVALID = 3
+PA_ERR_EXIST = 4
+PA_ERR_NOENTITY = 5
+PA_ERR_CONNECTIONREFUSED = 6
+PA_ERR_PROTOCOL = 7
+PA_ERR_TIMEOUT = 8
+PA_ERR_MODINITFAILED = 14
+PA_ERR_BADSTATE = 15
+PA_ERR_NOTSUPPORTED = 19
+
+# pa_volume_t
+PA_VOLUME_MUTED = 0
+PA_VOLUME_NORM = 0x10000
+PA_VOLUME_MAX = 0x7fffffff
+PA_VOLUME_INVALID = 0xffffffff
+PA_CHANNELS_MAX = 32
+
+PA_INVALID_INDEX = 0xffffffff
+
+# PA_INVALID_INDEX as returned by calls reporting an index, e.g. a failed
+# load_module()
+INVALID_INDEX = -1
+
+# pa_sample_format
+PA_SAMPLE_U8 = 0
+PA_SAMPLE_ALAW = 1
+PA_SAMPLE_ULAW = 2
+PA_SAMPLE_S16LE = 3
+PA_SAMPLE_S16BE = 4
+PA_SAMPLE_FLOAT32LE = 5
+PA_SAMPLE_FLOAT32BE = 6
+PA_SAMPLE_S32LE = 7
+PA_SAMPLE_S32BE = 8
+PA_SAMPLE_S24LE = 9
+PA_SAMPLE_S24BE = 10
+PA_SAMPLE_S24_32LE = 11
+PA_SAMPLE_S24_32BE = 12
+
+# pa_stream_state
+PA_STREAM_UNCONNECTED = 0
+PA_STREAM_CREATING = 1
+PA_STREAM_READY = 2
+PA_STREAM_FAILED = 3
+PA_STREAM_TERMINATED = 4
+
+# pa_stream_flags
+PA_STREAM_NOFLAGS = 0x0000
+PA_STREAM_START_CORKED = 0x0001
+PA_STREAM_INTERPOLATE_TIMING = 0x0002
+PA_STREAM_NOT_MONOTONIC = 0x0004
+PA_STREAM_AUTO_TIMING_UPDATE = 0x0008
+PA_STREAM_DONT_MOVE = 0x0200
+PA_STREAM_PEAK_DETECT = 0x0800
+PA_STREAM_ADJUST_LATENCY = 0x2000
+PA_STREAM_DONT_INHIBIT_AUTO_SUSPEND = 0x8000
+
+# pa_seek_mode
+PA_SEEK_RELATIVE = 0
+PA_SEEK_ABSOLUTE = 1
@@ -0,0 +1,1379 @@
+"""
+In-process fake of the libpulse client library and a pulseaudio server, for
+exercising :class:`pypulseaudio.PulseAudio` without pulseaudio, e.g.::
+
+    backend = FakeBackend(n_sinks=100, latency=0.001)
+    pulse = PulseAudio('test', backend=backend)
+    pulse.connect()
+    sinks = pulse.get_sink_info_list()
+
+Server replies and change notifications are delivered through a fake main
+loop after the configured latency, with real waiting, such that timeouts,
+pipelining and event coalescing behave as they do against a real server.
+A backend created with ``respond=False`` accepts connections and requests
+but never replies to them, simulating a server which has hung.
+
+Playback and record streams are played and recorded in real time: data
+written to playback streams is kept in :attr:`FakeStream.played`, and
+record streams produce a repeating 0 to 255 byte ramp, or for float32le
+streams a repeating ramp of 256 samples from 0.0 to 1.0.
+
+Both the plain and threaded main loops are provided.  The plain main loop
+supports custom poll functions, as used by :mod:`pypulseaudio.aio`, which
+are given a single file descriptor becoming readable whenever a call has
+been scheduled, and a timeout expiring once the next call falls due.
+"""
+from __future__ import unicode_literals
+
+import errno
+import fcntl
+import heapq
+import itertools
+import math
+import os
+import select
+import struct
+import threading
+from collections import OrderedDict
+from ctypes import Structure, addressof, c_char, c_int, c_short, string_at
+
+from pypulseaudio import constants
+from pypulseaudio.constants import *
+from pypulseaudio.stream import PA_BUFFER_ATTR_DEFAULT, sample_formats
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+error_map = {
+    PA_OK: 'OK',
+    PA_ERR_ACCESS: 'Access denied',
+    PA_ERR_COMMAND: 'Unknown command',
+    PA_ERR_INVALID: 'Invalid argument',
+    PA_ERR_EXIST: 'Entity exists',
+    PA_ERR_NOENTITY: 'No such entity',
+    PA_ERR_CONNECTIONREFUSED: 'Connection refused',
+    PA_ERR_PROTOCOL: 'Protocol error',
+    PA_ERR_TIMEOUT: 'Timeout',
+    PA_ERR_BADSTATE: 'Bad state',
+    PA_ERR_NOTSUPPORTED: 'Not supported',
+}
+
+
+def _text(value):
+    """
+    Normalise a name passed as text, bytes or a ctypes c_char_p.
+    """
+    value = getattr(value, 'value', value)
+    if (isinstance(value, bytes)):
+        value = value.decode('utf-8')
+    return value
+
+
+def _callback_type(f):
+    # Python callables are passed straight through in place of thunks
+    return f
+
+
+class pollfd(Structure):
+    _fields_ = [('fd', c_int),
+                ('events', c_short),
+                ('revents', c_short)]
+
+
+class Struct(object):
+    """
+    Stand-in for a ctypes structure, holding the given fields as attributes.
+    """
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class Pointer(object):
+    """
+    Stand-in for a ctypes pointer to one or more structures.  A pointer to
+    no structures is NULL and is false.
+    """
+    def __init__(self, *items):
+        self._items = list(items)
+
+    @property
+    def contents(self):
+        return self._items[0]
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __bool__(self):
+        return bool(self._items)
+
+    __nonzero__ = __bool__
+
+
+class pa_cvolume(object):
+    """
+    Stand-in for the ctypes pa_cvolume structure.
+    """
+    def __init__(self):
+        self.channels = 0
+        self.values = [PA_VOLUME_MUTED] * PA_CHANNELS_MAX
+
+
+class pa_sample_spec(object):
+    """
+    Stand-in for the ctypes pa_sample_spec structure.
+    """
+    format = PA_SAMPLE_S16LE
+    rate = 44100
+    channels = 2
+
+
+class pa_buffer_attr(object):
+    """
+    Stand-in for the ctypes pa_buffer_attr structure.
+    """
+    maxlength = PA_BUFFER_ATTR_DEFAULT
+    tlength = PA_BUFFER_ATTR_DEFAULT
+    prebuf = PA_BUFFER_ATTR_DEFAULT
+    minreq = PA_BUFFER_ATTR_DEFAULT
+    fragsize = PA_BUFFER_ATTR_DEFAULT
+
+
+class TimeEvent(object):
+    """
+    Call scheduled on a :class:`FakeMainloop`, which may be freed before
+    it is due.
+    """
+    def __init__(self, due, func, args):
+        self.due = due
+        self.func = func
+        self.args = args
+        self.freed = False
+
+
+def _set_nonblocking(fd):
+    fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+
+class FakeMainloop(object):
+    """
+    Main loop running scheduled calls when they fall due.  In threaded
+    mode the calls are run by a thread of its own with the loop's lock
+    held, as the libpulse threaded main loop does.
+    """
+    def __init__(self, threaded=False):
+        self.threaded = threaded
+        self.api = Pointer(Struct(mainloop=self, time_free=self.time_free))
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._timeout = -1
+        self._due = []
+        self._lock = threading.RLock()
+        self._signal = threading.Condition(self._lock)
+        self._thread = None
+        self._quit = False
+        self._woken = False
+        self._poll_func = None
+        self._poll_userdata = None
+        self._pipe = None
+
+    def schedule(self, delay, func, *args):
+        event = TimeEvent(monotonic() + delay, func, args)
+        with self._cond:
+            heapq.heappush(self._heap, (event.due, next(self._seq), event))
+            self._cond.notify_all()
+        self._wake_poll()
+        return event
+
+    def set_poll_func(self, poll_func, userdata):
+        if (self._pipe is None):
+            self._pipe = os.pipe()
+            for fd in self._pipe:
+                _set_nonblocking(fd)
+        self._poll_func = poll_func
+        self._poll_userdata = userdata
+
+    def close(self):
+        (pipe, self._pipe) = (self._pipe, None)
+        if (pipe is not None):
+            os.close(pipe[0])
+            os.close(pipe[1])
+
+    def _wake_poll(self):
+        # Makes the poll function's file descriptor readable, as the
+        # libpulse main loop's wakeup pipe does
+        if (self._pipe is not None):
+            try:
+                os.write(self._pipe[1], b'x')
+            except OSError as e:
+                if (e.errno != errno.EAGAIN):
+                    raise
+
+    def time_free(self, event):
+        event.freed = True
+
+    def wakeup(self):
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+        self._wake_poll()
+
+    def prepare(self, timeout):
+        self._timeout = timeout
+        return 0
+
+    def poll(self):
+        if (self._poll_func is not None):
+            return self._poll_with_func()
+        if (self._timeout >= 0):
+            until = monotonic() + self._timeout / 1000000.0
+        else:
+            until = None
+        with self._cond:
+            self._due = self._wait_due(until)
+        return len(self._due)
+
+    def _poll_with_func(self):
+        """
+        Call the poll function with the wakeup pipe and a timeout in
+        milliseconds bounded by the next call due, then take the calls due.
+        """
+        with self._cond:
+            next_due = self._heap[0][0] if self._heap else None
+        timeout = -1 if self._timeout < 0 else int(math.ceil(self._timeout / 1000.0))
+        if (next_due is not None):
+            wait = max(0, int(math.ceil((next_due - monotonic()) * 1000)))
+            timeout = wait if timeout < 0 else min(timeout, wait)
+        fds = (pollfd * 1)()
+        fds[0].fd = self._pipe[0]
+        fds[0].events = select.POLLIN
+        self._poll_func(fds, 1, timeout, self._poll_userdata)
+        try:
+            while (os.read(self._pipe[0], 4096)):
+                pass
+        except OSError as e:
+            if (e.errno != errno.EAGAIN):
+                raise
+        with self._cond:
+            self._woken = False
+            self._due = self._wait_due(monotonic())
+        return len(self._due)
+
+    def dispatch(self):
+        (due, self._due) = (self._due, [])
+        count = 0
+        for event in due:
+            if (not event.freed):
+                event.func(*event.args)
+                count += 1
+        return count
+
+    def iterate(self, block):
+        self.prepare(-1 if block else 0)
+        self.poll()
+        return self.dispatch()
+
+    def _wait_due(self, until):
+        # Must be called with the condition held
+        while (True):
+            now = monotonic()
+            if (self._heap and self._heap[0][0] <= now):
+                due = []
+                while (self._heap and self._heap[0][0] <= now):
+                    due.append(heapq.heappop(self._heap)[2])
+                return due
+            if (self._woken):
+                self._woken = False
+                return []
+            if (self._quit or (until is not None and now >= until)):
+                return []
+            wait = self._heap[0][0] - now if self._heap else None
+            if (until is not None):
+                wait = until - now if wait is None else min(wait, until - now)
+            self._cond.wait(wait)
+
+    def start(self):
+        self._quit = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return 0
+
+    def stop(self):
+        with self._cond:
+            self._quit = True
+            self._cond.notify_all()
+        # As with libpulse, must not be called with the lock held
+        if (self._thread is not None):
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while (not self._quit):
+            with self._cond:
+                self._due = self._wait_due(None)
+            with self._lock:
+                self.dispatch()
+
+
+class FakeContext(object):
+    """
+    Client connection context.
+    """
+    def __init__(self, backend, mainloop, name):
+        self.backend = backend
+        self.mainloop = mainloop
+        self.name = _text(name)
+        self.state = PA_CONTEXT_UNCONNECTED
+        self.errno = PA_OK
+        self.state_cb = None
+        self.subscribe_cb = None
+        self.subscribe_mask = PA_SUBSCRIPTION_MASK_NULL
+
+    def set_state(self, state):
+        self.state = state
+        if (self.state_cb is not None):
+            self.state_cb(self, None)
+
+
+class FakeStream(object):
+    """
+    Playback or record stream, whose device plays or records in real time
+    once the stream is ready and uncorked, or an upload stream taking its
+    sample's length at once.  Attributes not requested default to a 2s
+    target length, 20ms minimum request and 4s maximum length.
+    """
+    period = 0.005
+    ramp = bytearray(range(256))
+    float_ramp = bytearray(struct.pack('<256f', *[i / 255.0 for i in range(256)]))
+
+    def __init__(self, backend, context, name, spec):
+        self.backend = backend
+        self.context = context
+        self.name = _text(name)
+        self.rate = spec.rate
+        self.channels = spec.channels
+        self.format = spec.format
+        sizes = dict(sample_formats.values())
+        self.frame_size = spec.channels * sizes[spec.format]
+        self.byte_rate = spec.rate * self.frame_size
+        self.direction = None
+        self.device = None
+        self.length = 0
+        self.state = PA_STREAM_UNCONNECTED
+        self.state_cb = None
+        self.request_cb = None
+        self.underflow_cb = None
+        self.overflow_cb = None
+        self.attr = None
+        self.corked = False
+        self.queued = 0.0
+        self.playing = False
+        self.played = bytearray()
+        self.available = 0.0
+        self.produced = 0
+        self.underflows = 0
+        self.overflows = 0
+        self._last = None
+        self._buffer = None
+        self._peeked = 0
+        self._pattern = self.float_ramp if spec.format == PA_SAMPLE_FLOAT32LE else self.ramp
+
+    def set_state(self, state):
+        self.state = state
+        if (self.state_cb is not None):
+            self.state_cb(self, None)
+        if (state == PA_STREAM_READY):
+            self._last = monotonic()
+            self.context.mainloop.schedule(self.period, self.tick)
+
+    def set_attr(self, attr):
+        def frames(seconds):
+            return int(seconds * self.rate) * self.frame_size
+        def get(key, default):
+            value = getattr(attr, key, PA_BUFFER_ATTR_DEFAULT)
+            return default if value == PA_BUFFER_ATTR_DEFAULT else value
+        tlength = get('tlength', frames(2))
+        self.attr = Struct(maxlength=get('maxlength', frames(4)),
+                           tlength=tlength,
+                           prebuf=get('prebuf', tlength),
+                           minreq=get('minreq', frames(0.02)),
+                           fragsize=get('fragsize', frames(0.02)))
+
+    def update(self):
+        """
+        Advance playback or recording to the current time.
+        """
+        now = monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if (self.corked or self.state != PA_STREAM_READY or
+            self.direction == 'upload'):
+            return
+        n = elapsed * self.byte_rate
+        if (self.direction == 'playback'):
+            if (not self.playing):
+                return
+            if (self.queued > n):
+                self.queued -= n
+            else:
+                self.queued = 0.0
+                self.playing = False
+                self.underflows += 1
+        else:
+            self.available += n
+            excess = int(self.available - self.attr.maxlength)
+            if (excess > 0):
+                excess -= excess % self.frame_size
+                self.available -= excess
+                self.produced += excess
+                self.overflows += 1
+
+    def tick(self):
+        if (self.state != PA_STREAM_READY):
+            return
+        (underflows, overflows) = (self.underflows, self.overflows)
+        self.update()
+        if (self.underflows > underflows and self.underflow_cb is not None):
+            self.underflow_cb(self, None)
+        if (self.overflows > overflows and self.overflow_cb is not None):
+            self.overflow_cb(self, None)
+        if (self.direction != 'record'):
+            ready = self.writable()
+            if (ready >= self.attr.minreq and self.request_cb is not None):
+                self.request_cb(self, ready, None)
+        else:
+            ready = self.readable()
+            if (ready >= self.attr.fragsize and self.request_cb is not None):
+                self.request_cb(self, ready, None)
+        self.context.mainloop.schedule(self.period, self.tick)
+
+    def writable(self):
+        if (self.direction == 'upload'):
+            return self.length - len(self.played)
+        n = max(0, self.attr.tlength - int(self.queued))
+        return n - n % self.frame_size
+
+    def readable(self):
+        n = int(self.available)
+        return n - n % self.frame_size
+
+    def begin_write(self, data, size):
+        self.update()
+        n = size._obj.value
+        if (n == 0 or n > self.writable()):
+            n = self.writable()
+        self._buffer = (c_char * n)()
+        data._obj.value = addressof(self._buffer)
+        size._obj.value = n
+        return 0
+
+    def write(self, data, nbytes):
+        self.played += string_at(getattr(data, 'value', data), nbytes)
+        self._buffer = None
+        if (self.direction == 'upload'):
+            return 0
+        self.queued += nbytes
+        if (not self.playing and self.queued >= self.attr.prebuf):
+            self.playing = True
+        return 0
+
+    def peek(self, data, size):
+        self.update()
+        n = min(self.readable(), self.attr.fragsize)
+        if (n == 0):
+            data._obj.value = None
+            size._obj.value = 0
+            return 0
+        period = len(self._pattern)
+        start = self.produced % period
+        ramp = self._pattern * ((start + n) // period + 1)
+        self._buffer = (c_char * n).from_buffer_copy(bytes(ramp[start:start + n]))
+        self._peeked = n
+        data._obj.value = addressof(self._buffer)
+        size._obj.value = n
+        return 0
+
+    def drop(self):
+        self.available -= self._peeked
+        self.produced += self._peeked
+        self._peeked = 0
+        self._buffer = None
+        return 0
+
+
+class FakeOperation(object):
+    """
+    Server operation, which completes once its reply has been delivered.
+    """
+    def __init__(self):
+        self.state = PA_OPERATION_RUNNING
+
+
+class FakeBackend(object):
+    """
+    Backend faking both libpulse and a server holding the given numbers of
+    sinks, sources, cards, modules and streams.  The server's objects may be altered
+    with :meth:`add`, :meth:`change` and :meth:`remove`, which notify
+    subscribed contexts just as the server would, and the server restarted
+    with :meth:`restart`.
+
+    :param n_sinks: number of sinks, and of cards, modules and sources
+        unless given
+    :type n_sinks: int
+    :param n_sink_inputs: number of playback streams, spread across the sinks
+    :type n_sink_inputs: int
+    :param n_source_outputs: number of record streams, spread across the
+        sources
+    :type n_source_outputs: int
+    :param monitors: True if each sink should have a monitor source, in
+        addition to the other sources
+    :type monitors: bool
+    :param latency: time in seconds taken for each reply or notification
+        to arrive
+    :type latency: float
+    :param respond: False if requests should never be replied to
+    :type respond: bool
+
+    Samples played from the sample cache are recorded in
+    :attr:`played_samples` as (name, sink name, volume) tuples.  Modules
+    whose names are added to :attr:`failing_modules` fail to load.  The
+    contexts and threaded main loops which have not been freed are held
+    in :attr:`contexts` and :attr:`threaded_mainloops`.
+    """
+    pa_time_event_cb_t = staticmethod(_callback_type)
+    pa_context_notify_cb_t = staticmethod(_callback_type)
+    pa_context_subscribe_cb_t = staticmethod(_callback_type)
+    pa_context_index_cb_t = staticmethod(_callback_type)
+    pa_context_success_cb_t = staticmethod(_callback_type)
+    pa_card_info_cb_t = staticmethod(_callback_type)
+    pa_sink_info_cb_t = staticmethod(_callback_type)
+    pa_source_info_cb_t = staticmethod(_callback_type)
+    pa_module_info_cb_t = staticmethod(_callback_type)
+    pa_server_info_cb_t = staticmethod(_callback_type)
+    pa_sink_input_info_cb_t = staticmethod(_callback_type)
+    pa_source_output_info_cb_t = staticmethod(_callback_type)
+    pa_sample_info_cb_t = staticmethod(_callback_type)
+    pa_stream_notify_cb_t = staticmethod(_callback_type)
+    pa_stream_request_cb_t = staticmethod(_callback_type)
+    pa_stream_success_cb_t = staticmethod(_callback_type)
+    pa_cvolume = pa_cvolume
+    pa_sample_spec = pa_sample_spec
+    pa_buffer_attr = pa_buffer_attr
+
+    def __init__(self, n_sinks=2, n_sources=None, n_cards=None, n_modules=None,
+                 n_sink_inputs=0, n_source_outputs=0, monitors=False, latency=0.0,
+                 respond=True):
+        self.latency = latency
+        self.respond = respond
+        self._down_until = 0.0
+        self.contexts = []
+        self.threaded_mainloops = []
+        self.played_samples = []
+        self.failing_modules = set()
+        self._indexes = {}
+        self.objects = dict((f, OrderedDict())
+                            for f in ('sink', 'source', 'card', 'module',
+                                      'sink_input', 'source_output',
+                                      'sample_cache'))
+        for i in range(n_cards if n_cards is not None else n_sinks):
+            self._add_card(i)
+        for i in range(n_sinks):
+            self._add_sink(i)
+        for i in range(n_sources if n_sources is not None else n_sinks):
+            self._add_source(i)
+        if (monitors):
+            for sink in list(self.objects['sink'].values()):
+                self._add_monitor(sink)
+        for i in range(n_modules if n_modules is not None else n_sinks):
+            self._add_module('module-fake', 'index=%d rate=48000 channels=2' % i)
+        for i in range(n_sink_inputs):
+            self._add_sink_input(i)
+        for i in range(n_source_outputs):
+            self._add_source_output(i)
+        self.server = Struct(user_name='fake',
+                             host_name='localhost',
+                             server_version='fake',
+                             server_name='pulseaudio',
+                             default_sink_name=self._first_name('sink'),
+                             default_source_name=self._first_name('source'),
+                             cookie=0)
+
+    def _next_index(self, facility):
+        counter = self._indexes.setdefault(facility, itertools.count())
+        return next(counter)
+
+    def _first_name(self, facility):
+        for obj in self.objects[facility].values():
+            return obj.name
+        return None
+
+    def _add_card(self, i):
+        index = self._next_index('card')
+        profiles = [Struct(name=name, description=desc, n_sinks=n_sinks,
+                           n_sources=n_sources, priority=priority,
+                           available=available)
+                    for (name, desc, n_sinks, n_sources, priority, available) in
+                    (('output:analog-stereo', 'Analog Stereo Output', 1, 0, 6500, 1),
+                     ('output:analog-stereo+input:analog-stereo',
+                      'Analog Stereo Duplex', 1, 1, 6565, 1),
+                     ('output:analog-surround-51+input:analog-mono',
+                      'Analog Surround 5.1 Output + Analog Mono Input', 1, 1, 5151, 1),
+                     ('output:hdmi-stereo', 'Digital Stereo (HDMI) Output', 1, 0, 5900, 0),
+                     ('off', 'Off', 0, 0, 0, 1))]
+        ports = [Struct(name=name, description=desc, priority=priority,
+                        available=available, direction=direction,
+                        n_profiles=len(names),
+                        profiles=Pointer(*[Pointer(profiles[j]) for j in names]))
+                 for (name, desc, priority, available, direction, names) in
+                 (('analog-output-speaker', 'Speakers', 10000,
+                   PA_PORT_AVAILABLE_UNKNOWN, PA_DIRECTION_OUTPUT, (0, 1, 2)),
+                  ('analog-input-mic', 'Microphone', 8700,
+                   PA_PORT_AVAILABLE_YES, PA_DIRECTION_INPUT, (1, 2)),
+                  ('hdmi-output-0', 'HDMI / DisplayPort', 5900,
+                   PA_PORT_AVAILABLE_NO, PA_DIRECTION_OUTPUT, (3,)))]
+        card = Struct(name='fake_card.%d' % i,
+                      index=index,
+                      n_profiles=len(profiles),
+                      profiles=Pointer(*profiles),
+                      profiles2=Pointer(*[Pointer(p) for p in profiles]),
+                      active_profile=Pointer(profiles[1]),
+                      n_ports=len(ports),
+                      ports=Pointer(*[Pointer(p) for p in ports]))
+        self.objects['card'][index] = card
+        return card
+
+    def _add_sink(self, i):
+        index = self._next_index('sink')
+        sink = Struct(name='fake_output.%d' % i,
+                      index=index,
+                      description='Fake Output %d' % i,
+                      card=PA_INVALID_INDEX,
+                      mute=0,
+                      latency=0,
+                      configured_latency=0,
+                      monitor_source=PA_INVALID_INDEX,
+                      monitor_source_name=None,
+                      volume=Struct(channels=2,
+                                    values=[PA_VOLUME_NORM, PA_VOLUME_NORM]),
+                      n_volume_steps=PA_VOLUME_NORM + 1,
+                      state=PA_SINK_IDLE)
+        self.objects['sink'][index] = sink
+        return sink
+
+    def _add_source(self, i):
+        index = self._next_index('source')
+        source = Struct(name='fake_input.%d' % i,
+                        index=index,
+                        description='Fake Input %d' % i,
+                        card=PA_INVALID_INDEX,
+                        mute=0,
+                        latency=0,
+                        configured_latency=0,
+                        monitor_of_sink=PA_INVALID_INDEX,
+                        monitor_of_sink_name=None,
+                        volume=Struct(channels=2,
+                                      values=[PA_VOLUME_NORM, PA_VOLUME_NORM]))
+        self.objects['source'][index] = source
+        return source
+
+    def _add_monitor(self, sink):
+        source = self._add_source(0)
+        source.name = sink.name + '.monitor'
+        source.description = 'Monitor of ' + sink.description
+        source.monitor_of_sink = sink.index
+        source.monitor_of_sink_name = sink.name
+        sink.monitor_source = source.index
+        sink.monitor_source_name = source.name
+        return source
+
+    def _add_stream(self, facility, device, i):
+        index = self._next_index(facility)
+        devices = list(self.objects[device])
+        stream = Struct(name='Fake Stream %d' % i,
+                        index=index,
+                        owner_module=PA_INVALID_INDEX,
+                        client=PA_INVALID_INDEX,
+                        volume=Struct(channels=2,
+                                      values=[PA_VOLUME_NORM, PA_VOLUME_NORM]),
+                        buffer_usec=0,
+                        resample_method=None,
+                        driver='fake.c',
+                        mute=0,
+                        corked=0)
+        setattr(stream, device,
+                devices[i % len(devices)] if devices else PA_INVALID_INDEX)
+        setattr(stream, device + '_usec', 0)
+        self.objects[facility][index] = stream
+        return stream
+
+    def _add_sink_input(self, i):
+        return self._add_stream('sink_input', 'sink', i)
+
+    def _add_source_output(self, i):
+        return self._add_stream('source_output', 'source', i)
+
+    def _add_module(self, name, argument):
+        index = self._next_index('module')
+        module = Struct(name=name, index=index, n_used=0, argument=argument)
+        self.objects['module'][index] = module
+        return module
+
+    # Server side object changes
+
+    def add(self, facility, **fields):
+        """
+        Add a sink, source, card or module, notifying subscribers.  Fields
+        not given take default values.
+
+        :return: the new object's index
+        :rtype: int
+        """
+        if (facility == 'module'):
+            obj = self._add_module(fields.pop('name', 'module-fake'),
+                                   fields.pop('argument', None))
+        else:
+            obj = getattr(self, '_add_' + facility)(len(self.objects[facility]))
+        obj.__dict__.update(fields)
+        self.notify(facility, PA_SUBSCRIPTION_EVENT_NEW, obj.index)
+        return obj.index
+
+    def change(self, facility, index, **fields):
+        """
+        Alter fields of an object, or of the server information if the
+        facility is 'server', notifying subscribers.
+        """
+        obj = self.server if facility == 'server' else self.objects[facility][index]
+        obj.__dict__.update(fields)
+        self.notify(facility, PA_SUBSCRIPTION_EVENT_CHANGE, index)
+
+    def remove(self, facility, index):
+        """
+        Remove an object, notifying subscribers.
+        """
+        del self.objects[facility][index]
+        self.notify(facility, PA_SUBSCRIPTION_EVENT_REMOVE, index)
+
+    def restart(self, downtime=0.0):
+        """
+        Restart the server: connected contexts fail, connections are refused
+        for the given time in seconds, and modules loaded by clients, the
+        sample cache, card profiles and default sink and source are lost.
+        """
+        self._down_until = monotonic() + downtime
+        for context in self.contexts:
+            if (context.state not in (PA_CONTEXT_UNCONNECTED, PA_CONTEXT_FAILED,
+                                      PA_CONTEXT_TERMINATED)):
+                context.mainloop.schedule(0, context.set_state, PA_CONTEXT_FAILED)
+        for (index, module) in list(self.objects['module'].items()):
+            if (getattr(module, 'loaded', False)):
+                del self.objects['module'][index]
+        self.objects['sample_cache'].clear()
+        for card in self.objects['card'].values():
+            card.active_profile = Pointer(card.profiles[1])
+        self.server.default_sink_name = self._first_name('sink')
+        self.server.default_source_name = self._first_name('source')
+
+    def notify(self, facility, event_type, index):
+        """
+        Send a change notification to all subscribed contexts.
+        """
+        code = getattr(constants, 'PA_SUBSCRIPTION_EVENT_' + facility.upper())
+        for context in self.contexts:
+            if (context.state == PA_CONTEXT_READY and
+                context.subscribe_cb is not None and
+                context.subscribe_mask & (1 << code)):
+                context.mainloop.schedule(self.latency, context.subscribe_cb,
+                                          context, code | event_type,
+                                          index, None)
+
+    # Main loops
+
+    def pa_mainloop_new(self):
+        return FakeMainloop()
+
+    def pa_mainloop_get_api(self, mainloop):
+        return mainloop.api
+
+    def pa_mainloop_prepare(self, mainloop, timeout):
+        return mainloop.prepare(timeout)
+
+    def pa_mainloop_poll(self, mainloop):
+        return mainloop.poll()
+
+    def pa_mainloop_dispatch(self, mainloop):
+        return mainloop.dispatch()
+
+    def pa_mainloop_iterate(self, mainloop, block, retval):
+        return mainloop.iterate(block)
+
+    def pa_mainloop_wakeup(self, mainloop):
+        mainloop.wakeup()
+
+    def pa_mainloop_free(self, mainloop):
+        mainloop.close()
+
+    def pa_mainloop_set_poll_func(self, mainloop, poll_func, userdata):
+        mainloop.set_poll_func(poll_func, userdata)
+
+    pa_poll_func = staticmethod(_callback_type)
+
+    def pa_threaded_mainloop_new(self):
+        mainloop = FakeMainloop(threaded=True)
+        self.threaded_mainloops.append(mainloop)
+        return mainloop
+
+    def pa_threaded_mainloop_get_api(self, mainloop):
+        return mainloop.api
+
+    def pa_threaded_mainloop_start(self, mainloop):
+        return mainloop.start()
+
+    def pa_threaded_mainloop_stop(self, mainloop):
+        mainloop.stop()
+
+    def pa_threaded_mainloop_free(self, mainloop):
+        self.threaded_mainloops.remove(mainloop)
+
+    def pa_threaded_mainloop_lock(self, mainloop):
+        mainloop._lock.acquire()
+
+    def pa_threaded_mainloop_unlock(self, mainloop):
+        mainloop._lock.release()
+
+    def pa_threaded_mainloop_wait(self, mainloop):
+        mainloop._signal.wait()
+
+    def pa_threaded_mainloop_signal(self, mainloop, wait_for_accept):
+        mainloop._signal.notify_all()
+
+    def pa_threaded_mainloop_in_thread(self, mainloop):
+        return mainloop._thread is threading.current_thread()
+
+    def pa_rtclock_now(self):
+        return int(monotonic() * 1000000)
+
+    def pa_context_rttime_new(self, context, usec, cb, userdata):
+        api = context.mainloop.api
+        delay = max(0, usec / 1000000.0 - monotonic())
+        return context.mainloop.schedule(delay, lambda: cb(api, None, None, userdata))
+
+    # Contexts
+
+    def pa_context_new(self, api, name):
+        context = FakeContext(self, api.contents.mainloop, name)
+        self.contexts.append(context)
+        return context
+
+    def pa_context_unref(self, context):
+        if (context in self.contexts):
+            self.contexts.remove(context)
+
+    def pa_context_set_state_callback(self, context, cb, userdata):
+        context.state_cb = cb
+
+    def pa_context_set_subscribe_callback(self, context, cb, userdata):
+        context.subscribe_cb = cb
+
+    def pa_context_get_state(self, context):
+        return context.state
+
+    def pa_context_errno(self, context):
+        return context.errno
+
+    def pa_strerror(self, error):
+        return error_map.get(error, 'Unknown error code')
+
+    def pa_context_connect(self, context, server, flags, api):
+        if (context.state != PA_CONTEXT_UNCONNECTED):
+            context.errno = PA_ERR_BADSTATE
+            return -1
+        context.set_state(PA_CONTEXT_CONNECTING)
+        if (monotonic() < self._down_until):
+            context.mainloop.schedule(self.latency, context.set_state,
+                                      PA_CONTEXT_FAILED)
+        elif (self.respond):
+            for state in (PA_CONTEXT_AUTHORIZING,
+                          PA_CONTEXT_SETTING_NAME,
+                          PA_CONTEXT_READY):
+                context.mainloop.schedule(self.latency, context.set_state, state)
+        return 0
+
+    def pa_context_disconnect(self, context):
+        if (context.state not in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+            context.set_state(PA_CONTEXT_TERMINATED)
+
+    def pa_operation_cancel(self, op):
+        op.state = PA_OPERATION_CANCELLED
+
+    def pa_operation_unref(self, op):
+        pass
+
+    def pa_operation_get_state(self, op):
+        return op.state
+
+    def _request(self, context, reply, delay=0.0):
+        """
+        Start an operation whose reply is delivered after the latency and
+        any further delay, unless the operation is cancelled first.
+        """
+        if (context.state != PA_CONTEXT_READY):
+            context.errno = PA_ERR_BADSTATE
+            return None
+        op = FakeOperation()
+        def deliver():
+            if (op.state == PA_OPERATION_RUNNING and
+                context.state == PA_CONTEXT_READY):
+                op.state = PA_OPERATION_DONE
+                reply()
+        if (self.respond):
+            context.mainloop.schedule(self.latency + delay, deliver)
+        return op
+
+    def _success(self, context, ok, cb, userdata):
+        if (not ok):
+            context.errno = PA_ERR_NOENTITY
+        cb(context, 1 if ok else 0, userdata)
+
+    def _find(self, facility, name):
+        name = _text(name)
+        for obj in self.objects[facility].values():
+            if (obj.name == name):
+                return obj
+        return None
+
+    def _list(self, context, facility, cb, userdata):
+        def reply():
+            for obj in list(self.objects[facility].values()):
+                cb(context, Pointer(obj), 0, userdata)
+            cb(context, Pointer(), 1, userdata)
+        return self._request(context, reply)
+
+    def _one(self, context, find, cb, userdata):
+        def reply():
+            obj = find()
+            if (obj is None):
+                context.errno = PA_ERR_NOENTITY
+                cb(context, Pointer(), -1, userdata)
+                return
+            cb(context, Pointer(obj), 0, userdata)
+            cb(context, Pointer(), 1, userdata)
+        return self._request(context, reply)
+
+    # Introspection
+
+    def pa_context_subscribe(self, context, mask, cb, userdata):
+        def reply():
+            context.subscribe_mask = mask
+            if (cb is not None):
+                cb(context, 1, userdata)
+        return self._request(context, reply)
+
+    def pa_context_get_server_info(self, context, cb, userdata):
+        return self._request(context,
+                             lambda: cb(context, Pointer(self.server), userdata))
+
+    def pa_context_get_card_info_list(self, context, cb, userdata):
+        return self._list(context, 'card', cb, userdata)
+
+    def pa_context_get_card_info_by_index(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['card'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_card_info_by_name(self, context, name, cb, userdata):
+        return self._one(context, lambda: self._find('card', name), cb, userdata)
+
+    def pa_context_get_sink_info_list(self, context, cb, userdata):
+        return self._list(context, 'sink', cb, userdata)
+
+    def pa_context_get_sink_info_by_index(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['sink'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_sink_info_by_name(self, context, name, cb, userdata):
+        return self._one(context, lambda: self._find('sink', name), cb, userdata)
+
+    def pa_context_get_source_info_list(self, context, cb, userdata):
+        return self._list(context, 'source', cb, userdata)
+
+    def pa_context_get_source_info_by_index(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['source'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_source_info_by_name(self, context, name, cb, userdata):
+        return self._one(context, lambda: self._find('source', name), cb, userdata)
+
+    def pa_context_get_module_info_list(self, context, cb, userdata):
+        return self._list(context, 'module', cb, userdata)
+
+    def pa_context_get_module_info(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['module'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_sink_input_info_list(self, context, cb, userdata):
+        return self._list(context, 'sink_input', cb, userdata)
+
+    def pa_context_get_sink_input_info(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['sink_input'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_source_output_info_list(self, context, cb, userdata):
+        return self._list(context, 'source_output', cb, userdata)
+
+    def pa_context_get_source_output_info(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['source_output'].get(index),
+                         cb, userdata)
+
+    # Server changes
+
+    def pa_context_load_module(self, context, name, argument, cb, userdata):
+        def reply():
+            if (_text(name) in self.failing_modules):
+                context.errno = PA_ERR_MODINITFAILED
+                cb(context, PA_INVALID_INDEX, userdata)
+                return
+            module = self._add_module(_text(name), _text(argument))
+            module.loaded = True
+            cb(context, module.index, userdata)
+            self.notify('module', PA_SUBSCRIPTION_EVENT_NEW, module.index)
+        return self._request(context, reply)
+
+    def pa_context_unload_module(self, context, index, cb, userdata):
+        def reply():
+            ok = index in self.objects['module']
+            self._success(context, ok, cb, userdata)
+            if (ok):
+                self.remove('module', index)
+        return self._request(context, reply)
+
+    def _set_card_profile(self, context, find, profile, cb, userdata):
+        def reply():
+            card = find()
+            match = None
+            if (card is not None):
+                for i in range(card.n_profiles):
+                    if (card.profiles[i].name == _text(profile)):
+                        match = card.profiles[i]
+            self._success(context, match is not None, cb, userdata)
+            if (match is not None):
+                self.change('card', card.index, active_profile=Pointer(match))
+        return self._request(context, reply)
+
+    def pa_context_set_card_profile_by_index(self, context, index, profile,
+                                             cb, userdata):
+        return self._set_card_profile(context,
+                                      lambda: self.objects['card'].get(index),
+                                      profile, cb, userdata)
+
+    def pa_context_set_card_profile_by_name(self, context, name, profile,
+                                            cb, userdata):
+        return self._set_card_profile(context,
+                                      lambda: self._find('card', name),
+                                      profile, cb, userdata)
+
+    def _set_default(self, context, facility, name, cb, userdata):
+        def reply():
+            obj = self._find(facility, name)
+            self._success(context, obj is not None, cb, userdata)
+            if (obj is not None):
+                self.change('server', PA_INVALID_INDEX,
+                            **{'default_%s_name' % facility: obj.name})
+        return self._request(context, reply)
+
+    def pa_context_set_default_sink(self, context, name, cb, userdata):
+        return self._set_default(context, 'sink', name, cb, userdata)
+
+    def pa_context_set_default_source(self, context, name, cb, userdata):
+        return self._set_default(context, 'source', name, cb, userdata)
+
+    def _set(self, context, facility, find, fields, cb, userdata):
+        def reply():
+            obj = find()
+            self._success(context, obj is not None, cb, userdata)
+            if (obj is not None):
+                self.change(facility, obj.index, **fields)
+        return self._request(context, reply)
+
+    def _volume(self, cvolume):
+        return Struct(channels=cvolume.channels,
+                      values=list(cvolume.values[:cvolume.channels]))
+
+    def pa_context_set_sink_volume_by_index(self, context, index, volume, cb, userdata):
+        return self._set(context, 'sink', lambda: self.objects['sink'].get(index),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_sink_volume_by_name(self, context, name, volume, cb, userdata):
+        return self._set(context, 'sink', lambda: self._find('sink', name),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_sink_mute_by_index(self, context, index, mute, cb, userdata):
+        return self._set(context, 'sink', lambda: self.objects['sink'].get(index),
+                         dict(mute=mute), cb, userdata)
+
+    def pa_context_set_sink_mute_by_name(self, context, name, mute, cb, userdata):
+        return self._set(context, 'sink', lambda: self._find('sink', name),
+                         dict(mute=mute), cb, userdata)
+
+    def pa_context_set_source_volume_by_index(self, context, index, volume, cb, userdata):
+        return self._set(context, 'source', lambda: self.objects['source'].get(index),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_source_volume_by_name(self, context, name, volume, cb, userdata):
+        return self._set(context, 'source', lambda: self._find('source', name),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_source_mute_by_index(self, context, index, mute, cb, userdata):
+        return self._set(context, 'source', lambda: self.objects['source'].get(index),
+                         dict(mute=mute), cb, userdata)
+
+    def pa_context_set_source_mute_by_name(self, context, name, mute, cb, userdata):
+        return self._set(context, 'source', lambda: self._find('source', name),
+                         dict(mute=mute), cb, userdata)
+
+    def pa_context_set_sink_input_volume(self, context, index, volume, cb, userdata):
+        return self._set(context, 'sink_input',
+                         lambda: self.objects['sink_input'].get(index),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_sink_input_mute(self, context, index, mute, cb, userdata):
+        return self._set(context, 'sink_input',
+                         lambda: self.objects['sink_input'].get(index),
+                         dict(mute=mute), cb, userdata)
+
+    def pa_context_set_source_output_volume(self, context, index, volume, cb, userdata):
+        return self._set(context, 'source_output',
+                         lambda: self.objects['source_output'].get(index),
+                         dict(volume=self._volume(volume)), cb, userdata)
+
+    def pa_context_set_source_output_mute(self, context, index, mute, cb, userdata):
+        return self._set(context, 'source_output',
+                         lambda: self.objects['source_output'].get(index),
+                         dict(mute=mute), cb, userdata)
+
+    def _move(self, context, facility, index, device, find, cb, userdata):
+        def reply():
+            stream = self.objects[facility].get(index)
+            target = find()
+            ok = stream is not None and target is not None
+            self._success(context, ok, cb, userdata)
+            if (ok):
+                self.change(facility, index, **{device: target.index})
+        return self._request(context, reply)
+
+    def pa_context_move_sink_input_by_index(self, context, index, sink_index,
+                                            cb, userdata):
+        return self._move(context, 'sink_input', index, 'sink',
+                          lambda: self.objects['sink'].get(sink_index),
+                          cb, userdata)
+
+    def pa_context_move_sink_input_by_name(self, context, index, sink_name,
+                                           cb, userdata):
+        return self._move(context, 'sink_input', index, 'sink',
+                          lambda: self._find('sink', sink_name), cb, userdata)
+
+    def pa_context_move_source_output_by_index(self, context, index, source_index,
+                                               cb, userdata):
+        return self._move(context, 'source_output', index, 'source',
+                          lambda: self.objects['source'].get(source_index),
+                          cb, userdata)
+
+    def pa_context_move_source_output_by_name(self, context, index, source_name,
+                                              cb, userdata):
+        return self._move(context, 'source_output', index, 'source',
+                          lambda: self._find('source', source_name), cb, userdata)
+
+    def _kill(self, context, facility, index, cb, userdata):
+        def reply():
+            ok = index in self.objects[facility]
+            self._success(context, ok, cb, userdata)
+            if (ok):
+                self.remove(facility, index)
+        return self._request(context, reply)
+
+    def pa_context_kill_sink_input(self, context, index, cb, userdata):
+        return self._kill(context, 'sink_input', index, cb, userdata)
+
+    def pa_context_kill_source_output(self, context, index, cb, userdata):
+        return self._kill(context, 'source_output', index, cb, userdata)
+
+    # Sample cache
+
+    def pa_context_get_sample_info_list(self, context, cb, userdata):
+        return self._list(context, 'sample_cache', cb, userdata)
+
+    def pa_context_get_sample_info_by_index(self, context, index, cb, userdata):
+        return self._one(context, lambda: self.objects['sample_cache'].get(index),
+                         cb, userdata)
+
+    def pa_context_get_sample_info_by_name(self, context, name, cb, userdata):
+        return self._one(context, lambda: self._find('sample_cache', name),
+                         cb, userdata)
+
+    def pa_context_play_sample(self, context, name, device, volume, cb, userdata):
+        def reply():
+            sample = self._find('sample_cache', name)
+            sink = self._find('sink', device if device is not None
+                              else self.server.default_sink_name)
+            ok = sample is not None and sink is not None
+            self._success(context, ok, cb, userdata)
+            if (ok):
+                self.played_samples.append((sample.name, sink.name, volume))
+        return self._request(context, reply)
+
+    def pa_context_remove_sample(self, context, name, cb, userdata):
+        def reply():
+            sample = self._find('sample_cache', name)
+            self._success(context, sample is not None, cb, userdata)
+            if (sample is not None):
+                self.remove('sample_cache', sample.index)
+        return self._request(context, reply)
+
+    def _store_sample(self, stream):
+        """
+        Store an uploaded sample, replacing any of the same name.
+        """
+        replaced = self._find('sample_cache', stream.name)
+        if (replaced is not None):
+            del self.objects['sample_cache'][replaced.index]
+        volume = pa_cvolume()
+        volume.channels = stream.channels
+        volume.values = [PA_VOLUME_NORM] * stream.channels
+        index = self._next_index('sample_cache')
+        self.objects['sample_cache'][index] = Struct(
+            name=stream.name, index=index, volume=volume,
+            sample_spec=Struct(format=stream.format, rate=stream.rate,
+                               channels=stream.channels),
+            duration=len(stream.played) * 1000000 // stream.byte_rate,
+            bytes=len(stream.played), lazy=0, filename=None)
+        if (replaced is not None):
+            self.notify('sample_cache', PA_SUBSCRIPTION_EVENT_REMOVE, replaced.index)
+        self.notify('sample_cache', PA_SUBSCRIPTION_EVENT_NEW, index)
+
+    # Streams
+
+    def pa_stream_new(self, context, name, spec, channel_map):
+        if (context.state != PA_CONTEXT_READY):
+            context.errno = PA_ERR_BADSTATE
+            return None
+        return FakeStream(self, context, name, spec)
+
+    def pa_stream_unref(self, stream):
+        pass
+
+    def pa_stream_get_state(self, stream):
+        return stream.state
+
+    def pa_stream_set_state_callback(self, stream, cb, userdata):
+        stream.state_cb = cb
+
+    def pa_stream_set_write_callback(self, stream, cb, userdata):
+        stream.request_cb = cb
+
+    def pa_stream_set_read_callback(self, stream, cb, userdata):
+        stream.request_cb = cb
+
+    def pa_stream_set_underflow_callback(self, stream, cb, userdata):
+        stream.underflow_cb = cb
+
+    def pa_stream_set_overflow_callback(self, stream, cb, userdata):
+        stream.overflow_cb = cb
+
+    def _connect_stream(self, stream, direction, device, attr):
+        if (stream.state != PA_STREAM_UNCONNECTED):
+            stream.context.errno = PA_ERR_BADSTATE
+            return -1
+        stream.direction = direction
+        stream.set_attr(attr)
+        if (direction == 'upload'):
+            stream.device = self.server
+        else:
+            facility = 'sink' if direction == 'playback' else 'source'
+            if (device is None):
+                device = getattr(self.server, 'default_%s_name' % facility)
+            stream.device = self._find(facility, device)
+        stream.set_state(PA_STREAM_CREATING)
+        if (self.respond):
+            if (stream.device is None):
+                stream.context.errno = PA_ERR_NOENTITY
+                state = PA_STREAM_FAILED
+            else:
+                state = PA_STREAM_READY
+            stream.context.mainloop.schedule(self.latency, stream.set_state, state)
+        return 0
+
+    def pa_stream_connect_playback(self, stream, device, attr, flags, volume,
+                                   sync_stream):
+        return self._connect_stream(stream, 'playback', device, attr)
+
+    def pa_stream_connect_record(self, stream, device, attr, flags):
+        return self._connect_stream(stream, 'record', device, attr)
+
+    def pa_stream_connect_upload(self, stream, length):
+        stream.length = length
+        return self._connect_stream(stream, 'upload', None, None)
+
+    def pa_stream_finish_upload(self, stream):
+        if (stream.state != PA_STREAM_READY):
+            stream.context.errno = PA_ERR_BADSTATE
+            return -1
+        def reply():
+            self._store_sample(stream)
+            stream.set_state(PA_STREAM_TERMINATED)
+        stream.context.mainloop.schedule(self.latency, reply)
+        return 0
+
+    def pa_stream_disconnect(self, stream):
+        if (stream.state in (PA_STREAM_CREATING, PA_STREAM_READY)):
+            stream.set_state(PA_STREAM_TERMINATED)
+        return 0
+
+    def pa_stream_get_buffer_attr(self, stream):
+        return Pointer(stream.attr)
+
+    def pa_stream_set_buffer_attr(self, stream, attr, cb, userdata):
+        def reply():
+            stream.set_attr(attr)
+            cb(stream, 1, userdata)
+        return self._request(stream.context, reply)
+
+    def pa_stream_writable_size(self, stream):
+        stream.update()
+        return stream.writable()
+
+    def pa_stream_readable_size(self, stream):
+        stream.update()
+        return stream.readable()
+
+    def pa_stream_begin_write(self, stream, data, nbytes):
+        return stream.begin_write(data, nbytes)
+
+    def pa_stream_write(self, stream, data, nbytes, free_cb, offset, seek):
+        return stream.write(data, nbytes)
+
+    def pa_stream_peek(self, stream, data, nbytes):
+        return stream.peek(data, nbytes)
+
+    def pa_stream_drop(self, stream):
+        return stream.drop()
+
+    def pa_stream_drain(self, stream, cb, userdata):
+        stream.update()
+        stream.playing = True
+        return self._request(stream.context, lambda: cb(stream, 1, userdata),
+                             stream.queued / stream.byte_rate)
+
+    def pa_stream_cork(self, stream, pause, cb, userdata):
+        def reply():
+            stream.update()
+            stream.corked = bool(pause)
+            cb(stream, 1, userdata)
+        return self._request(stream.context, reply)
+
+    def pa_stream_flush(self, stream, cb, userdata):
+        def reply():
+            stream.queued = 0.0
+            stream.available = 0.0
+            cb(stream, 1, userdata)
+        return self._request(stream.context, reply)
@@ -0,0 +1,353 @@
+"""
+Persistent helper process holding a warm, connected
+:class:`pypulseaudio.PulseAudio`, serving calls from short-lived clients
+over a local Unix socket.  Clients, e.g. hook scripts run for every event,
+thereby avoid loading libpulse and connecting and authenticating on every
+invocation.
+
+Start the helper once, e.g. with the user session::
+
+    python -m pypulseaudio.helper serve
+
+and call any of its methods from other processes::
+
+    python -m pypulseaudio.helper call set_default_sink '"alsa_output.usb"'
+
+or from python::
+
+    helper = HelperClient()
+    info = helper.get_server_info()
+
+Requests and replies are single lines of JSON on the socket, a request
+being ``{"method": name, "args": [...], "kwargs": {...}}`` and a reply
+``{"result": value}`` or ``{"error": message, "type": exception name}``.
+Any number of clients may be connected, their calls being served one at a
+time, in order of arrival.  Only public methods taking JSON arguments may
+be called; those managing the connection itself or returning generators
+may not.
+"""
+from __future__ import print_function, unicode_literals
+
+import errno
+import json
+import os
+import select
+import socket
+import sys
+
+from pypulseaudio import PulseAudioTimeout
+
+excluded_methods = ('connect', 'disconnect', 'reconnect', 'batch', 'subscribe',
+                    'unsubscribe', 'process_events', 'upload_sample', 'snapshot')
+
+
+def default_socket_path():
+    """
+    Socket path used unless given: pypulseaudio-helper in the user's
+    runtime directory, or a per-user name in the temporary directory.
+    """
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if (runtime):
+        return os.path.join(runtime, 'pypulseaudio-helper')
+    return os.path.join(os.environ.get('TMPDIR', '/tmp'),
+                        'pypulseaudio-helper-%d' % os.getuid())
+
+
+def _json_default(value):
+    to_dict = getattr(value, 'to_dict', None)
+    if (to_dict is not None):
+        return to_dict()
+    if (isinstance(value, bytes)):
+        return value.decode('utf-8', 'replace')
+    raise TypeError('Cannot encode %r' % (value,))
+
+
+class HelperServer(object):
+    """
+    Server for :class:`HelperClient` requests, calling a connection held
+    by a :class:`pypulseaudio.pool.ConnectionPool`, such that the helper
+    reconnects whenever the pulseaudio server has been restarted.
+
+    :param path: socket path, defaults to :func:`default_socket_path`
+    :type path: string
+    :param server: pulseaudio server string, None for the default server
+    :type server: string
+    :param app_name: application name of the connection
+    :type app_name: string
+    :param options: further keyword arguments passed to
+        :class:`pypulseaudio.PulseAudio`, e.g. timeout or backend
+    """
+    def __init__(self, path=None, server=None, app_name='pypulseaudio-helper',
+                 **options):
+        from pypulseaudio.pool import ConnectionPool
+        options.setdefault('threaded', False)
+        self.path = path or default_socket_path()
+        self._server = server
+        self._pool = ConnectionPool(app_name, **options)
+        self._socket = None
+        self._wakeup = None
+        self._serving = False
+
+    def start(self):
+        """
+        Connect to pulseaudio and listen on the socket, replacing any stale
+        socket left by a previous helper.  Raises if another helper is
+        listening on the socket.
+        """
+        self._remove_stale_socket()
+        self._pool.get(self._server)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            self._socket.bind(self.path)
+        finally:
+            os.umask(umask)
+        self._socket.listen(16)
+        # Written to by close(), such that serving stops from any thread
+        self._wakeup = os.pipe()
+
+    def _remove_stale_socket(self):
+        """
+        Remove the socket left by a helper which has exited, as shown by
+        connections being refused.
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except socket.error as e:
+            if (e.errno == errno.ECONNREFUSED):
+                os.unlink(self.path)
+            elif (e.errno != errno.ENOENT):
+                raise
+            return
+        finally:
+            probe.close()
+        raise Exception('A helper is already listening on %s' % self.path)
+
+    def serve_forever(self):
+        """
+        Serve clients until :meth:`close` is called or the process exits.
+        """
+        if (self._socket is None):
+            self.start()
+        clients = {}
+        listener = self._socket
+        wakeup = self._wakeup[0]
+        self._serving = True
+        try:
+            while (self._socket is not None):
+                readable = select.select([listener, wakeup] + list(clients), [], [])[0]
+                if (wakeup in readable):
+                    return
+                for sock in readable:
+                    if (sock is listener):
+                        (conn, address) = listener.accept()
+                        clients[conn] = b''
+                    elif (not self._receive(sock, clients)):
+                        del clients[sock]
+                        sock.close()
+        finally:
+            self._serving = False
+            for sock in clients:
+                sock.close()
+            self._release(listener)
+
+    def close(self):
+        """
+        Stop serving and remove the socket.
+        """
+        (sock, self._socket) = (self._socket, None)
+        if (sock is not None):
+            if (os.path.exists(self.path)):
+                os.unlink(self.path)
+            if (self._serving):
+                os.write(self._wakeup[1], b'x')
+            else:
+                self._release(sock)
+        self._pool.close()
+
+    def _release(self, listener):
+        listener.close()
+        (wakeup, self._wakeup) = (self._wakeup, None)
+        if (wakeup is not None):
+            os.close(wakeup[0])
+            os.close(wakeup[1])
+
+    def _receive(self, sock, clients):
+        """
+        Read from a client and reply to each complete request.
+
+        :return: False once the client has closed the connection
+        """
+        try:
+            data = sock.recv(65536)
+        except (OSError, socket.error):
+            return False
+        if (not data):
+            return False
+        lines = (clients[sock] + data).split(b'\n')
+        clients[sock] = lines.pop()
+        for line in lines:
+            reply = self.encode(self.handle(line))
+            try:
+                sock.sendall(reply.encode('utf-8') + b'\n')
+            except (OSError, socket.error):
+                return False
+        return True
+
+    def encode(self, reply):
+        """
+        Encode a reply as JSON, replacing a result which cannot be encoded
+        by an error reply.
+
+        :param reply: reply, as returned by :meth:`handle`
+        :type reply: dict
+        :rtype: string
+        """
+        try:
+            return json.dumps(reply, default=_json_default)
+        except (TypeError, ValueError) as e:
+            return json.dumps({'error': 'Cannot encode result: %s' % e,
+                               'type': type(e).__name__})
+
+    def handle(self, line):
+        """
+        Carry out a single request.
+
+        :param line: JSON request
+        :type line: bytes
+        :return: reply
+        :rtype: dict
+        """
+        try:
+            request = json.loads(line.decode('utf-8'))
+            method = request['method']
+            if (method.startswith('_') or method.startswith('iter_') or
+                method in excluded_methods):
+                raise Exception('Method not allowed: ' + method)
+            pulse = self._pool.get(self._server)
+            f = getattr(pulse, method, None)
+            if (not callable(f)):
+                raise Exception('Unknown method: ' + method)
+            return {'result': f(*request.get('args', ()),
+                                **request.get('kwargs', {}))}
+        except Exception as e:
+            return {'error': '%s' % e, 'type': type(e).__name__}
+
+
+class HelperClient(object):
+    """
+    Client of a :class:`HelperServer`, on which any allowed
+    :class:`pypulseaudio.PulseAudio` method may be called, returning its
+    result decoded from JSON.  The socket is connected on first use and
+    kept open until :meth:`close`.
+
+    :param path: socket path, defaults to :func:`default_socket_path`
+    :type path: string
+    :param timeout: time in seconds allowed for each call
+    :type timeout: float
+    """
+    def __init__(self, path=None, timeout=5.0):
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self._socket = None
+        self._stream = None
+
+    def __getattr__(self, name):
+        if (name.startswith('_')):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a method of the helper's connection.
+        """
+        if (self._socket is None):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            try:
+                self._socket.connect(self.path)
+            except:
+                self.close()
+                raise
+            self._stream = self._socket.makefile('rwb')
+        request = {'method': method, 'args': args, 'kwargs': kwargs}
+        try:
+            self._stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            self._stream.flush()
+            line = self._stream.readline()
+        except:
+            self.close()
+            raise
+        if (not line):
+            self.close()
+            raise Exception('Helper closed the connection')
+        reply = json.loads(line.decode('utf-8'))
+        if ('error' in reply):
+            if (reply.get('type') == 'PulseAudioTimeout'):
+                raise PulseAudioTimeout(reply['error'])
+            raise Exception(reply['error'])
+        return reply['result']
+
+    def close(self):
+        """
+        Close the connection to the helper.
+        """
+        if (self._stream is not None):
+            self._stream.close()
+            self._stream = None
+        if (self._socket is not None):
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _argument(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m pypulseaudio.helper')
+    parser.add_argument('--socket', help='socket path')
+    commands = parser.add_subparsers(dest='command')
+    serve = commands.add_parser('serve', help='run the helper')
+    serve.add_argument('--server', help='pulseaudio server string')
+    call = commands.add_parser('call', help='call a method of the helper')
+    call.add_argument('method')
+    call.add_argument('args', nargs='*',
+                      help='arguments, as JSON values or plain strings')
+    options = parser.parse_args(argv)
+    if (options.command == 'serve'):
+        server = HelperServer(options.socket, options.server)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+    elif (options.command == 'call'):
+        with HelperClient(options.socket) as client:
+            try:
+                result = client.call(options.method,
+                                     *[_argument(i) for i in options.args])
+            except Exception as e:
+                print('%s' % e, file=sys.stderr)
+                return 1
+        print(json.dumps(result, indent=2))
+    else:
+        parser.print_help()
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
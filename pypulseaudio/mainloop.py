@@ -0,0 +1,159 @@
+"""
+A single main loop servicing the connections of any number of
+:class:`pypulseaudio.PulseAudio` instances from one thread, e.g.::
+
+    loop = MainLoop()
+    for server in servers:
+        pulse = PulseAudio('myapp', mainloop=loop)
+        pulse.connect(server)
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, handler)
+    loop.run_forever()
+
+The contexts of all attached instances share one pa_mainloop, whose file
+descriptors and timers are watched with a single poll() call, hence events
+for every connection are dispatched as soon as they arrive whether or not
+a call is waiting on that connection, and idle connections cost nothing.
+
+The loop is reentrant: subscription handlers are called outside of any
+pulseaudio callback, and may make blocking calls on any attached instance,
+which then run the same loop until their replies have arrived.  Blocking
+calls must not be made from within pulseaudio callbacks, e.g. stream
+callbacks, nor from other threads.
+"""
+from __future__ import unicode_literals
+
+import weakref
+
+from pypulseaudio.backend import get_default_backend
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+class MainLoop(object):
+    """
+    Main loop driver shared by instances created with ``mainloop=...``.
+
+    :param backend: libpulse backend, shared by all attached instances,
+        defaults to the default backend
+    """
+    def __init__(self, backend=None):
+        self._lib = backend if backend is not None else get_default_backend()
+        self._main_loop = self._lib.pa_mainloop_new()
+        self._api = self._lib.pa_mainloop_get_api(self._main_loop)
+        self._instances = weakref.WeakSet()
+        self._dispatching = False
+        self._quit = False
+
+    def attach(self, pulse):
+        """
+        Add an instance whose subscription events are to be delivered by
+        :meth:`iterate`.  Called by :class:`pypulseaudio.PulseAudio` itself.
+        """
+        self._instances.add(pulse)
+
+    def detach(self, pulse):
+        """
+        Stop delivering an instance's subscription events.
+        """
+        self._instances.discard(pulse)
+
+    @property
+    def instances(self):
+        """
+        :return: attached instances
+        :rtype: list
+        """
+        return list(self._instances)
+
+    def _run(self, deadline):
+        """
+        Poll the file descriptors and timers of every attached context
+        until some are ready or the deadline passes, None for no deadline,
+        and dispatch their events.
+        """
+        if (self._dispatching):
+            raise Exception('Blocking call made from within a main loop callback')
+        if (deadline is None):
+            usec = -1
+        else:
+            # pa_mainloop_prepare() takes its timeout in microseconds
+            usec = max(0, int((deadline - monotonic()) * 1000000))
+        self._lib.pa_mainloop_prepare(self._main_loop, usec)
+        self._lib.pa_mainloop_poll(self._main_loop)
+        self._dispatching = True
+        try:
+            return self._lib.pa_mainloop_dispatch(self._main_loop)
+        finally:
+            self._dispatching = False
+
+    def _dispatch_pending(self):
+        """
+        Dispatch any events already pending without blocking.  Within a
+        callback pending events are left to the iteration in progress.
+        """
+        if (self._dispatching):
+            return
+        self._dispatching = True
+        try:
+            while (self._lib.pa_mainloop_iterate(self._main_loop, 0, None) > 0):
+                pass
+        finally:
+            self._dispatching = False
+
+    def iterate(self, timeout=0):
+        """
+        Wait up to timeout seconds for events on any attached connection,
+        dispatch them, and deliver the subscription events which are due to
+        their handlers.
+
+        :param timeout: maximum time in seconds to wait, None to wait until
+            some events have arrived or :meth:`quit` is called
+        :type timeout: float
+        :return: number of subscription events delivered
+        :rtype: integer
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        instances = self.instances
+        for pulse in instances:
+            next_due = pulse._next_due()
+            if (next_due is not None):
+                deadline = next_due if deadline is None else min(deadline, next_due)
+        if (not self._quit):
+            self._run(deadline)
+        count = 0
+        for pulse in instances:
+            count += pulse._deliver_due()
+        return count
+
+    def run_forever(self):
+        """
+        Service all attached connections until :meth:`quit` is called, e.g.
+        from a subscription handler or another thread.
+        """
+        self._quit = False
+        try:
+            while (not self._quit):
+                self.iterate(None)
+        finally:
+            self._quit = False
+
+    def quit(self):
+        """
+        Make :meth:`run_forever` return once the current iteration has
+        completed.  May be called from any thread.
+        """
+        self._quit = True
+        self._lib.pa_mainloop_wakeup(self._main_loop)
+
+    def free(self):
+        """
+        Free the pa_mainloop.  All attached instances must have been
+        disconnected.
+        """
+        if (self._main_loop is not None):
+            self._lib.pa_mainloop_free(self._main_loop)
+            self._main_loop = None
+            self._api = None
@@ -0,0 +1,267 @@
+"""
+Peak level metering of any number of sources, typically the monitor sources
+of sinks, over a single connection and main loop, e.g.::
+
+    meter = LevelMeter(pulse, interval=0.1)
+    meter.add_sinks()
+    while (True):
+        levels = meter.run(1.0)
+        if (levels is not None):
+            for (name, level) in levels.items():
+                print(name, level.peak, level.rms)
+
+Each source is recorded by a low rate stream with PA_STREAM_PEAK_DETECT,
+for which the server reduces the audio to the peaks over each sample
+period, so that metering many sources costs little server or client CPU.
+Peak and RMS levels are computed per channel over the samples received in
+each update interval, for all sources at once with numpy if it is installed
+and otherwise in pure python.  Levels are linear, 1.0 being full scale.
+"""
+from __future__ import division, unicode_literals
+
+import math
+import sys
+from array import array
+
+from pypulseaudio.constants import *
+from pypulseaudio.records import Record
+from pypulseaudio.stream import RecordStream
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+class Level(Record):
+    """
+    Levels of a metered source over an update interval.
+
+    :param name: name under which the source was added
+    :param peak: peak level per channel
+    :param rms: RMS level per channel
+    :param frames: number of peak samples per channel the levels cover
+    """
+    __slots__ = ('name', 'peak', 'rms', 'frames')
+    fields = __slots__
+
+    def __init__(self, name, peak, rms, frames):
+        self.name = name
+        self.peak = peak
+        self.rms = rms
+        self.frames = frames
+
+
+class PeakStream(RecordStream):
+    """
+    Record stream of the peaks of a source, which flags the arrival of data
+    for :class:`LevelMeter` to collect.  It is neither moved to another
+    source by the server nor prevents the source from suspending.
+    """
+    _flags = PA_STREAM_PEAK_DETECT | PA_STREAM_DONT_MOVE | PA_STREAM_DONT_INHIBIT_AUTO_SUSPEND
+
+    def __init__(self, *args, **kwargs):
+        super(PeakStream, self).__init__(*args, **kwargs)
+        self.pending = False
+
+    def _request_cb(self, stream, nbytes, userdata):
+        self.pending = True
+        self._signal()
+
+
+def _analyse(meters):
+    """
+    Compute the levels of meters with data, as (name, data, channels)
+    tuples, in a single pass per channel count.
+    """
+    levels = {}
+    if (numpy is not None):
+        groups = {}
+        for (name, data, channels) in meters:
+            groups.setdefault(channels, []).append((name, data))
+        for (channels, group) in groups.items():
+            samples = [numpy.frombuffer(data, dtype='<f4').reshape(-1, channels)
+                       for (name, data) in group]
+            counts = [len(s) for s in samples]
+            offsets = numpy.cumsum([0] + counts[:-1])
+            samples = numpy.concatenate(samples)
+            peaks = numpy.maximum.reduceat(numpy.abs(samples), offsets)
+            squares = numpy.add.reduceat(samples * samples, offsets)
+            rms = numpy.sqrt(squares / numpy.array(counts, dtype=float)[:, None])
+            for (i, (name, data)) in enumerate(group):
+                levels[name] = Level(name, peaks[i].tolist(), rms[i].tolist(),
+                                     counts[i])
+        return levels
+    for (name, data, channels) in meters:
+        samples = array('f')
+        samples.frombytes(bytes(data))
+        if (sys.byteorder == 'big'):
+            samples.byteswap()
+        frames = len(samples) // channels
+        columns = [samples[c::channels] for c in range(channels)]
+        levels[name] = Level(name,
+                             [max(abs(v) for v in column) for column in columns],
+                             [math.sqrt(sum(v * v for v in column) / frames)
+                              for column in columns],
+                             frames)
+    return levels
+
+
+class LevelMeter(object):
+    """
+    Meter of the peak and RMS levels of many sources, sharing the main loop
+    of a connection such that a single thread can watch any number of
+    sinks.  Levels are published once per update interval by :meth:`run`,
+    for the sources from which samples were received during the interval.
+
+    :param pulse: connected instance
+    :type pulse: :class:`pypulseaudio.PulseAudio`
+    :param callback: called with the dict of :class:`Level` by source name
+        at each update, from the thread calling :meth:`run`
+    :type callback: callable
+    :param interval: time in seconds between level updates
+    :type interval: float
+    :param rate: peak samples per second recorded from each source
+    :type rate: int
+    """
+    def __init__(self, pulse, callback=None, interval=0.1, rate=50):
+        self._pulse = pulse
+        self.callback = callback
+        self.interval = interval
+        self.rate = rate
+        self._streams = {}
+        self._data = {}
+        self._next = None
+
+    @property
+    def sources(self):
+        """
+        Names of the metered sources.
+        """
+        return list(self._streams)
+
+    def add(self, source, channels=None, name=None, timeout=None):
+        """
+        Start metering a source.
+
+        :param source: source name
+        :type source: string
+        :param channels: number of channels to meter, None for the source's own
+        :type channels: int
+        :param name: name to publish levels under, defaults to the source name
+        :type name: string
+        """
+        if (channels is None):
+            info = self._pulse.get_source_info_by_name(source, timeout=timeout)
+            if (not info):
+                raise Exception('No such source: ' + source)
+            channels = info[0]['volume']['channels']
+        self._open([(name or source, source, channels)], timeout)
+
+    def add_sinks(self, predicate=None, timeout=None):
+        """
+        Start metering the monitor sources of all sinks matching the
+        predicate, published under the sink names.  The streams are
+        connected concurrently, taking a single round trip.
+
+        :param predicate: function taking a sink's info and returning True
+            if it should be metered, None for all sinks
+        :type predicate: callable
+        :return: names of the sinks added
+        :rtype: list of string
+        """
+        sinks = self._pulse.get_sink_info_list(timeout=timeout)
+        if (sinks is None):
+            return None
+        meters = [(sink['name'], sink['monitor_source_name'],
+                   sink['volume']['channels'])
+                  for sink in sinks
+                  if (sink['monitor_source_name'] and
+                      sink['name'] not in self._streams and
+                      (predicate is None or predicate(sink)))]
+        self._open(meters, timeout)
+        return [meter[0] for meter in meters]
+
+    def remove(self, name, timeout=None):
+        """
+        Stop metering a source.
+        """
+        stream = self._streams.pop(name)
+        self._data.pop(name, None)
+        stream.disconnect(timeout)
+
+    def close(self, timeout=None):
+        """
+        Stop metering all sources.
+        """
+        for name in self.sources:
+            self.remove(name, timeout)
+
+    def run(self, timeout=0):
+        """
+        Run the main loop for up to timeout seconds, until the next update
+        is due, collecting samples from all sources, and publish the levels.
+
+        :param timeout: maximum time in seconds to wait for the update
+        :type timeout: float
+        :return: levels by name, or None if no update was due
+        :rtype: dict of :class:`Level`
+        """
+        pulse = self._pulse
+        end = monotonic() + timeout
+        if (self._next is None):
+            self._next = monotonic() + self.interval
+        with pulse._locked():
+            while (True):
+                self._collect()
+                now = monotonic()
+                if (now >= self._next):
+                    break
+                if (now >= end or pulse.state != PA_CONTEXT_READY):
+                    return None
+                pulse._run_once(min(end, self._next))
+            meters = [(name, data, self._streams[name].channels)
+                      for (name, data) in self._data.items() if data]
+            self._data = dict((name, bytearray()) for name in self._streams)
+        self._next = max(self._next + self.interval, now)
+        levels = _analyse(meters)
+        if (self.callback is not None):
+            self.callback(levels)
+        return levels
+
+    def _open(self, meters, timeout):
+        pulse = self._pulse
+        deadline = pulse._deadline(timeout)
+        streams = []
+        try:
+            with pulse._locked():
+                for (name, source, channels) in meters:
+                    # Fragments of half an interval, such that each update
+                    # covers at least one from every source
+                    frames = max(1, int(self.rate * self.interval / 2))
+                    stream = PeakStream(pulse, 'peak ' + name, rate=self.rate,
+                                        channels=channels, format='float32le',
+                                        fragsize=4 * channels * frames)
+                    stream._start(source)
+                    streams.append(stream)
+                pulse._wait_until(lambda: all(stream._check_state() == PA_STREAM_READY
+                                              for stream in streams),
+                                  deadline)
+        except:
+            for stream in streams:
+                stream.disconnect(timeout=0.1)
+            raise
+        for ((name, source, channels), stream) in zip(meters, streams):
+            self._streams[name] = stream
+            self._data[name] = bytearray()
+
+    def _collect(self):
+        for (name, stream) in self._streams.items():
+            if (stream.pending):
+                stream.pending = False
+                self._data[name] += stream.read_available()
@@ -0,0 +1,181 @@
+"""
+Instrumentation of server operations.  A metrics hook passed to
+:class:`pypulseaudio.PulseAudio` with ``metrics=...`` is given a
+:class:`Trace` of every call made to the server, e.g.::
+
+    metrics = PrometheusMetrics()
+    pulse = PulseAudio('myapp', metrics=metrics)
+    ...
+    text = metrics.render()
+
+Without a hook no traces are made.
+"""
+from __future__ import unicode_literals
+
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Trace(object):
+    """
+    Measurements of a single call, covering all of its server operations.
+
+    :param name: name of the method called, or 'batch'
+    :param send: time in seconds taken to send the operations
+    :param wait: time in seconds spent waiting for replies, excluding decoding
+    :param decode: time in seconds spent converting replies to python types
+    :param iterations: number of main loop iterations, or of wakeups when
+        the threaded main loop is used, whilst waiting
+    :param entries: number of entries returned
+    :param outcome: one of 'ok', 'failure' or 'timeout'
+    """
+    __slots__ = ('name', 'send', 'wait', 'decode', 'iterations', 'entries',
+                 'outcome')
+
+    def __init__(self, name):
+        self.name = name
+        self.send = 0.0
+        self.wait = 0.0
+        self.decode = 0.0
+        self.iterations = 0
+        self.entries = 0
+        self.outcome = 'ok'
+
+    @property
+    def total(self):
+        """
+        Wall time in seconds taken by the call.
+        """
+        return self.send + self.wait + self.decode
+
+    def __repr__(self):
+        return ('Trace(%s, send=%.6f, wait=%.6f, decode=%.6f, iterations=%d, '
+                'entries=%d, outcome=%s)' % (self.name, self.send, self.wait,
+                                              self.decode, self.iterations,
+                                              self.entries, self.outcome))
+
+
+class MetricsHook(object):
+    """
+    Base class for metrics hooks.  :meth:`observe` is called once each call
+    has completed, failed or timed out, whilst the connection is still held
+    by the calling thread, and must therefore return promptly and not call
+    the connection.  Any object with an :meth:`observe` method may be used.
+    """
+    def observe(self, trace):
+        """
+        Ignores the trace; subclasses override this.
+
+        :param trace: measurements of the completed call
+        :type trace: :class:`Trace`
+        """
+
+
+def _labels(labels):
+    if (not labels):
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, v.replace('\\', '\\\\').replace('"', '\\"'))
+                             for (k, v) in labels)
+
+
+class Counter(object):
+    """
+    Monotonically increasing values, one per label set.
+    """
+    def __init__(self, name, doc):
+        self.name = name
+        self.doc = doc
+        self.values = {}
+
+    def inc(self, labels, value=1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self):
+        lines = ['# HELP %s %s' % (self.name, self.doc),
+                 '# TYPE %s counter' % self.name]
+        for labels in sorted(self.values):
+            lines.append('%s%s %s' % (self.name, _labels(labels),
+                                      self.values[labels]))
+        return lines
+
+
+class Histogram(object):
+    """
+    Cumulative bucketed observations, one set of buckets per label set.
+    """
+    def __init__(self, name, doc, buckets):
+        self.name = name
+        self.doc = doc
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, labels, value):
+        entry = self.values.get(labels)
+        if (entry is None):
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        lines = ['# HELP %s %s' % (self.name, self.doc),
+                 '# TYPE %s histogram' % self.name]
+        for labels in sorted(self.values):
+            (counts, total, count) = self.values[labels]
+            cumulative = 0
+            for (bound, n) in zip(self.buckets + ('+Inf',), counts):
+                cumulative += n
+                lines.append('%s_bucket%s %d' % (self.name,
+                                                 _labels(labels + (('le', str(bound)),)),
+                                                 cumulative))
+            lines.append('%s_sum%s %r' % (self.name, _labels(labels), total))
+            lines.append('%s_count%s %d' % (self.name, _labels(labels), count))
+        return lines
+
+
+class PrometheusMetrics(MetricsHook):
+    """
+    Metrics hook keeping Prometheus style counters and histograms labelled
+    by method, which are exported in the Prometheus text format by
+    :meth:`render`.  Instances may be shared by any number of connections.
+
+    :param prefix: metric name prefix
+    :type prefix: string
+    :param buckets: histogram bucket upper bounds, in seconds
+    :type buckets: sequence of float
+    """
+    def __init__(self, prefix='pulseaudio', buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.calls = Counter(prefix + '_calls_total',
+                             'Server calls by method and outcome.')
+        self.seconds = Histogram(prefix + '_call_seconds',
+                                 'Server call time by method and phase.',
+                                 buckets)
+        self.iterations = Counter(prefix + '_dispatch_iterations_total',
+                                  'Main loop iterations whilst waiting, by method.')
+        self.entries = Counter(prefix + '_entries_total',
+                               'Entries returned, by method.')
+
+    def observe(self, trace):
+        method = (('method', trace.name),)
+        with self._lock:
+            self.calls.inc(method + (('outcome', trace.outcome),))
+            self.seconds.observe(method + (('phase', 'send'),), trace.send)
+            self.seconds.observe(method + (('phase', 'wait'),), trace.wait)
+            self.seconds.observe(method + (('phase', 'decode'),), trace.decode)
+            self.iterations.inc(method, trace.iterations)
+            self.entries.inc(method, trace.entries)
+
+    def render(self):
+        """
+        :return: all metrics in the Prometheus text exposition format
+        :rtype: string
+        """
+        with self._lock:
+            lines = []
+            for metric in (self.calls, self.seconds, self.iterations, self.entries):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,130 @@
+from __future__ import unicode_literals
+
+import threading
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+
+
+class ConnectionPool(object):
+    """
+    Pool of warm :class:`pypulseaudio.PulseAudio` connections, one per
+    server string, for managing pulseaudio on many hosts.
+
+    Connections are created on first use and re-created whenever their
+    context has moved to the failed or terminated state, e.g. because the
+    server was restarted.  Unless overridden, connections are created with
+    ``threaded=True`` so that they may be shared by any number of threads.
+
+    Example::
+
+        pool = ConnectionPool('myapp', timeout=2.0)
+        (results, errors) = pool.fan_out(['tcp:host1', 'tcp:host2'],
+                                         'get_server_info')
+
+    :param app_name: application name used for every connection
+    :type app_name: string
+    :param options: further keyword arguments passed to
+        :class:`pypulseaudio.PulseAudio`, e.g. cache, records or timeout
+    """
+    def __init__(self, app_name, **options):
+        self._app_name = app_name
+        self._options = dict(threaded=True)
+        self._options.update(options)
+        self._connections = {}
+        self._server_locks = {}
+        self._lock = threading.Lock()
+
+    def servers(self):
+        """
+        :return: server strings with a pooled connection
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._connections)
+
+    def get(self, server):
+        """
+        Obtain a connected instance for a server, connecting or reconnecting
+        as required.
+
+        :param server: server string as passed to
+            :meth:`pypulseaudio.PulseAudio.connect`, None for the default server
+        :type server: string
+        :return: connected instance
+        :rtype: :class:`pypulseaudio.PulseAudio`
+        """
+        with self._lock:
+            server_lock = self._server_locks.setdefault(server, threading.Lock())
+        with server_lock:
+            pulse = self._connections.get(server)
+            if (pulse is not None and pulse.state == PA_CONTEXT_READY):
+                return pulse
+            if (pulse is not None):
+                self._discard(pulse)
+            pulse = PulseAudio(self._app_name, **self._options)
+            try:
+                pulse.connect(server)
+            except:
+                self._discard(pulse)
+                raise
+            with self._lock:
+                self._connections[server] = pulse
+            return pulse
+
+    def fan_out(self, servers, method, *args, **kwargs):
+        """
+        Call the same method on many servers concurrently, with one worker
+        thread per server, connecting where required.
+
+        :param servers: server strings
+        :type servers: list
+        :param method: name of the :class:`pypulseaudio.PulseAudio` method
+        :type method: string
+        :return: a tuple of two dicts keyed by server string, the first
+            holding the results of servers that succeeded and the second the
+            exceptions raised for servers that failed
+        :rtype: tuple
+        """
+        results = {}
+        errors = {}
+        def call(server):
+            try:
+                results[server] = getattr(self.get(server), method)(*args, **kwargs)
+            except Exception as e:
+                errors[server] = e
+        workers = [threading.Thread(target=call, args=(server,))
+                   for server in servers]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return (results, errors)
+
+    def remove(self, server):
+        """
+        Disconnect and remove a server's pooled connection, if any.
+        """
+        with self._lock:
+            pulse = self._connections.pop(server, None)
+        if (pulse is not None):
+            self._discard(pulse)
+
+    def close(self):
+        """
+        Disconnect and remove all pooled connections.
+        """
+        for server in self.servers():
+            self.remove(server)
+
+    def _discard(self, pulse):
+        """
+        Disconnect a connection no longer pooled, if still connected, and
+        free its context and threaded main loop.
+        """
+        try:
+            if (pulse.state not in (None, PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+                pulse.disconnect()
+        finally:
+            pulse._free()
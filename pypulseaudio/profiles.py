@@ -0,0 +1,134 @@
+"""
+Choice of card profiles by requirement, e.g. the best available duplex
+profile with at least two output channels::
+
+    profile = choose_profile(card, output_channels=2, input_channels=1)
+
+Cards are given in the form returned by
+:meth:`pypulseaudio.PulseAudio.get_card_info_list`.  The channels of a
+profile are inferred from its name, following the naming of the server's
+ALSA and bluetooth profiles, e.g. 'output:analog-surround-51+input:analog-mono'
+or 'headset_head_unit'.  See also:: :meth:`pypulseaudio.PulseAudio.select_card_profile`
+"""
+from __future__ import unicode_literals
+
+import re
+
+from pypulseaudio.constants import *
+
+# Channels of bluetooth profiles as (output, input)
+bluetooth_channels = (
+    ('a2dp_sink', (2, 0)),
+    ('a2dp-sink', (2, 0)),
+    ('a2dp_source', (0, 2)),
+    ('a2dp-source', (0, 2)),
+    ('headset_head_unit', (1, 1)),
+    ('headset-head-unit', (1, 1)),
+    ('handsfree_head_unit', (1, 1)),
+    ('handsfree-head-unit', (1, 1)),
+    ('headset_audio_gateway', (1, 1)),
+    ('headset-audio-gateway', (1, 1)),
+)
+
+_surround = re.compile(r'surround-(\d)(\d)')
+
+
+def _mapping_channels(mapping):
+    match = _surround.search(mapping)
+    if (match):
+        return int(match.group(1)) + int(match.group(2))
+    if ('stereo' in mapping):
+        return 2
+    if ('mono' in mapping):
+        return 1
+    return None
+
+
+def profile_channels(name):
+    """
+    Infer the output and input channels of a profile from its name.
+
+    :param name: profile name
+    :type name: string
+    :return: output and input channels, 0 where the profile has no such
+        direction and None where the number of channels is unknown
+    :rtype: tuple
+    """
+    for (prefix, channels) in bluetooth_channels:
+        if (name.startswith(prefix)):
+            return channels
+    if (name == 'off'):
+        return (0, 0)
+    if (not name.startswith(('output:', 'input:'))):
+        return (None, None)
+    output = 0
+    input = 0
+    for part in name.split('+'):
+        (direction, sep, mapping) = part.partition(':')
+        if (direction == 'output'):
+            output = _mapping_channels(mapping)
+        elif (direction == 'input'):
+            input = _mapping_channels(mapping)
+    return (output, input)
+
+
+def profile_available(card, profile):
+    """
+    Whether a profile may be used: the server has not reported it as
+    unavailable, and not all ports of either direction serving it are
+    reported as unavailable, e.g. unplugged headphones.
+
+    :param card: card information
+    :type card: dict
+    :param profile: profile information, one of the card's profiles
+    :type profile: dict
+    :rtype: bool
+    """
+    if (profile['available'] is False):
+        return False
+    for direction in (PA_DIRECTION_OUTPUT, PA_DIRECTION_INPUT):
+        ports = [port for port in card.get('ports') or ()
+                 if (port['direction'] == direction and
+                     profile['name'] in port['profiles'])]
+        if (ports and all(port['available'] == PA_PORT_AVAILABLE_NO for port in ports)):
+            return False
+    return True
+
+
+def _satisfies(channels, required, n_devices):
+    if (not required):
+        return True
+    if (n_devices == 0):
+        return False
+    if (channels is None):
+        return required <= 1
+    return channels >= required
+
+
+def choose_profile(card, output_channels=0, input_channels=0):
+    """
+    Choose the available profile of highest priority meeting the
+    requirement, preferring the active profile over others of equal
+    priority.
+
+    :param card: card information
+    :type card: dict
+    :param output_channels: minimum output channels, 0 if output is not required
+    :type output_channels: int
+    :param input_channels: minimum input channels, 0 if input is not required
+    :type input_channels: int
+    :return: the chosen profile, or None if no profile meets the requirement
+    :rtype: dict
+    """
+    best = None
+    best_key = None
+    for profile in card['profiles']:
+        (output, input) = profile_channels(profile['name'])
+        if (not _satisfies(output, output_channels, profile['n_sinks']) or
+            not _satisfies(input, input_channels, profile['n_sources']) or
+            not profile_available(card, profile)):
+            continue
+        key = (profile['priority'], profile['name'] == card['active_profile'])
+        if (best_key is None or key > best_key):
+            (best, best_key) = (profile, key)
+    return best
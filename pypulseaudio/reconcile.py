@@ -0,0 +1,169 @@
+"""
+Declarative configuration of a server: modules, card profiles, default
+sink and source, and sink and source volume and mute.  The desired state is
+described by a dict, e.g.::
+
+    desired = {
+        'modules': [
+            {'name': 'module-null-sink', 'args': {'sink_name': 'recorder'}},
+            {'name': 'module-loopback', 'args': {'latency_msec': 20}},
+        ],
+        'card_profiles': {
+            'alsa_card.pci-0000_00_1b.0': 'output:analog-stereo',
+        },
+        'default_sink': 'recorder',
+        'default_source': 'alsa_input.pci-0000_00_1b.0.analog-stereo',
+        'sinks': {
+            'recorder': {'volume': [65536, 65536], 'mute': False},
+        },
+        'sources': {
+            'alsa_input.pci-0000_00_1b.0.analog-stereo': {'volume': 32768},
+        },
+    }
+    actions = Reconciler(pulse).apply(desired)
+
+All keys are optional.  A module is matched by name and arguments, the
+latter compared as strings.  Volumes are pa_volume_t values, per channel
+or a single value for all channels of an existing object.
+
+The current state is read in a single pipelined batch, and only the
+operations needed to reach the desired state are then sent, in a second
+batch.  Since the server carries out the operations in order, defaults and
+volumes may refer to sinks and sources created by the modules loaded.
+Applying a state already reached sends no operations.
+"""
+from __future__ import unicode_literals
+
+from pypulseaudio.constants import INVALID_INDEX
+from pypulseaudio.records import Record
+
+
+class Action(Record):
+    """
+    A server operation planned by :class:`Reconciler`, named after the
+    :class:`pypulseaudio.PulseAudio` method carrying it out.
+
+    :param method: method name
+    :param args: method arguments
+    :param result: True on success, or the module index for load_module,
+        INVALID_INDEX should it have failed, None until applied
+    """
+    __slots__ = ('method', 'args', 'result')
+    fields = __slots__
+
+    def __init__(self, method, args, result=None):
+        self.method = method
+        self.args = args
+        self.result = result
+
+    def __str__(self):
+        return '%s(%s)' % (self.method, ', '.join(repr(i) for i in self.args))
+
+
+def _module_args(args):
+    return dict((str(k), str(v)) for (k, v) in (args or {}).items())
+
+
+class Reconciler(object):
+    """
+    Bring a server to a desired state with the fewest operations.
+
+    :param pulse: connected instance
+    :type pulse: :class:`pypulseaudio.PulseAudio`
+    :param prune: True if loaded modules of the same names as the desired
+        modules but matching none of them should be unloaded
+    :type prune: bool
+    """
+    def __init__(self, pulse, prune=False):
+        self._pulse = pulse
+        self.prune = prune
+
+    def plan(self, desired, snapshot):
+        """
+        Work out the operations taking the snapshot to the desired state,
+        in the order they are to be carried out: unloading modules, setting
+        card profiles, loading modules, setting defaults and volumes.
+
+        :param desired: desired state, see above
+        :type desired: dict
+        :param snapshot: current state
+        :type snapshot: :class:`pypulseaudio.snapshot.Snapshot`
+        :rtype: list of :class:`Action`
+        """
+        actions = []
+        wanted = [(m['name'], _module_args(m.get('args')))
+                  for m in desired.get('modules', ())]
+        loaded = [(m['name'], _module_args(m['argument']), m['index'])
+                  for m in snapshot['module']]
+        missing = list(wanted)
+        for (name, args, index) in loaded:
+            if ((name, args) in missing):
+                missing.remove((name, args))
+            elif (self.prune and any(name == w[0] for w in wanted)):
+                actions.append(Action('unload_module', (index,)))
+        active = dict((c['name'], c['active_profile']) for c in snapshot['card'])
+        for (card, profile) in sorted(desired.get('card_profiles', {}).items()):
+            if (active.get(card) != profile):
+                actions.append(Action('set_card_profile_by_name', (card, profile)))
+        for (name, args) in missing:
+            actions.append(Action('load_module', (name, args)))
+        server = snapshot['server'][0] if snapshot['server'] else {}
+        for kind in ('sink', 'source'):
+            default = desired.get('default_' + kind)
+            if (default is not None and
+                server.get('default_%s_name' % kind) != default):
+                actions.append(Action('set_default_' + kind, (default,)))
+        for kind in ('sink', 'source'):
+            current = dict((i['name'], i) for i in snapshot[kind])
+            for (name, state) in sorted(desired.get(kind + 's', {}).items()):
+                actions.extend(self._plan_device(kind, name, state,
+                                                 current.get(name)))
+        return actions
+
+    def _plan_device(self, kind, name, state, current):
+        actions = []
+        volume = state.get('volume')
+        if (volume is not None):
+            if (isinstance(volume, int)):
+                if (current is None):
+                    raise Exception('Volume of %s %s requires a value per channel'
+                                    % (kind, name))
+                volume = [volume] * current['volume']['channels']
+            if (current is None or list(current['volume']['values']) != list(volume)):
+                actions.append(Action('set_%s_volume_by_name' % kind,
+                                      (name, list(volume))))
+        mute = state.get('mute')
+        if (mute is not None and (current is None or current['mute'] != bool(mute))):
+            actions.append(Action('set_%s_mute_by_name' % kind, (name, bool(mute))))
+        return actions
+
+    def apply(self, desired, dry_run=False, timeout=None):
+        """
+        Bring the server to the desired state, taking at most two round
+        trips.
+
+        :param desired: desired state, see above
+        :type desired: dict
+        :param dry_run: True if the operations should only be planned
+        :type dry_run: bool
+        :return: operations planned, with their results unless a dry run
+        :rtype: list of :class:`Action`
+        """
+        snapshot = self._pulse.snapshot(timeout)
+        if (snapshot is None):
+            raise Exception('Not connected')
+        actions = self.plan(desired, snapshot)
+        if (dry_run or not actions):
+            return actions
+        batch = self._pulse.batch()
+        for action in actions:
+            getattr(batch, action.method)(*action.args)
+        results = batch.execute(timeout)
+        if (results is None):
+            raise Exception('Not connected')
+        for (action, result) in zip(actions, results):
+            if (action.method == 'load_module'):
+                action.result = result[0] if result else INVALID_INDEX
+            else:
+                action.result = bool(result and result[0])
+        return actions
@@ -0,0 +1,570 @@
+from __future__ import unicode_literals
+
+
+def parse_module_argument(argument):
+    """
+    Convert a module argument string of the form "arg1=val1 ..." into
+    a dict, following the server's own parsing: values may be quoted with
+    double or single quotes, which may contain whitespace, '=' and the other
+    quote, and a backslash escapes the character following it, e.g.::
+
+        sink_name=x sink_properties="device.description='My Sink'"
+
+    A key given without a value maps to None.
+
+    :param argument: module argument string, may be None
+    :type argument: string
+    :return: argument key/value pairs or None
+    :rtype: dict
+    """
+    if (argument is None):
+        return None
+    ret = {}
+    i = 0
+    n = len(argument)
+    while (i < n):
+        if (argument[i].isspace()):
+            i += 1
+            continue
+        start = i
+        while (i < n and argument[i] != '=' and not argument[i].isspace()):
+            i += 1
+        key = argument[start:i]
+        if (i == n or argument[i] != '='):
+            ret[key] = None
+            continue
+        i += 1
+        value = []
+        quote = None
+        if (i < n and argument[i] in '"\''):
+            quote = argument[i]
+            i += 1
+        while (i < n):
+            c = argument[i]
+            if (c == '\\' and i + 1 < n):
+                value.append(argument[i + 1])
+                i += 2
+                continue
+            if (c == quote or (quote is None and c.isspace())):
+                i += 1
+                break
+            value.append(c)
+            i += 1
+        ret[key] = ''.join(value)
+    return ret
+
+
+def format_module_argument(args):
+    """
+    Convert a dict of module arguments into a module argument string,
+    quoting values as needed such that :func:`parse_module_argument`, and
+    the server, recover the same values.
+
+    :param args: argument key/value pairs, values being converted to strings
+    :type args: dict
+    :return: module argument string
+    :rtype: string
+    """
+    items = []
+    for (key, value) in args.items():
+        if (value is None):
+            items.append('%s' % key)
+            continue
+        value = '%s' % value
+        if (value == '' or any(c.isspace() or c in '"\'\\' for c in value)):
+            value = '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+        items.append('%s=%s' % (key, value))
+    return ' '.join(items)
+
+
+class Record(object):
+    """
+    Base class for compact, fixed-field records used in place of the
+    per-entry dicts returned by :class:`pypulseaudio.PulseAudio`.  Fields
+    are held in ``__slots__`` and are accessible as attributes, whilst
+    read-only dict style access (``record['name']``, ``get()``, ``keys()``,
+    ``items()``, ``in``) is retained for existing callers.
+    """
+    __slots__ = ()
+    fields = ()
+
+    def __getitem__(self, key):
+        if (key not in self.fields):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if (key not in self.fields):
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return list(self.fields)
+
+    def values(self):
+        return [getattr(self, i) for i in self.fields]
+
+    def items(self):
+        return [(i, getattr(self, i)) for i in self.fields]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def __eq__(self, other):
+        if (isinstance(other, Record)):
+            return self.to_dict() == other.to_dict()
+        elif (isinstance(other, dict)):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__,
+                           ', '.join('%s=%r' % i for i in self.items()))
+
+    def to_dict(self):
+        """
+        Convert the record, and any records it contains, into the dict
+        form returned by :class:`pypulseaudio.PulseAudio` by default.
+
+        :rtype: dict
+        """
+        ret = {}
+        for (key, value) in self.items():
+            if (isinstance(value, Record)):
+                value = value.to_dict()
+            elif (isinstance(value, list)):
+                value = [i.to_dict() if isinstance(i, Record) else i for i in value]
+            ret[key] = value
+        return ret
+
+    def copy(self):
+        """
+        Copy the record, and any records, lists and dicts it contains.
+
+        :rtype: :class:`Record`
+        """
+        ret = object.__new__(type(self))
+        for key in self.__slots__:
+            setattr(ret, key, copy_entry(getattr(self, key)))
+        return ret
+
+
+def copy_entry(value):
+    """
+    Copy an entry in the dict or record form returned by
+    :class:`pypulseaudio.PulseAudio`, such that changes made to the copy,
+    at any depth, do not affect the original.
+
+    :param value: entry, or any value it contains
+    :return: copy of the entry
+    """
+    if (isinstance(value, dict)):
+        return dict((k, copy_entry(v)) for (k, v) in value.items())
+    elif (isinstance(value, list)):
+        return [copy_entry(i) for i in value]
+    elif (isinstance(value, Record)):
+        return value.copy()
+    return value
+
+
+class Volume(Record):
+    """
+    Per-channel volume.
+    """
+    __slots__ = ('channels', 'values')
+    fields = __slots__
+
+    def __init__(self, channels, values):
+        self.channels = channels
+        self.values = values
+
+    @classmethod
+    def from_struct(cls, cvolume):
+        return cls(cvolume.channels,
+                   [cvolume.values[i] for i in range(cvolume.channels)])
+
+
+class SinkInfo(Record):
+    """
+    Sink information.  See also:: :meth:`pypulseaudio.PulseAudio.get_sink_info_list`
+    """
+    __slots__ = ('name', 'index', 'desc', 'card', 'mute', 'latency',
+                 'configured_latency', 'monitor_source', 'monitor_source_name',
+                 'volume', 'n_volume_steps', 'state')
+    fields = __slots__
+
+    def __init__(self, name, index, desc, card, mute, latency,
+                 configured_latency, monitor_source, monitor_source_name,
+                 volume, n_volume_steps, state):
+        self.name = name
+        self.index = index
+        self.desc = desc
+        self.card = card
+        self.mute = mute
+        self.latency = latency
+        self.configured_latency = configured_latency
+        self.monitor_source = monitor_source
+        self.monitor_source_name = monitor_source_name
+        self.volume = volume
+        self.n_volume_steps = n_volume_steps
+        self.state = state
+
+    @classmethod
+    def from_struct(cls, sink_info):
+        return cls(sink_info.name,
+                   sink_info.index,
+                   sink_info.description,
+                   sink_info.card,
+                   True if sink_info.mute else False,
+                   sink_info.latency,
+                   sink_info.configured_latency,
+                   sink_info.monitor_source,
+                   sink_info.monitor_source_name,
+                   Volume.from_struct(sink_info.volume),
+                   sink_info.n_volume_steps,
+                   sink_info.state)
+
+
+class SourceInfo(Record):
+    """
+    Source information.  See also:: :meth:`pypulseaudio.PulseAudio.get_source_info_list`
+    """
+    __slots__ = ('name', 'index', 'desc', 'card', 'mute', 'latency',
+                 'configured_latency', 'monitor_of_sink', 'monitor_of_sink_name',
+                 'volume')
+    fields = __slots__
+
+    def __init__(self, name, index, desc, card, mute, latency,
+                 configured_latency, monitor_of_sink, monitor_of_sink_name,
+                 volume):
+        self.name = name
+        self.index = index
+        self.desc = desc
+        self.card = card
+        self.mute = mute
+        self.latency = latency
+        self.configured_latency = configured_latency
+        self.monitor_of_sink = monitor_of_sink
+        self.monitor_of_sink_name = monitor_of_sink_name
+        self.volume = volume
+
+    @classmethod
+    def from_struct(cls, source_info):
+        return cls(source_info.name,
+                   source_info.index,
+                   source_info.description,
+                   source_info.card,
+                   True if source_info.mute else False,
+                   source_info.latency,
+                   source_info.configured_latency,
+                   source_info.monitor_of_sink,
+                   source_info.monitor_of_sink_name,
+                   Volume.from_struct(source_info.volume))
+
+
+class SinkInputInfo(Record):
+    """
+    Sink input information.  See also:: :meth:`pypulseaudio.PulseAudio.get_sink_input_info_list`
+    """
+    __slots__ = ('name', 'index', 'owner_module', 'client', 'sink', 'volume',
+                 'buffer_latency', 'sink_latency', 'driver', 'mute', 'corked')
+    fields = __slots__
+
+    def __init__(self, name, index, owner_module, client, sink, volume,
+                 buffer_latency, sink_latency, driver, mute, corked):
+        self.name = name
+        self.index = index
+        self.owner_module = owner_module
+        self.client = client
+        self.sink = sink
+        self.volume = volume
+        self.buffer_latency = buffer_latency
+        self.sink_latency = sink_latency
+        self.driver = driver
+        self.mute = mute
+        self.corked = corked
+
+    @classmethod
+    def from_struct(cls, sink_input_info):
+        return cls(sink_input_info.name,
+                   sink_input_info.index,
+                   sink_input_info.owner_module,
+                   sink_input_info.client,
+                   sink_input_info.sink,
+                   Volume.from_struct(sink_input_info.volume),
+                   sink_input_info.buffer_usec,
+                   sink_input_info.sink_usec,
+                   sink_input_info.driver,
+                   True if sink_input_info.mute else False,
+                   True if sink_input_info.corked else False)
+
+
+class SourceOutputInfo(Record):
+    """
+    Source output information.  See also:: :meth:`pypulseaudio.PulseAudio.get_source_output_info_list`
+    """
+    __slots__ = ('name', 'index', 'owner_module', 'client', 'source', 'volume',
+                 'buffer_latency', 'source_latency', 'driver', 'mute', 'corked')
+    fields = __slots__
+
+    def __init__(self, name, index, owner_module, client, source, volume,
+                 buffer_latency, source_latency, driver, mute, corked):
+        self.name = name
+        self.index = index
+        self.owner_module = owner_module
+        self.client = client
+        self.source = source
+        self.volume = volume
+        self.buffer_latency = buffer_latency
+        self.source_latency = source_latency
+        self.driver = driver
+        self.mute = mute
+        self.corked = corked
+
+    @classmethod
+    def from_struct(cls, source_output_info):
+        return cls(source_output_info.name,
+                   source_output_info.index,
+                   source_output_info.owner_module,
+                   source_output_info.client,
+                   source_output_info.source,
+                   Volume.from_struct(source_output_info.volume),
+                   source_output_info.buffer_usec,
+                   source_output_info.source_usec,
+                   source_output_info.driver,
+                   True if source_output_info.mute else False,
+                   True if source_output_info.corked else False)
+
+
+def raw_card_profiles(card_info):
+    """
+    Read a pa_card_info structure's profiles as (name, description,
+    n_sinks, n_sources, priority, available) tuples.  Availability is
+    True or False where the server reports it, otherwise None.
+    """
+    profiles = card_info.profiles
+    profiles2 = getattr(card_info, 'profiles2', None)
+    return tuple((profiles[i].name,
+                  profiles[i].description,
+                  profiles[i].n_sinks,
+                  profiles[i].n_sources,
+                  profiles[i].priority,
+                  bool(profiles2[i].contents.available) if profiles2 else None)
+                 for i in range(card_info.n_profiles))
+
+
+def raw_card_ports(card_info):
+    """
+    Read a pa_card_info structure's ports as (name, description, priority,
+    available, direction, profile names) tuples, available being one of
+    the PA_PORT_AVAILABLE values and direction PA_DIRECTION_OUTPUT or
+    PA_DIRECTION_INPUT.
+    """
+    ports = getattr(card_info, 'ports', None)
+    if (not ports):
+        return ()
+    ret = []
+    for i in range(card_info.n_ports):
+        port = ports[i].contents
+        ret.append((port.name,
+                    port.description,
+                    port.priority,
+                    port.available,
+                    getattr(port, 'direction', 0),
+                    tuple(port.profiles[j].contents.name
+                          for j in range(port.n_profiles))))
+    return tuple(ret)
+
+
+class CardProfile(Record):
+    """
+    Card profile.  See also:: :class:`CardInfo`
+    """
+    __slots__ = ('name', 'desc', 'n_sinks', 'n_sources', 'priority', 'available')
+    fields = __slots__
+
+    def __init__(self, name, desc, n_sinks, n_sources, priority, available):
+        self.name = name
+        self.desc = desc
+        self.n_sinks = n_sinks
+        self.n_sources = n_sources
+        self.priority = priority
+        self.available = available
+
+
+class CardPort(Record):
+    """
+    Card port.  See also:: :class:`CardInfo`
+    """
+    __slots__ = ('name', 'desc', 'priority', 'available', 'direction', 'profiles')
+    fields = __slots__
+
+    def __init__(self, name, desc, priority, available, direction, profiles):
+        self.name = name
+        self.desc = desc
+        self.priority = priority
+        self.available = available
+        self.direction = direction
+        self.profiles = list(profiles)
+
+
+class CardInfo(Record):
+    """
+    Card information.  See also:: :meth:`pypulseaudio.PulseAudio.get_card_info_list`
+
+    The profile and port lists are only decoded into :class:`CardProfile`
+    and :class:`CardPort` records on first access.
+    """
+    __slots__ = ('name', 'index', 'active_profile', '_raw_profiles', '_profiles',
+                 '_raw_ports', '_ports')
+    fields = ('name', 'index', 'profiles', 'active_profile', 'ports')
+
+    def __init__(self, name, index, raw_profiles, active_profile, raw_ports=()):
+        self.name = name
+        self.index = index
+        self.active_profile = active_profile
+        self._raw_profiles = raw_profiles
+        self._profiles = None
+        self._raw_ports = raw_ports
+        self._ports = None
+
+    @property
+    def profiles(self):
+        if (self._profiles is None):
+            self._profiles = [CardProfile(*i) for i in self._raw_profiles]
+            self._raw_profiles = None
+        return self._profiles
+
+    @property
+    def ports(self):
+        if (self._ports is None):
+            self._ports = [CardPort(*i) for i in self._raw_ports]
+            self._raw_ports = None
+        return self._ports
+
+    @classmethod
+    def from_struct(cls, card_info):
+        active_profile = card_info.active_profile
+        if (active_profile):
+            active_profile = active_profile.contents.name
+        else:
+            active_profile = None
+        return cls(card_info.name, card_info.index, raw_card_profiles(card_info),
+                   active_profile, raw_card_ports(card_info))
+
+
+class ModuleInfo(Record):
+    """
+    Module information.  See also:: :meth:`pypulseaudio.PulseAudio.get_module_info_list`
+
+    The module argument string is only parsed on first access.
+    """
+    __slots__ = ('name', 'index', 'n_used', '_raw_argument', '_argument')
+    fields = ('name', 'index', 'n_used', 'argument')
+
+    def __init__(self, name, index, n_used, raw_argument):
+        self.name = name
+        self.index = index
+        self.n_used = n_used
+        self._raw_argument = raw_argument
+        self._argument = None
+
+    @property
+    def argument(self):
+        if (self._argument is None and self._raw_argument is not None):
+            self._argument = parse_module_argument(self._raw_argument)
+            self._raw_argument = None
+        return self._argument
+
+    @classmethod
+    def from_struct(cls, module_info):
+        return cls(module_info.name,
+                   module_info.index,
+                   module_info.n_used,
+                   module_info.argument)
+
+
+class SampleInfo(Record):
+    """
+    Sample cache entry information.  See also:: :meth:`pypulseaudio.PulseAudio.get_sample_info_list`
+    """
+    __slots__ = ('name', 'index', 'volume', 'rate', 'channels', 'duration',
+                 'bytes', 'lazy', 'filename')
+    fields = __slots__
+
+    def __init__(self, name, index, volume, rate, channels, duration, bytes,
+                 lazy, filename):
+        self.name = name
+        self.index = index
+        self.volume = volume
+        self.rate = rate
+        self.channels = channels
+        self.duration = duration
+        self.bytes = bytes
+        self.lazy = lazy
+        self.filename = filename
+
+    @classmethod
+    def from_struct(cls, sample_info):
+        return cls(sample_info.name,
+                   sample_info.index,
+                   Volume.from_struct(sample_info.volume),
+                   sample_info.sample_spec.rate,
+                   sample_info.sample_spec.channels,
+                   sample_info.duration,
+                   sample_info.bytes,
+                   True if sample_info.lazy else False,
+                   sample_info.filename)
+
+
+class ServerInfo(Record):
+    """
+    Server information.  See also:: :meth:`pypulseaudio.PulseAudio.get_server_info`
+    """
+    __slots__ = ('user_name', 'host_name', 'server_version', 'server_name',
+                 'default_sink_name', 'default_source_name', 'cookie')
+    fields = __slots__
+
+    def __init__(self, user_name, host_name, server_version, server_name,
+                 default_sink_name, default_source_name, cookie):
+        self.user_name = user_name
+        self.host_name = host_name
+        self.server_version = server_version
+        self.server_name = server_name
+        self.default_sink_name = default_sink_name
+        self.default_source_name = default_source_name
+        self.cookie = cookie
+
+    @classmethod
+    def from_struct(cls, server_info):
+        return cls(server_info.user_name,
+                   server_info.host_name,
+                   server_info.server_version,
+                   server_info.server_name,
+                   server_info.default_sink_name,
+                   server_info.default_source_name,
+                   server_info.cookie)
+
+
+record_decoders = {
+    'card': CardInfo.from_struct,
+    'sink': SinkInfo.from_struct,
+    'source': SourceInfo.from_struct,
+    'sink_input': SinkInputInfo.from_struct,
+    'source_output': SourceOutputInfo.from_struct,
+    'module': ModuleInfo.from_struct,
+    'sample': SampleInfo.from_struct,
+    'server': ServerInfo.from_struct,
+}
@@ -0,0 +1,136 @@
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from pypulseaudio.constants import PA_ERR_NOENTITY
+from pypulseaudio.stream import _byte_view
+
+
+class SampleCache(object):
+    """
+    Client-side manager of clips held in the server's sample cache, for
+    playing short, frequently used sounds with a single small request each.
+
+    Clips are registered with their audio data once and uploaded to the
+    server on first play.  The clips resident on the server are tracked in
+    least recently played order and, should uploading another clip exceed
+    the memory budget, the least recently played ones are removed from the
+    server first.  A clip that the server no longer holds, e.g. following a
+    server restart, is uploaded again on demand.
+
+    Example::
+
+        sounds = SampleCache(pulse, budget=1024 * 1024)
+        sounds.register('beep', beep_pcm, rate=48000, channels=1)
+        sounds.play('beep')
+
+    :param pulse: connected instance
+    :type pulse: :class:`pypulseaudio.PulseAudio`
+    :param budget: maximum total size in bytes of the resident clips
+    :type budget: int
+    """
+    def __init__(self, pulse, budget=4 * 1024 * 1024):
+        self._pulse = pulse
+        self.budget = budget
+        self.size = 0
+        self._clips = {}
+        self._resident = OrderedDict()
+
+    @property
+    def resident(self):
+        """
+        Names of the clips believed resident on the server, least recently
+        played first.
+        """
+        return list(self._resident)
+
+    def register(self, name, data, rate=44100, channels=2, format='s16le'):
+        """
+        Register a clip's audio data, kept by reference for uploading.
+        Re-registering a clip replaces it, and the new data is uploaded on
+        its next play.
+
+        :param name: clip name, also used as the server's sample name
+        :type name: string
+        :param data: audio data
+        :type data: buffer, e.g. bytes, bytearray or numpy array
+        """
+        size = len(_byte_view(data))
+        if (size > self.budget):
+            raise Exception('Clip %s of %d bytes exceeds the budget' % (name, size))
+        self._forget(name)
+        self._clips[name] = (data, rate, channels, format, size)
+
+    def unregister(self, name):
+        """
+        Remove a clip, evicting it from the server if resident.
+        """
+        self.evict(name)
+        del self._clips[name]
+
+    def play(self, name, device=None, volume=None, timeout=None):
+        """
+        Play a clip, uploading it first if not resident.
+
+        :param name: clip name
+        :type name: string
+        :param device: name of the sink, None for the default sink
+        :type device: string
+        :param volume: pa_volume_t value, None for the clip's own volume
+        :type volume: int
+        :return: success status
+        :rtype: bool
+        """
+        if (name not in self._clips):
+            raise Exception('Unknown clip: ' + name)
+        self.load(name, timeout)
+        result = self._pulse.play_sample(name, device, volume, timeout=timeout)
+        if (result and not result[0] and self._lost(name, timeout)):
+            self._forget(name)
+            self.load(name, timeout)
+            result = self._pulse.play_sample(name, device, volume, timeout=timeout)
+        return bool(result and result[0])
+
+    def _lost(self, name, timeout):
+        """
+        Whether playing a clip failed because the server no longer holds
+        it, e.g. it was restarted, rather than e.g. the sink being missing.
+        """
+        pulse = self._pulse
+        if (pulse._lib.pa_context_errno(pulse._context) != PA_ERR_NOENTITY):
+            return False
+        return not pulse.get_sample_info_by_name(name, timeout=timeout)
+
+    def load(self, name, timeout=None):
+        """
+        Make a clip resident without playing it, evicting others as needed.
+        """
+        if (name in self._resident):
+            self._resident[name] = self._resident.pop(name)
+            return
+        (data, rate, channels, format, size) = self._clips[name]
+        while (self._resident and self.size + size > self.budget):
+            self.evict(next(iter(self._resident)), timeout)
+        self._pulse.upload_sample(name, data, rate, channels, format, timeout)
+        self._resident[name] = size
+        self.size += size
+
+    def evict(self, name, timeout=None):
+        """
+        Remove a clip from the server, if resident.  It remains registered.
+        """
+        if (name in self._resident):
+            self._forget(name)
+            self._pulse.remove_sample(name, timeout=timeout)
+
+    def clear(self, timeout=None):
+        """
+        Remove all resident clips from the server.
+        """
+        for name in self.resident:
+            self.evict(name, timeout)
+
+    def _forget(self, name):
+        size = self._resident.pop(name, None)
+        if (size is not None):
+            self.size -= size
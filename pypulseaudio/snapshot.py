@@ -0,0 +1,395 @@
+"""
+Snapshots of a server's topology: server information, cards with their
+profiles, sinks, sources and modules, captured in a single pipelined round
+trip by :meth:`pypulseaudio.PulseAudio.snapshot`, e.g.::
+
+    snapshot = pulse.snapshot()
+    snapshot.save('topology.pas')
+    ...
+    before = SnapshotFile.open('topology.pas')
+    changes = diff(before, pulse.snapshot())
+
+Snapshots are saved in a compact, versioned binary format which is read
+through a memory map, decoding objects only when they are accessed.  Each
+section holds one facility's objects sorted by index, with the field names
+stored once and an offset table giving random access to every object.
+Objects are encoded canonically, such that :func:`diff` compares the encoded
+bytes of objects of the same index and only decodes those which differ,
+taking time linear in the number of objects.
+
+File layout, little-endian::
+
+    header    magic 'PASN', u16 version, u16 number of sections, f64 time
+    sections  per section: u8 facility, 3 pad bytes, u32 offset, u32 count
+    section   u16 number of fields, the field names, u32 index per object,
+              u32 offset per object and one past the last, then the objects
+
+Values are tagged: None, False, True, zigzag varint integers, f64 floats,
+length prefixed UTF-8 strings, and lists and dicts of values.
+"""
+from __future__ import unicode_literals
+
+import bisect
+import mmap
+import struct
+import time
+
+SNAPSHOT_MAGIC = b'PASN'
+SNAPSHOT_VERSION = 1
+
+facilities = ('server', 'card', 'sink', 'source', 'module')
+
+_header = struct.Struct('<4sHHd')
+_section = struct.Struct('<BxxxII')
+_u16 = struct.Struct('<H')
+_u32 = struct.Struct('<I')
+_f64 = struct.Struct('<d')
+
+(_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT) = range(8)
+
+
+def _plain(value):
+    to_dict = getattr(value, 'to_dict', None)
+    return to_dict() if to_dict is not None else value
+
+
+def _encode_varint(out, n):
+    while (n > 0x7f):
+        out.append(0x80 | (n & 0x7f))
+        n >>= 7
+    out.append(n)
+
+
+def _encode_str(out, value):
+    data = value.encode('utf-8')
+    _encode_varint(out, len(data))
+    out += data
+
+
+def _encode(out, value):
+    if (value is None):
+        out.append(_NONE)
+    elif (value is True or value is False):
+        out.append(_TRUE if value else _FALSE)
+    elif (isinstance(value, int)):
+        out.append(_INT)
+        _encode_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif (isinstance(value, float)):
+        out.append(_FLOAT)
+        out += _f64.pack(value)
+    elif (isinstance(value, (list, tuple))):
+        out.append(_LIST)
+        _encode_varint(out, len(value))
+        for item in value:
+            _encode(out, item)
+    elif (isinstance(value, dict)):
+        out.append(_DICT)
+        _encode_varint(out, len(value))
+        # Sorted keys make the encoding canonical
+        for key in sorted(value):
+            _encode_str(out, key)
+            _encode(out, value[key])
+    elif (isinstance(value, bytes)):
+        out.append(_STR)
+        _encode_str(out, value.decode('utf-8'))
+    else:
+        out.append(_STR)
+        _encode_str(out, '%s' % value)
+
+
+def _decode_varint(data, offset):
+    n = 0
+    shift = 0
+    while (True):
+        byte = data[offset]
+        offset += 1
+        n |= (byte & 0x7f) << shift
+        if (byte < 0x80):
+            return (n, offset)
+        shift += 7
+
+
+def _decode_str(data, offset):
+    (length, offset) = _decode_varint(data, offset)
+    end = offset + length
+    return (bytes(data[offset:end]).decode('utf-8'), end)
+
+
+def _decode(data, offset):
+    tag = data[offset]
+    offset += 1
+    if (tag == _NONE):
+        return (None, offset)
+    elif (tag == _FALSE):
+        return (False, offset)
+    elif (tag == _TRUE):
+        return (True, offset)
+    elif (tag == _INT):
+        (n, offset) = _decode_varint(data, offset)
+        return (-(n + 1) // 2 if n & 1 else n // 2, offset)
+    elif (tag == _FLOAT):
+        return (_f64.unpack_from(data, offset)[0], offset + 8)
+    elif (tag == _STR):
+        return _decode_str(data, offset)
+    elif (tag == _LIST):
+        (n, offset) = _decode_varint(data, offset)
+        ret = []
+        for i in range(n):
+            (item, offset) = _decode(data, offset)
+            ret.append(item)
+        return (ret, offset)
+    elif (tag == _DICT):
+        (n, offset) = _decode_varint(data, offset)
+        ret = {}
+        for i in range(n):
+            (key, offset) = _decode_str(data, offset)
+            (ret[key], offset) = _decode(data, offset)
+        return (ret, offset)
+    raise Exception('Corrupt snapshot: unknown tag %d' % tag)
+
+
+class Snapshot(object):
+    """
+    Topology of a server at a point in time, held as the dicts returned by
+    the :class:`pypulseaudio.PulseAudio` getters.  Objects of each facility
+    are accessed with ``snapshot['sink']`` etc.
+
+    :param objects: objects by facility, see :data:`facilities`
+    :type objects: dict of lists
+    :param timestamp: time of capture in seconds since the epoch, defaults
+        to now
+    :type timestamp: float
+    """
+    def __init__(self, objects, timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._objects = dict((f, sorted((_plain(i) for i in objects.get(f, ())),
+                                        key=lambda i: i.get('index', 0)))
+                             for f in facilities)
+
+    def __getitem__(self, facility):
+        return self._objects[facility]
+
+    def get(self, facility, index):
+        """
+        Look up an object by index.
+
+        :return: the object or None
+        :rtype: dict
+        """
+        for obj in self._objects[facility]:
+            if (obj.get('index', 0) == index):
+                return obj
+        return None
+
+    def dumps(self):
+        """
+        Encode the snapshot in the binary format.
+
+        :rtype: bytes
+        """
+        sections = []
+        offset = _header.size + _section.size * len(facilities)
+        for (code, facility) in enumerate(facilities):
+            data = self._encode_section(self._objects[facility])
+            sections.append((code, offset, len(self._objects[facility]), data))
+            offset += len(data)
+        out = bytearray(_header.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                     len(sections), self.timestamp))
+        for (code, offset, count, data) in sections:
+            out += _section.pack(code, offset, count)
+        for section in sections:
+            out += section[3]
+        return bytes(out)
+
+    def _encode_section(self, objects):
+        keys = sorted(set(key for obj in objects for key in obj))
+        head = bytearray(_u16.pack(len(keys)))
+        for key in keys:
+            _encode_str(head, key)
+        body = bytearray()
+        offsets = []
+        for obj in objects:
+            offsets.append(len(body))
+            for key in keys:
+                _encode(body, obj.get(key))
+        offsets.append(len(body))
+        for obj in objects:
+            head += _u32.pack(obj.get('index', 0))
+        for offset in offsets:
+            head += _u32.pack(offset)
+        return bytes(head + body)
+
+    def save(self, path):
+        """
+        Write the snapshot to a file in the binary format.
+        """
+        with open(path, 'wb') as f:
+            f.write(self.dumps())
+
+
+class _Section(object):
+    """
+    Read access to one facility's objects in an encoded snapshot.
+    """
+    def __init__(self, data, offset, count):
+        (n_keys,) = _u16.unpack_from(data, offset)
+        offset += _u16.size
+        keys = []
+        for i in range(n_keys):
+            (key, offset) = _decode_str(data, offset)
+            keys.append(key)
+        self.keys = tuple(keys)
+        self.count = count
+        self.indexes = struct.unpack_from('<%dI' % count, data, offset)
+        offset += 4 * count
+        self.offsets = struct.unpack_from('<%dI' % (count + 1), data, offset)
+        self.base = offset + 4 * (count + 1)
+        self.data = data
+
+    def raw(self, i):
+        return self.data[self.base + self.offsets[i]:self.base + self.offsets[i + 1]]
+
+    def decode(self, i):
+        ret = {}
+        offset = self.base + self.offsets[i]
+        for key in self.keys:
+            (ret[key], offset) = _decode(self.data, offset)
+        return ret
+
+    def find(self, index):
+        i = bisect.bisect_left(self.indexes, index)
+        if (i < self.count and self.indexes[i] == index):
+            return i
+        return None
+
+
+class SnapshotFile(object):
+    """
+    Snapshot in the binary format, read in place from a buffer or memory
+    mapped file without decoding objects until they are accessed.  Objects
+    of each facility are accessed with ``snapshot['sink']`` etc, and single
+    objects by index with :meth:`get`.
+
+    :param data: encoded snapshot
+    :type data: buffer, e.g. bytes or mmap
+    """
+    def __init__(self, data):
+        self._mmap = None
+        self._data = memoryview(data)
+        (magic, version, n_sections, self.timestamp) = _header.unpack_from(self._data, 0)
+        if (magic != SNAPSHOT_MAGIC):
+            raise Exception('Not a snapshot')
+        if (version > SNAPSHOT_VERSION):
+            raise Exception('Unsupported snapshot version %d' % version)
+        self._sections = {}
+        for i in range(n_sections):
+            (code, offset, count) = _section.unpack_from(self._data,
+                                                         _header.size + i * _section.size)
+            if (code < len(facilities)):
+                self._sections[facilities[code]] = _Section(self._data, offset, count)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory map a snapshot file.  The file remains mapped until
+        :meth:`close` is called.
+        """
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = cls(mapping)
+        snapshot._mmap = mapping
+        return snapshot
+
+    def close(self):
+        """
+        Unmap the file, if memory mapped.
+        """
+        self._sections = {}
+        self._data.release()
+        if (self._mmap is not None):
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, facility):
+        section = self._sections.get(facility)
+        if (section is None):
+            return []
+        return [section.decode(i) for i in range(section.count)]
+
+    def get(self, facility, index):
+        """
+        Look up an object by index, decoding only that object.
+
+        :return: the object or None
+        :rtype: dict
+        """
+        section = self._sections.get(facility)
+        i = section.find(index) if section is not None else None
+        return section.decode(i) if i is not None else None
+
+    def count(self, facility):
+        """
+        Number of objects of a facility.
+        """
+        section = self._sections.get(facility)
+        return section.count if section is not None else 0
+
+
+def _encoded(snapshot):
+    if (isinstance(snapshot, Snapshot)):
+        return SnapshotFile(snapshot.dumps())
+    return snapshot
+
+
+def diff(old, new):
+    """
+    Structural difference between two snapshots, in time linear in the
+    number of objects.  Objects are matched by facility and index, and
+    those changed are reported with the fields whose values differ.
+
+    :param old: earlier snapshot
+    :type old: :class:`Snapshot` or :class:`SnapshotFile`
+    :param new: later snapshot
+    :type new: :class:`Snapshot` or :class:`SnapshotFile`
+    :return: by facility, dicts of 'added' and 'removed' objects, and of
+        'changed' objects as (index, {field: (old value, new value)}) tuples.
+        Facilities without differences are omitted.
+    :rtype: dict
+    """
+    (old, new) = (_encoded(old), _encoded(new))
+    ret = {}
+    for facility in facilities:
+        a = old._sections.get(facility)
+        b = new._sections.get(facility)
+        added = []
+        removed = []
+        changed = []
+        (i, j) = (0, 0)
+        (n, m) = (a.count if a else 0, b.count if b else 0)
+        same_keys = a is not None and b is not None and a.keys == b.keys
+        while (i < n or j < m):
+            if (j == m or (i < n and a.indexes[i] < b.indexes[j])):
+                removed.append(a.decode(i))
+                i += 1
+            elif (i == n or b.indexes[j] < a.indexes[i]):
+                added.append(b.decode(j))
+                j += 1
+            else:
+                if (not same_keys or a.raw(i) != b.raw(j)):
+                    (x, y) = (a.decode(i), b.decode(j))
+                    fields = dict((key, (x.get(key), y.get(key)))
+                                  for key in set(x) | set(y)
+                                  if x.get(key) != y.get(key))
+                    if (fields):
+                        changed.append((a.indexes[i], fields))
+                i += 1
+                j += 1
+        if (added or removed or changed):
+            ret[facility] = {'added': added, 'removed': removed, 'changed': changed}
+    return ret
@@ -0,0 +1,537 @@
+"""
+PCM playback and record streams sharing the context and main loop of a
+:class:`pypulseaudio.PulseAudio` connection, e.g.::
+
+    pulse = PulseAudio('myapp')
+    pulse.connect()
+    stream = PlaybackStream(pulse, 'tone', rate=48000, channels=2,
+                            format='s16le', tlength=9600, minreq=1920)
+    stream.connect()
+    stream.write(samples)
+    stream.drain()
+    stream.disconnect()
+
+Audio data is passed in any object supporting the buffer protocol, e.g.
+bytearray, memoryview or a contiguous numpy array.  Playback data is copied
+directly from the caller's buffer into memory obtained from
+pa_stream_begin_write(), and record data directly from the memory returned
+by pa_stream_peek() into the caller's buffer, without intermediate python
+objects.  Read-only buffers, such as bytes, are copied once first since
+their address cannot be taken.
+
+Buffer attributes, in bytes, tune the latency: ``maxlength``, ``tlength``,
+``prebuf`` and ``minreq`` for playback and ``maxlength`` and ``fragsize``
+for record.  Those not given are chosen by the server.
+"""
+from __future__ import unicode_literals
+
+from ctypes import *
+
+from pypulseaudio.constants import *
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+sample_formats = {
+    'u8': (PA_SAMPLE_U8, 1),
+    'alaw': (PA_SAMPLE_ALAW, 1),
+    'ulaw': (PA_SAMPLE_ULAW, 1),
+    's16le': (PA_SAMPLE_S16LE, 2),
+    's16be': (PA_SAMPLE_S16BE, 2),
+    'float32le': (PA_SAMPLE_FLOAT32LE, 4),
+    'float32be': (PA_SAMPLE_FLOAT32BE, 4),
+    's32le': (PA_SAMPLE_S32LE, 4),
+    's32be': (PA_SAMPLE_S32BE, 4),
+    's24le': (PA_SAMPLE_S24LE, 3),
+    's24be': (PA_SAMPLE_S24BE, 3),
+    's24_32le': (PA_SAMPLE_S24_32LE, 4),
+    's24_32be': (PA_SAMPLE_S24_32BE, 4),
+}
+
+stream_state_map = {
+    PA_STREAM_UNCONNECTED: 'unconnected',
+    PA_STREAM_CREATING: 'creating',
+    PA_STREAM_READY: 'ready',
+    PA_STREAM_FAILED: 'failed',
+    PA_STREAM_TERMINATED: 'terminated',
+}
+
+buffer_attr_fields = ('maxlength', 'tlength', 'prebuf', 'minreq', 'fragsize')
+
+PA_BUFFER_ATTR_DEFAULT = 0xffffffff
+
+
+def _byte_view(data):
+    view = memoryview(data)
+    if (view.ndim != 1 or view.format not in ('B', 'b', 'c')):
+        view = view.cast('B')
+    return view
+
+
+def _address(view):
+    """
+    Address of a byte view's memory and the object keeping it alive.
+    """
+    try:
+        buf = (c_char * len(view)).from_buffer(view)
+    except TypeError:
+        buf = (c_char * len(view)).from_buffer_copy(view)
+    return (addressof(buf), buf)
+
+
+class Stream(object):
+    """
+    Base class of :class:`PlaybackStream` and :class:`RecordStream`.
+
+    Underruns and overruns reported by the server are counted in
+    :attr:`underflows` and :attr:`overflows`.
+
+    :param pulse: connected instance whose context and main loop are used
+    :type pulse: :class:`pypulseaudio.PulseAudio`
+    :param name: stream name shown by the server
+    :type name: string
+    :param rate: sample rate in Hz
+    :type rate: int
+    :param channels: number of channels
+    :type channels: int
+    :param format: sample format, one of :data:`sample_formats`
+    :type format: string
+    :param buffer_attr: buffer attributes in bytes, see above
+    """
+    _flags = PA_STREAM_NOFLAGS
+
+    def __init__(self, pulse, name, rate=44100, channels=2, format='s16le',
+                 **buffer_attr):
+        for key in buffer_attr:
+            if (key not in buffer_attr_fields):
+                raise Exception('Unknown buffer attribute: ' + key)
+        self._pulse = pulse
+        self._lib = pulse._lib
+        self.name = name
+        self.rate = rate
+        self.channels = channels
+        self.format = format
+        self.frame_size = channels * sample_formats[format][1]
+        self.underflows = 0
+        self.overflows = 0
+        self._requested_attr = buffer_attr
+        self._stream = None
+        self._state_changed = self._lib.pa_stream_notify_cb_t(self._state_changed_cb)
+        self._request = self._lib.pa_stream_request_cb_t(self._request_cb)
+        self._underflow = self._lib.pa_stream_notify_cb_t(self._underflow_cb)
+        self._overflow = self._lib.pa_stream_notify_cb_t(self._overflow_cb)
+
+    @property
+    def state(self):
+        """
+        Current pa_stream state, PA_STREAM_UNCONNECTED before connecting.
+        """
+        if (self._stream is None):
+            return PA_STREAM_UNCONNECTED
+        return self._lib.pa_stream_get_state(self._stream)
+
+    @property
+    def buffer_attr(self):
+        """
+        Buffer attributes in effect, in bytes, as negotiated with the server.
+
+        :rtype: dict
+        """
+        with self._pulse._locked():
+            attr = self._lib.pa_stream_get_buffer_attr(self._stream).contents
+            return dict((key, getattr(attr, key)) for key in buffer_attr_fields)
+
+    def set_buffer_attr(self, timeout=None, **buffer_attr):
+        """
+        Change buffer attributes of the connected stream.  Attributes not
+        given are left to the server.
+
+        :return: success status
+        :rtype: bool
+        """
+        attr = self._buffer_attr(buffer_attr)
+        return self._operation(lambda cb, userdata:
+                               self._lib.pa_stream_set_buffer_attr(self._stream, attr,
+                                                                   cb, userdata),
+                               timeout)
+
+    def cork(self, pause=True, timeout=None):
+        """
+        Pause or resume the stream.
+
+        :return: success status
+        :rtype: bool
+        """
+        return self._operation(lambda cb, userdata:
+                               self._lib.pa_stream_cork(self._stream, 1 if pause else 0,
+                                                        cb, userdata),
+                               timeout)
+
+    def flush(self, timeout=None):
+        """
+        Discard all data buffered for the stream.
+
+        :return: success status
+        :rtype: bool
+        """
+        return self._operation(lambda cb, userdata:
+                               self._lib.pa_stream_flush(self._stream, cb, userdata),
+                               timeout)
+
+    def connect(self, device=None, timeout=None):
+        """
+        Create and connect the stream, completing once it is ready.
+
+        :param device: name of the sink or source, None for the default
+        :type device: string
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        """
+        pulse = self._pulse
+        deadline = pulse._deadline(timeout)
+        with pulse._locked():
+            self._start(device)
+            pulse._wait_until(lambda: self._check_state() == PA_STREAM_READY,
+                              deadline)
+
+    def _start(self, device):
+        """
+        Create the stream and start connecting it, without waiting for it to
+        become ready.  The lock must be held.
+        """
+        pulse = self._pulse
+        spec = self._lib.pa_sample_spec()
+        spec.format = sample_formats[self.format][0]
+        spec.rate = self.rate
+        spec.channels = self.channels
+        self._stream = self._lib.pa_stream_new(pulse._context, self.name,
+                                               spec, None)
+        if (not self._stream):
+            self._stream = None
+            raise Exception(self._strerror())
+        self._lib.pa_stream_set_state_callback(self._stream,
+                                               self._state_changed, None)
+        self._set_callbacks()
+        attr = self._buffer_attr(self._requested_attr)
+        flags = self._flags
+        if (self._requested_attr):
+            flags |= PA_STREAM_ADJUST_LATENCY
+        if (self._connect(device, attr, flags) < 0):
+            raise Exception(self._strerror())
+
+    def disconnect(self, timeout=None):
+        """
+        Disconnect the stream, completing once it has terminated.  Buffered
+        playback data not yet played is discarded, see also:: :meth:`drain`.
+        """
+        if (self._stream is None):
+            return
+        pulse = self._pulse
+        deadline = pulse._deadline(timeout)
+        with pulse._locked():
+            try:
+                if (self.state not in (PA_STREAM_FAILED, PA_STREAM_TERMINATED)):
+                    self._lib.pa_stream_disconnect(self._stream)
+                    pulse._wait_until(lambda: self.state in (PA_STREAM_FAILED,
+                                                             PA_STREAM_TERMINATED),
+                                      deadline, connected=False)
+            finally:
+                self._lib.pa_stream_set_state_callback(self._stream, None, None)
+                self._lib.pa_stream_unref(self._stream)
+                self._stream = None
+
+    def _buffer_attr(self, buffer_attr):
+        attr = self._lib.pa_buffer_attr()
+        for key in buffer_attr_fields:
+            setattr(attr, key, buffer_attr.get(key, PA_BUFFER_ATTR_DEFAULT))
+        return attr
+
+    def _operation(self, issue, timeout):
+        """
+        Send a stream operation answered by a pa_stream_success_cb_t and
+        wait for it.
+        """
+        pulse = self._pulse
+        deadline = pulse._deadline(timeout)
+        with pulse._locked():
+            self._check_state()
+            op = pulse._issue('_stream_success_cb',
+                              lambda pulse, cb=None, userdata=None: issue(cb, userdata),
+                              ())
+            pulse._wait_operations([op], deadline)
+        return op.result[0] if op.result else False
+
+    def _check_state(self):
+        state = self.state
+        if (state in (PA_STREAM_FAILED, PA_STREAM_TERMINATED)):
+            raise Exception('Stream ' + stream_state_map[state])
+        return state
+
+    def _strerror(self):
+        return self._lib.pa_strerror(self._lib.pa_context_errno(self._pulse._context))
+
+    def _signal(self):
+        if (self._pulse._threaded):
+            self._lib.pa_threaded_mainloop_signal(self._pulse._main_loop, 0)
+
+    def _state_changed_cb(self, stream, userdata):
+        self._signal()
+
+    def _request_cb(self, stream, nbytes, userdata):
+        self._signal()
+
+    def _underflow_cb(self, stream, userdata):
+        self.underflows += 1
+
+    def _overflow_cb(self, stream, userdata):
+        self.overflows += 1
+
+
+class PlaybackStream(Stream):
+    """
+    Stream playing audio to a sink.  See also:: :class:`Stream`
+    """
+    def _set_callbacks(self):
+        self._lib.pa_stream_set_write_callback(self._stream, self._request, None)
+        self._lib.pa_stream_set_underflow_callback(self._stream, self._underflow, None)
+        self._lib.pa_stream_set_overflow_callback(self._stream, self._overflow, None)
+
+    def _connect(self, device, attr, flags):
+        return self._lib.pa_stream_connect_playback(self._stream, device, attr,
+                                                    flags, None, None)
+
+    @property
+    def writable_size(self):
+        """
+        Number of bytes that may be written without blocking.
+        """
+        with self._pulse._locked():
+            return self._lib.pa_stream_writable_size(self._stream)
+
+    def write(self, data, timeout=None):
+        """
+        Write audio data, blocking until all of it has been buffered by the
+        server.  Data should be a whole number of frames.
+
+        :param data: audio data
+        :type data: buffer, e.g. bytearray, memoryview or numpy array
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        :return: number of bytes written
+        :rtype: int
+        """
+        pulse = self._pulse
+        view = _byte_view(data)
+        total = len(view)
+        if (total == 0):
+            return 0
+        (source, keep) = _address(view)
+        deadline = pulse._deadline(timeout)
+        offset = 0
+        with pulse._locked():
+            while (offset < total):
+                writable = self._writable()
+                if (writable == 0):
+                    pulse._wait_until(lambda: self._writable() > 0, deadline)
+                    continue
+                dest = c_void_p()
+                size = c_size_t(min(writable, total - offset))
+                if (self._lib.pa_stream_begin_write(self._stream, byref(dest),
+                                                    byref(size)) < 0):
+                    raise Exception(self._strerror())
+                n = min(size.value, total - offset)
+                memmove(dest, source + offset, n)
+                if (self._lib.pa_stream_write(self._stream, dest, n, None, 0,
+                                              PA_SEEK_RELATIVE) < 0):
+                    raise Exception(self._strerror())
+                offset += n
+        return total
+
+    def drain(self, timeout=None):
+        """
+        Wait until all buffered data has been played.
+
+        :return: success status
+        :rtype: bool
+        """
+        return self._operation(lambda cb, userdata:
+                               self._lib.pa_stream_drain(self._stream, cb, userdata),
+                               timeout)
+
+    def _writable(self):
+        self._check_state()
+        writable = self._lib.pa_stream_writable_size(self._stream)
+        if (writable == c_size_t(-1).value):
+            raise Exception(self._strerror())
+        return writable
+
+
+class UploadStream(PlaybackStream):
+    """
+    Stream uploading a sample into the server's sample cache, named after
+    the stream.  See also:: :meth:`pypulseaudio.PulseAudio.upload_sample`
+    """
+    _length = 0
+
+    def _connect(self, device, attr, flags):
+        return self._lib.pa_stream_connect_upload(self._stream, self._length)
+
+    def upload(self, data, timeout=None):
+        """
+        Upload the complete sample, completing once the server has stored it.
+
+        :param data: audio data
+        :type data: buffer, e.g. bytes, bytearray or numpy array
+        :param timeout: time in seconds allowed for the whole upload, defaults
+            to the instance timeout
+        :type timeout: float
+        """
+        pulse = self._pulse
+        view = _byte_view(data)
+        self._length = len(view)
+        deadline = pulse._deadline(timeout)
+        remaining = lambda: max(0.0, deadline - monotonic())
+        try:
+            self.connect(timeout=remaining())
+            self.write(view, timeout=remaining())
+            with pulse._locked():
+                if (self._lib.pa_stream_finish_upload(self._stream) < 0):
+                    raise Exception(self._strerror())
+                pulse._wait_until(lambda: self.state in (PA_STREAM_FAILED,
+                                                         PA_STREAM_TERMINATED),
+                                  deadline)
+                if (self.state == PA_STREAM_FAILED):
+                    raise Exception(self._strerror())
+        finally:
+            self.disconnect(timeout=remaining())
+
+
+class RecordStream(Stream):
+    """
+    Stream recording audio from a source.  See also:: :class:`Stream`
+    """
+    def __init__(self, *args, **kwargs):
+        super(RecordStream, self).__init__(*args, **kwargs)
+        self._fragment = None
+        self._fragment_offset = 0
+
+    def _set_callbacks(self):
+        self._lib.pa_stream_set_read_callback(self._stream, self._request, None)
+        self._lib.pa_stream_set_overflow_callback(self._stream, self._overflow, None)
+        self._lib.pa_stream_set_underflow_callback(self._stream, self._underflow, None)
+
+    def _connect(self, device, attr, flags):
+        return self._lib.pa_stream_connect_record(self._stream, device, attr, flags)
+
+    @property
+    def readable_size(self):
+        """
+        Number of bytes that may be read without blocking.
+        """
+        with self._pulse._locked():
+            return self._readable()
+
+    def readinto(self, buffer, timeout=None):
+        """
+        Read audio data, blocking until the buffer has been filled.
+
+        :param buffer: writable buffer, e.g. bytearray or numpy array
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        :return: number of bytes read
+        :rtype: int
+        """
+        pulse = self._pulse
+        view = _byte_view(buffer)
+        total = len(view)
+        if (total == 0):
+            return 0
+        if (view.readonly):
+            raise Exception('Buffer is read-only')
+        dest = addressof((c_char * total).from_buffer(view))
+        deadline = pulse._deadline(timeout)
+        with pulse._locked():
+            return self._copy(dest, total, deadline)
+
+    def _copy(self, dest, total, deadline):
+        """
+        Copy fragments to the destination address until total bytes have
+        been copied, waiting for further data until the deadline or, if the
+        deadline is None, copying only the data already available.  The
+        lock must be held.
+
+        :return: number of bytes copied
+        """
+        offset = 0
+        while (offset < total):
+            if (self._fragment is None and not self._peek()):
+                if (deadline is None):
+                    break
+                self._pulse._wait_until(lambda: self._readable() > 0, deadline)
+                continue
+            (source, size) = self._fragment
+            n = min(size - self._fragment_offset, total - offset)
+            memmove(dest + offset, source + self._fragment_offset, n)
+            offset += n
+            self._fragment_offset += n
+            if (self._fragment_offset == size):
+                self._fragment = None
+                self._fragment_offset = 0
+                self._lib.pa_stream_drop(self._stream)
+        return offset
+
+    def read(self, nbytes, timeout=None):
+        """
+        Read the given number of bytes of audio data.
+
+        :rtype: bytearray
+        """
+        buffer = bytearray(nbytes)
+        self.readinto(buffer, timeout)
+        return buffer
+
+    def read_available(self):
+        """
+        Read whatever whole frames of audio data are available, without
+        blocking.
+
+        :rtype: bytearray
+        """
+        with self._pulse._locked():
+            n = self._readable()
+            n -= n % self.frame_size
+            if (n == 0):
+                return bytearray()
+            buffer = (c_char * n)()
+            return bytearray(buffer[:self._copy(addressof(buffer), n, None)])
+
+    def _readable(self):
+        self._check_state()
+        readable = self._lib.pa_stream_readable_size(self._stream)
+        if (readable == c_size_t(-1).value):
+            raise Exception(self._strerror())
+        # The size includes the current fragment, which is only dropped
+        # once wholly read
+        return readable - self._fragment_offset
+
+    def _peek(self):
+        """
+        Obtain the next fragment from the server, if any.  Holes in the
+        stream are skipped.
+        """
+        while (self._readable() > 0):
+            data = c_void_p()
+            size = c_size_t()
+            if (self._lib.pa_stream_peek(self._stream, byref(data), byref(size)) < 0):
+                raise Exception(self._strerror())
+            if (size.value == 0):
+                return False
+            if (not data.value):
+                self._lib.pa_stream_drop(self._stream)
+                continue
+            self._fragment = (data.value, size.value)
+            self._fragment_offset = 0
+            return True
+        return False
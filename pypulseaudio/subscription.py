@@ -0,0 +1,70 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple, OrderedDict
+
+
+class Event(namedtuple('Event', ['facility', 'type', 'index'])):
+    """
+    Server change notification delivered to subscription handlers.
+
+    :param facility: object kind, e.g. 'sink', 'card' or 'module'
+    :param type: one of 'new', 'change' or 'remove'
+    :param index: object index
+    """
+    __slots__ = ()
+
+
+class Subscription(object):
+    """
+    Handler registered with :meth:`pypulseaudio.PulseAudio.subscribe`,
+    together with its events held back for coalescing.
+
+    Events for the same facility and index arriving within the window of
+    the first one are merged into a single event, delivered once the window
+    has elapsed: a 'new' event absorbs later 'change' events, a 'remove'
+    event supersedes any other, and an object both created and removed
+    within the window is not reported at all.
+    """
+    def __init__(self, mask, handler, window):
+        self.mask = mask
+        self.handler = handler
+        self.window = window
+        self._pending = OrderedDict()
+
+    def add(self, event, now):
+        """
+        Hold back an event received at the given time.
+        """
+        key = (event.facility, event.index)
+        held = self._pending.get(key)
+        if (held is None):
+            self._pending[key] = [event, now + self.window]
+        elif (held[0].type == 'new' and event.type == 'remove'):
+            del self._pending[key]
+        elif (held[0].type == 'new' and event.type == 'change'):
+            pass
+        else:
+            held[0] = event
+
+    def next_due(self):
+        """
+        Time at which the earliest held event is due, or None.
+        """
+        for (event, due) in self._pending.values():
+            return due
+        return None
+
+    def pop_due(self, now):
+        """
+        Remove and return all held events due by the given time, in the
+        order first received.
+        """
+        events = []
+        while (self._pending):
+            key = next(iter(self._pending))
+            (event, due) = self._pending[key]
+            if (due > now):
+                break
+            del self._pending[key]
+            events.append(event)
+        return events
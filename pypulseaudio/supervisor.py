@@ -0,0 +1,310 @@
+"""
+Supervised connections, which survive restarts of the server, e.g. on
+every user session switch::
+
+    pulse = Supervisor('myapp', replay=True)
+    pulse.connect()
+    pulse.load_module('module-null-sink', {'sink_name': 'recorder'})
+    pulse.set_default_sink('recorder')
+    ...
+    sinks = pulse.get_sink_info_list()
+
+A :class:`Supervisor` provides the methods of the
+:class:`pypulseaudio.PulseAudio` instance it wraps.  Once the connection
+has failed or terminated, the next call reconnects it, retrying with
+exponential backoff and jitter, and is then carried out rather than
+returning None.  Calls made while the server is down are thereby held until
+it is back, for at most their timeout, after which
+:class:`pypulseaudio.PulseAudioTimeout` is raised.  Reads and other
+idempotent calls whose connection is lost while in flight are retried once
+reconnected; other calls raise, as they may already have taken effect.
+
+Subscriptions and the object cache are re-established on reconnecting.
+With ``replay=True`` the modules loaded, card profiles set and default sink
+and source set through the supervisor are recorded, and restored by a
+:class:`pypulseaudio.reconcile.Reconciler` on reconnecting, since the
+server forgets them when restarted.
+"""
+from __future__ import unicode_literals
+
+import copy
+import random
+import sys
+import threading
+import time
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.reconcile import Reconciler
+from pypulseaudio.records import parse_module_argument
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+# Methods passed through without supervision
+unsupervised = ('batch', 'reconnect')
+
+# Methods whose timeout is the time to wait for, rather than a limit
+waiting = ('process_events',)
+
+
+def idempotent(name):
+    """
+    Whether a call may safely be repeated if its connection was lost while
+    it was in flight.
+    """
+    return (name.startswith(('get_', 'iter_', 'set_', 'find_')) or
+            name in ('snapshot', 'select_card_profile', 'process_events'))
+
+
+def _argument(args, kwargs, position, name, default=None):
+    if (len(args) > position):
+        return args[position]
+    return kwargs.get(name, default)
+
+
+def _timeout_position(method):
+    """
+    Position, not counting self, of the timeout argument of a
+    :class:`pypulseaudio.PulseAudio` method, or None if it takes none.
+    Calls waiting on a server callback take it by keyword only.
+    """
+    if (hasattr(method, 'issue')):
+        return sys.maxsize
+    code = getattr(method, '__code__', None)
+    if (code is None):
+        return None
+    names = code.co_varnames[1:code.co_argcount]
+    return names.index('timeout') if ('timeout' in names) else None
+
+
+def _with_timeout(args, kwargs, position, timeout):
+    """
+    Arguments of a call, with its timeout argument replaced.
+    """
+    if (position < len(args)):
+        return (args[:position] + (timeout,) + args[position + 1:], kwargs)
+    kwargs = dict(kwargs)
+    kwargs['timeout'] = timeout
+    return (args, kwargs)
+
+
+def _plain_args(args):
+    if (not isinstance(args, dict)):
+        args = parse_module_argument(args or '')
+    return dict((k, '%s' % v) for (k, v) in args.items())
+
+
+class Supervisor(object):
+    """
+    Connection which is re-established whenever it has failed or
+    terminated, see above.  May be shared by any number of threads if
+    created with ``threaded=True``.
+
+    :param app_name: application name of the connection
+    :type app_name: string
+    :param server: server string, None for the default server
+    :type server: string
+    :param replay: True if modules, card profiles and defaults set through
+        the supervisor should be restored on reconnecting
+    :type replay: bool
+    :param desired: further state to be restored on reconnecting, in the
+        form taken by :class:`pypulseaudio.reconcile.Reconciler`
+    :type desired: dict
+    :param backoff: delay in seconds before retrying a failed attempt,
+        doubled for each further failed attempt
+    :type backoff: float
+    :param max_backoff: maximum delay in seconds between attempts
+    :type max_backoff: float
+    :param jitter: fraction of each delay chosen at random, such that many
+        clients do not reconnect in lockstep
+    :type jitter: float
+    :param options: further keyword arguments passed to
+        :class:`pypulseaudio.PulseAudio`, e.g. cache, threaded or timeout
+    """
+    def __init__(self, app_name, server=None, replay=False, desired=None,
+                 backoff=0.1, max_backoff=5.0, jitter=0.5, **options):
+        self.pulse = PulseAudio(app_name, **options)
+        self.server = server
+        self.replay = replay
+        self.desired = copy.deepcopy(desired) if desired else {}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.reconnects = 0
+        self._attempts = 0
+        self._next_attempt = 0.0
+        self._connected = False
+        self._closed = True
+        self._lock = threading.RLock()
+
+    @property
+    def state(self):
+        """
+        Current pulseaudio context state.
+        """
+        return self.pulse.state
+
+    def __getattr__(self, name):
+        if (name.startswith('_')):
+            raise AttributeError(name)
+        value = getattr(self.pulse, name)
+        if (not callable(value) or name in unsupervised):
+            return value
+        def call(*args, **kwargs):
+            return self._call(name, args, kwargs)
+        call.__name__ = str(name)
+        call.__doc__ = value.__doc__
+        return call
+
+    def connect(self, timeout=None):
+        """
+        Connect to the server, retrying until the timeout should the server
+        be unavailable.
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        """
+        self._closed = False
+        self.ensure_connected(timeout)
+
+    def disconnect(self, timeout=None):
+        """
+        Disconnect from the server.  Calls then raise rather than reconnect,
+        until :meth:`connect` is called again.
+        """
+        self._closed = True
+        self.pulse.disconnect(timeout)
+
+    def ensure_connected(self, timeout=None):
+        """
+        Reconnect now should the connection have failed or terminated.
+        Attempts are spaced by the backoff delay, and are not made should
+        the next attempt fall due after the timeout.
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        """
+        with self.pulse._locked():
+            # Cached reads would otherwise not notice a failure
+            self.pulse._dispatch_pending()
+        if (self.pulse.state == PA_CONTEXT_READY):
+            return
+        deadline = self.pulse._deadline(timeout)
+        error = None
+        with self._lock:
+            while (self.pulse.state != PA_CONTEXT_READY):
+                if (self._closed):
+                    raise Exception('Not connected')
+                now = monotonic()
+                if (self._next_attempt >= deadline or now >= deadline):
+                    raise PulseAudioTimeout('Not connected: %s' % (error or 'timed out'))
+                if (self._next_attempt > now):
+                    time.sleep(self._next_attempt - now)
+                try:
+                    self._reconnect(deadline)
+                except Exception as e:
+                    error = e
+                    delay = min(self.max_backoff, self.backoff * 2 ** self._attempts)
+                    self._attempts += 1
+                    self._next_attempt = (monotonic() +
+                                          delay * (1 - self.jitter * random.random()))
+
+    def _reconnect(self, deadline):
+        timeout = max(0, deadline - monotonic())
+        if (self.pulse.state in (PA_CONTEXT_FAILED, PA_CONTEXT_TERMINATED)):
+            self.pulse.reconnect(timeout)
+        else:
+            self.pulse.connect(self.server, timeout=timeout)
+        self._attempts = 0
+        self._next_attempt = 0.0
+        if (self._connected):
+            self.reconnects += 1
+            if (self.desired):
+                actions = Reconciler(self.pulse).apply(
+                    self.desired, timeout=max(0, deadline - monotonic()))
+                if (actions and self.pulse.cache is not None):
+                    # Reads right after reconnecting reflect the replayed state
+                    self.pulse._populate_cache(max(0, deadline - monotonic()))
+        self._connected = True
+
+    def _call(self, name, args, kwargs):
+        """
+        Carry out a call, reconnecting and retrying as needed.  Its timeout
+        bounds the whole call, each attempt being allowed what remains.
+        """
+        position = _timeout_position(getattr(type(self.pulse), name, None))
+        requested = None
+        if (position is not None):
+            requested = _argument(args, kwargs, position, 'timeout')
+        deadline = self.pulse._deadline(requested)
+        while (True):
+            self.ensure_connected(max(0, deadline - monotonic()))
+            module = None
+            if (self.replay and name == 'unload_module'):
+                module = self.pulse.get_module_info(
+                    _argument(args, kwargs, 0, 'index'),
+                    timeout=max(0, deadline - monotonic()))
+            (call_args, call_kwargs) = (args, kwargs)
+            if (position is not None):
+                timeout = max(0, deadline - monotonic())
+                if (name in waiting):
+                    timeout = min(requested or 0, timeout)
+                (call_args, call_kwargs) = _with_timeout(args, kwargs, position, timeout)
+            try:
+                result = getattr(self.pulse, name)(*call_args, **call_kwargs)
+            except PulseAudioTimeout:
+                raise
+            except Exception:
+                if (self.pulse.state == PA_CONTEXT_READY or not idempotent(name)):
+                    raise
+                result = None
+            if (result is not None or self.pulse.state == PA_CONTEXT_READY):
+                if (self.replay):
+                    with self._lock:
+                        self._record(name, args, kwargs, result, module)
+                return result
+            if (monotonic() >= deadline):
+                raise PulseAudioTimeout('Connection lost and call timed out')
+
+    def _card_name(self, card):
+        if (isinstance(card, int)):
+            info = self.pulse.get_card_info_by_index(card)
+            return info[0]['name'] if info else None
+        return card
+
+    def _record(self, name, args, kwargs, result, module):
+        """
+        Record the state set by a successful call, for restoring it on
+        reconnecting.
+        """
+        if (name == 'load_module'):
+            if (result and result[0] != INVALID_INDEX):
+                self.desired.setdefault('modules', []).append({
+                    'name': _argument(args, kwargs, 0, 'module_name'),
+                    'args': _plain_args(_argument(args, kwargs, 1, 'module_args')),
+                })
+        elif (name == 'unload_module'):
+            if (result and result[0] and module):
+                entry = {'name': module[0]['name'],
+                         'args': _plain_args(module[0]['argument'])}
+                modules = self.desired.get('modules', [])
+                if (entry in modules):
+                    modules.remove(entry)
+        elif (name in ('set_default_sink', 'set_default_source')):
+            if (result and result[0]):
+                self.desired[name[4:]] = _argument(args, kwargs, 0, 'name')
+        elif (name in ('set_card_profile_by_name', 'set_card_profile_by_index')):
+            if (result and result[0]):
+                key = 'index' if name.endswith('index') else 'name'
+                card = self._card_name(_argument(args, kwargs, 0, key))
+                if (card is not None):
+                    self.desired.setdefault('card_profiles', {})[card] = \
+                        _argument(args, kwargs, 1, 'profile')
+        elif (name == 'select_card_profile'):
+            if (result is not None):
+                card = self._card_name(_argument(args, kwargs, 0, 'card'))
+                if (card is not None):
+                    self.desired.setdefault('card_profiles', {})[card] = result
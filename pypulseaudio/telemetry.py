@@ -0,0 +1,376 @@
+"""
+Latency telemetry of sinks and sources, e.g. for spotting devices drifting
+away from their configured latency under load::
+
+    sampler = LatencySampler(pulse, rate=10, max_ratio=2.0, callback=alert)
+    sampler.add('sink', 'alsa_output.pci-0000_00_1b.0.analog-stereo')
+    sampler.add('source', 'alsa_input.usb-0d8c_000c-00.analog-mono')
+    while (True):
+        sampler.run(1.0)
+        for (kind, device) in sampler.devices:
+            print(sampler.stats(kind, device))
+
+Each tick reads the latency of every selected device in a single pipelined
+batch.  Samples are kept per device in a fixed size ring buffer backed by
+arrays of doubles, such that memory use is constant however long the
+sampler runs.  Latencies are in microseconds, as reported by the server.
+"""
+from __future__ import division, unicode_literals
+
+from array import array
+from collections import OrderedDict
+
+from pypulseaudio.constants import *
+from pypulseaudio.records import Record
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+
+def _percentile(ordered, p):
+    """
+    Percentile of sorted values, interpolating linearly between the
+    closest ranks.
+    """
+    if (not ordered):
+        return None
+    position = (len(ordered) - 1) * p / 100.0
+    i = int(position)
+    if (i + 1 >= len(ordered)):
+        return ordered[-1]
+    return ordered[i] + (ordered[i + 1] - ordered[i]) * (position - i)
+
+
+class LatencyRing(object):
+    """
+    Fixed size ring buffer of latency samples of one device, the oldest
+    samples being overwritten once full.
+
+    :param size: number of samples kept
+    :type size: int
+    """
+    def __init__(self, size):
+        self.size = size
+        self.count = 0
+        self._next = 0
+        self._times = array('d', [0.0]) * size
+        self._latency = array('d', [0.0]) * size
+        self._configured = array('d', [0.0]) * size
+
+    def __len__(self):
+        return self.count
+
+    def append(self, time, latency, configured_latency):
+        """
+        Add a sample.
+
+        :param time: monotonic time of the sample in seconds
+        :param latency: latency in microseconds
+        :param configured_latency: configured latency in microseconds
+        """
+        i = self._next
+        self._times[i] = time
+        self._latency[i] = latency
+        self._configured[i] = configured_latency
+        self._next = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def _ordered(self, values):
+        if (self.count < self.size):
+            return values[:self.count]
+        return values[self._next:] + values[:self._next]
+
+    def times(self):
+        """
+        :return: sample times, oldest first
+        :rtype: array
+        """
+        return self._ordered(self._times)
+
+    def latencies(self):
+        """
+        :return: latencies, oldest first
+        :rtype: array
+        """
+        return self._ordered(self._latency)
+
+    def configured_latencies(self):
+        """
+        :return: configured latencies, oldest first
+        :rtype: array
+        """
+        return self._ordered(self._configured)
+
+    def last(self):
+        """
+        :return: the latest sample as a (time, latency, configured latency)
+            tuple, or None if there are no samples
+        """
+        if (not self.count):
+            return None
+        i = (self._next - 1) % self.size
+        return (self._times[i], self._latency[i], self._configured[i])
+
+    def percentile(self, p):
+        """
+        :param p: percentile, from 0 to 100
+        :type p: float
+        :return: the latency below which the given percentage of samples
+            fall, or None if there are no samples
+        :rtype: float
+        """
+        return _percentile(sorted(self._latency[:self.count]), p)
+
+    def jitter(self):
+        """
+        :return: mean absolute difference between successive latencies, or
+            None if there are fewer than two samples
+        :rtype: float
+        """
+        if (self.count < 2):
+            return None
+        values = self.latencies()
+        return (sum(abs(values[i] - values[i - 1]) for i in range(1, len(values))) /
+                (len(values) - 1))
+
+
+class LatencyStats(Record):
+    """
+    Summary of the samples held for a device.
+
+    :param kind: 'sink' or 'source'
+    :param device: name or index under which the device was added
+    :param count: number of samples
+    :param mean: mean latency
+    :param min: lowest latency
+    :param max: highest latency
+    :param p50: median latency
+    :param p95: 95th percentile latency
+    :param p99: 99th percentile latency
+    :param jitter: mean absolute difference between successive latencies
+    :param configured_latency: latest configured latency
+    """
+    __slots__ = ('kind', 'device', 'count', 'mean', 'min', 'max', 'p50', 'p95',
+                 'p99', 'jitter', 'configured_latency')
+    fields = __slots__
+
+    def __init__(self, kind, device, count, mean, min, max, p50, p95, p99,
+                 jitter, configured_latency):
+        self.kind = kind
+        self.device = device
+        self.count = count
+        self.mean = mean
+        self.min = min
+        self.max = max
+        self.p50 = p50
+        self.p95 = p95
+        self.p99 = p99
+        self.jitter = jitter
+        self.configured_latency = configured_latency
+
+
+class LatencyAlert(Record):
+    """
+    A device crossing the sampler's latency thresholds.
+
+    :param kind: 'sink' or 'source'
+    :param device: name or index under which the device was added
+    :param raised: True if the device has exceeded a threshold, False if it
+        has returned within them
+    :param latency: latency of the sample crossing the threshold
+    :param configured_latency: configured latency at that sample
+    """
+    __slots__ = ('kind', 'device', 'raised', 'latency', 'configured_latency')
+    fields = __slots__
+
+    def __init__(self, kind, device, raised, latency, configured_latency):
+        self.kind = kind
+        self.device = device
+        self.raised = raised
+        self.latency = latency
+        self.configured_latency = configured_latency
+
+
+class LatencySampler(object):
+    """
+    Periodic sampling of the latency of selected sinks and sources.
+
+    A device exceeds the thresholds when its latency is above max_latency,
+    or above max_ratio times its configured latency.  An alert is raised
+    once a device has exceeded the thresholds for hold successive samples,
+    and cleared once it has been within them for as many.
+
+    :param pulse: connected instance
+    :type pulse: :class:`pypulseaudio.PulseAudio`
+    :param rate: samples per second
+    :type rate: float
+    :param size: number of samples kept per device
+    :type size: int
+    :param max_latency: latency threshold in microseconds, None for none
+    :type max_latency: float
+    :param max_ratio: threshold as a multiple of the configured latency,
+        None for none
+    :type max_ratio: float
+    :param hold: number of successive samples required to raise or clear
+        an alert
+    :type hold: int
+    :param callback: function called with each :class:`LatencyAlert`
+    :type callback: callable
+    """
+    def __init__(self, pulse, rate=10.0, size=600, max_latency=None,
+                 max_ratio=None, hold=1, callback=None):
+        self._pulse = pulse
+        self.rate = rate
+        self.size = size
+        self.max_latency = max_latency
+        self.max_ratio = max_ratio
+        self.hold = hold
+        self.callback = callback
+        self._rings = OrderedDict()
+        self._streaks = {}
+        self._alerting = set()
+        self._next = None
+
+    @property
+    def devices(self):
+        """
+        :return: the devices sampled, as (kind, device) tuples
+        :rtype: list
+        """
+        return list(self._rings)
+
+    def add(self, kind, device):
+        """
+        Start sampling a device.
+
+        :param kind: 'sink' or 'source'
+        :type kind: string
+        :param device: name or index of the device
+        :type device: string or int
+        """
+        if (kind not in ('sink', 'source')):
+            raise Exception('Unknown device kind: %s' % kind)
+        if ((kind, device) not in self._rings):
+            self._rings[(kind, device)] = LatencyRing(self.size)
+
+    def remove(self, kind, device):
+        """
+        Stop sampling a device, discarding its samples.
+        """
+        key = (kind, device)
+        del self._rings[key]
+        self._streaks.pop(key, None)
+        self._alerting.discard(key)
+
+    def ring(self, kind, device):
+        """
+        :return: the samples held for a device
+        :rtype: :class:`LatencyRing`
+        """
+        return self._rings[(kind, device)]
+
+    def stats(self, kind, device):
+        """
+        Summarise the samples held for a device.
+
+        :return: summary, or None if there are no samples
+        :rtype: :class:`LatencyStats`
+        """
+        ring = self._rings[(kind, device)]
+        if (not ring.count):
+            return None
+        ordered = sorted(ring.latencies())
+        return LatencyStats(kind, device, ring.count,
+                            sum(ordered) / len(ordered),
+                            ordered[0], ordered[-1],
+                            _percentile(ordered, 50),
+                            _percentile(ordered, 95),
+                            _percentile(ordered, 99),
+                            ring.jitter(), ring.last()[2])
+
+    def _exceeds(self, latency, configured_latency):
+        if (self.max_latency is not None and latency > self.max_latency):
+            return True
+        return (self.max_ratio is not None and configured_latency > 0 and
+                latency > self.max_ratio * configured_latency)
+
+    def _check(self, key, latency, configured_latency):
+        """
+        Update a device's alert state with a sample.
+
+        :return: the alert raised or cleared, if any
+        """
+        exceeds = self._exceeds(latency, configured_latency)
+        if (exceeds == (key in self._alerting)):
+            self._streaks[key] = 0
+            return None
+        self._streaks[key] = self._streaks.get(key, 0) + 1
+        if (self._streaks[key] < self.hold):
+            return None
+        self._streaks[key] = 0
+        if (exceeds):
+            self._alerting.add(key)
+        else:
+            self._alerting.discard(key)
+        return LatencyAlert(key[0], key[1], exceeds, latency, configured_latency)
+
+    def sample(self, timeout=None):
+        """
+        Sample every device now, in a single round trip.  Devices which do
+        not exist are skipped.
+
+        :param timeout: time in seconds allowed, defaults to the instance timeout
+        :type timeout: float
+        :return: alerts raised or cleared, or None if not connected
+        :rtype: list of :class:`LatencyAlert`
+        """
+        keys = self.devices
+        batch = self._pulse.batch()
+        for (kind, device) in keys:
+            by = 'index' if isinstance(device, int) else 'name'
+            getattr(batch, 'get_%s_info_by_%s' % (kind, by))(device)
+        results = batch.execute(timeout)
+        if (results is None):
+            return None
+        now = monotonic()
+        alerts = []
+        for (key, result) in zip(keys, results):
+            if (not result):
+                continue
+            latency = result[0]['latency']
+            configured_latency = result[0]['configured_latency']
+            self._rings[key].append(now, latency, configured_latency)
+            alert = self._check(key, latency, configured_latency)
+            if (alert is not None):
+                alerts.append(alert)
+        if (self.callback is not None):
+            for alert in alerts:
+                self.callback(alert)
+        return alerts
+
+    def run(self, timeout=0):
+        """
+        Run the main loop for up to timeout seconds, until the next sample
+        is due, and take it.
+
+        :param timeout: maximum time in seconds to wait for the sample
+        :type timeout: float
+        :return: alerts raised or cleared, or None if no sample was taken
+        :rtype: list of :class:`LatencyAlert`
+        """
+        pulse = self._pulse
+        end = monotonic() + timeout
+        if (self._next is None):
+            self._next = monotonic()
+        with pulse._locked():
+            while (True):
+                now = monotonic()
+                if (now >= self._next):
+                    break
+                if (now >= end or pulse.state != PA_CONTEXT_READY):
+                    return None
+                pulse._run_once(min(end, self._next))
+        self._next = max(self._next + 1.0 / self.rate, now)
+        return self.sample()
@@ -0,0 +1,116 @@
+"""
+Conversion between pa_volume_t values, as found in the ``volume`` of sinks
+and sources and as passed to the volume setters of
+:class:`pypulseaudio.PulseAudio`, and linear or dB gains.
+
+These follow libpulse's software volume mapping, in which a pa_volume_t is
+the cube root of the linear gain scaled by PA_VOLUME_NORM, such that
+PA_VOLUME_NORM is 0 dB and PA_VOLUME_MUTED is silence (-inf dB).
+
+All conversions take a sequence of values and return a list.  They are
+vectorized with numpy if it is installed, which is worthwhile for many
+objects or channels at once, and otherwise computed in pure python.
+numpy is only imported by the first conversion, such that importing
+pypulseaudio does not pay for it.
+"""
+from __future__ import division, unicode_literals
+
+import math
+
+from pypulseaudio.constants import PA_VOLUME_MUTED, PA_VOLUME_NORM, PA_VOLUME_MAX
+
+# The numpy module once imported, None if it is not installed, False until
+# the first conversion
+numpy = False
+
+
+def _numpy():
+    global numpy
+    if (numpy is False):
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy
+
+
+def _clamp(volume):
+    return min(max(int(round(volume)), PA_VOLUME_MUTED), PA_VOLUME_MAX)
+
+
+def volume_from_linear(values):
+    """
+    Convert linear gains, 1.0 being unity, into pa_volume_t values.
+
+    :param values: linear gains
+    :type values: sequence of float
+    :return: volumes
+    :rtype: list of int
+    """
+    np = _numpy()
+    if (np is not None):
+        v = np.cbrt(np.maximum(np.asarray(values, dtype=float), 0.0))
+        v = np.rint(v * PA_VOLUME_NORM)
+        return np.clip(v, PA_VOLUME_MUTED, PA_VOLUME_MAX).astype(np.int64).tolist()
+    return [_clamp(max(v, 0.0) ** (1 / 3) * PA_VOLUME_NORM) for v in values]
+
+
+def volume_to_linear(volumes):
+    """
+    Convert pa_volume_t values into linear gains.
+
+    :param volumes: volumes
+    :type volumes: sequence of int
+    :return: linear gains
+    :rtype: list of float
+    """
+    np = _numpy()
+    if (np is not None):
+        v = np.asarray(volumes, dtype=float) / PA_VOLUME_NORM
+        return (v * v * v).tolist()
+    return [(v / PA_VOLUME_NORM) ** 3 for v in volumes]
+
+
+def volume_from_db(values):
+    """
+    Convert gains in dB, 0.0 being unity, into pa_volume_t values.  -inf
+    is silence.
+
+    :param values: gains in dB
+    :type values: sequence of float
+    :return: volumes
+    :rtype: list of int
+    """
+    # The cube root of 10^(dB/20) is 10^(dB/60)
+    np = _numpy()
+    if (np is not None):
+        v = np.power(10.0, np.asarray(values, dtype=float) / 60.0)
+        v = np.rint(v * PA_VOLUME_NORM)
+        return np.clip(v, PA_VOLUME_MUTED, PA_VOLUME_MAX).astype(np.int64).tolist()
+    return [_clamp(10.0 ** (v / 60.0) * PA_VOLUME_NORM) for v in values]
+
+
+def volume_to_db(volumes):
+    """
+    Convert pa_volume_t values into gains in dB.  PA_VOLUME_MUTED is -inf.
+
+    :param volumes: volumes
+    :type volumes: sequence of int
+    :return: gains in dB
+    :rtype: list of float
+    """
+    np = _numpy()
+    if (np is not None):
+        v = np.asarray(volumes, dtype=float) / PA_VOLUME_NORM
+        with np.errstate(divide='ignore'):
+            return (60.0 * np.log10(v)).tolist()
+    return [60.0 * math.log10(v / PA_VOLUME_NORM) if v > PA_VOLUME_MUTED
+            else float('-inf') for v in volumes]
+
+
+converters = {
+    'db': volume_from_db,
+    'linear': volume_from_linear,
+    'volume': list,
+}
@@ -1,8 +1,22 @@
 from __future__ import unicode_literals
 
 import re
+import sys
 
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+
+class BuildPy(build_py):
+    """
+    Leaves out the asyncio front-end, which requires Python 3.7, when
+    building for earlier versions.
+    """
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if (sys.version_info < (3, 7)):
+            modules = [m for m in modules if m[:2] != ('pypulseaudio', 'aio')]
+        return modules
 
 
 def get_version(filename):
@@ -21,6 +35,8 @@ setup(
     description='Python-based PulseAudio sound management',
     long_description=open('README.rst').read(),
     packages=find_packages(exclude=['tests', 'tests.*']),
+    cmdclass={'build_py': BuildPy},
+    python_requires='>=2.7',
     zip_safe=False,
     include_package_data=True,
     install_requires=[
@@ -39,6 +55,8 @@ setup(
         'Operating System :: POSIX :: Linux',
         'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.7',
         'Topic :: Software Development :: Libraries',
         'Topic :: Multimedia :: Sound/Audio',
     ],
@@ -0,0 +1,100 @@
+from __future__ import unicode_literals
+
+import asyncio
+import time
+import unittest
+
+from pypulseaudio import PulseAudioTimeout
+from pypulseaudio.aio import AsyncPulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+class AsyncPulseAudioTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=3, latency=0.01)
+
+    def run_async(self, coroutine_function):
+        async def main():
+            pulse = AsyncPulseAudio('test', backend=self.backend)
+            await pulse.connect(timeout=1)
+            try:
+                return await coroutine_function(pulse)
+            finally:
+                if (pulse.state == PA_CONTEXT_READY):
+                    await pulse.disconnect(timeout=1)
+        return asyncio.run(main())
+
+    def test_calls_are_pipelined(self):
+        async def calls(pulse):
+            start = time.time()
+            results = await asyncio.gather(*[pulse.get_sink_info_list()
+                                             for i in range(10)])
+            return (results, time.time() - start)
+        (results, elapsed) = self.run_async(calls)
+        self.assertEqual([3] * 10, [len(result) for result in results])
+        self.assertLess(elapsed, 0.05)
+
+    def test_timeout(self):
+        async def call(pulse):
+            self.backend.respond = False
+            start = time.time()
+            with self.assertRaises(PulseAudioTimeout):
+                await pulse.get_sink_info_list(timeout=0.1)
+            self.assertLess(time.time() - start, 0.5)
+            self.assertEqual({}, pulse._pulse._operations)
+            self.assertEqual({}, pulse._pending)
+        self.run_async(call)
+
+    def test_cancel(self):
+        async def call(pulse):
+            self.backend.respond = False
+            task = asyncio.ensure_future(pulse.get_sink_info_list())
+            await asyncio.sleep(0.05)
+            self.assertEqual(1, len(pulse._pulse._operations))
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual({}, pulse._pulse._operations)
+        self.run_async(call)
+
+    def test_connection_failure_fails_pending_calls(self):
+        async def calls(pulse):
+            self.backend.respond = False
+            tasks = [asyncio.ensure_future(pulse.get_sink_info_list(timeout=5))
+                     for i in range(3)]
+            await asyncio.sleep(0.05)
+            start = time.time()
+            self.backend.restart(downtime=60)
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            self.assertLess(time.time() - start, 1.0)
+            self.assertEqual(PA_CONTEXT_FAILED, pulse.state)
+            self.assertEqual({}, pulse._pulse._operations)
+            return results
+        for result in self.run_async(calls):
+            self.assertIsInstance(result, Exception)
+            self.assertNotIsInstance(result, PulseAudioTimeout)
+
+    def test_loop_is_bound_at_first_use(self):
+        pulse = AsyncPulseAudio('test', backend=self.backend)
+        async def connect():
+            await pulse.connect(timeout=1)
+            await pulse.disconnect(timeout=1)
+            return asyncio.get_running_loop()
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertIs(loop, loop.run_until_complete(connect()))
+            self.assertIs(loop, pulse._loop)
+        finally:
+            loop.close()
+
+    def test_unavailable_methods(self):
+        pulse = AsyncPulseAudio('test', backend=self.backend)
+        for name in ('iter_sink_info', 'batch', 'process_events', 'set_volumes'):
+            with self.assertRaises(AttributeError) as cm:
+                getattr(pulse, name)
+            self.assertIn('not available as a coroutine', '%s' % cm.exception)
+        with self.assertRaises(AttributeError):
+            pulse.no_such_method
+        self.assertTrue(callable(pulse.get_sink_info_by_name))
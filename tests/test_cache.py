@@ -0,0 +1,158 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.cache import ModuleRegistry
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+def module(index, name, **args):
+    return {'index': index, 'name': name, 'argument': args or None, 'n_used': 0}
+
+
+class ModuleRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ModuleRegistry([
+            module(0, 'module-null-sink', sink_name='a', rate='48000'),
+            module(1, 'module-null-sink', sink_name='b', rate='48000'),
+            module(2, 'module-loopback', latency_msec='20'),
+            module(3, 'module-native-protocol-unix'),
+        ])
+
+    def indexes(self, modules):
+        return [m['index'] for m in modules]
+
+    def test_find(self):
+        registry = self.registry
+        self.assertEqual(4, len(registry))
+        self.assertIn('module-loopback', registry)
+        self.assertNotIn('module-bogus', registry)
+        self.assertEqual([0, 1], self.indexes(registry.find('module-null-sink')))
+        self.assertEqual([1], self.indexes(registry.find('module-null-sink', sink_name='b')))
+        self.assertEqual([0, 1], self.indexes(registry.find('module-null-sink', rate=48000)))
+        self.assertEqual([], registry.find('module-null-sink', sink_name='c'))
+        self.assertEqual([], registry.find('module-loopback', sink_name='a'))
+        self.assertEqual([3], self.indexes(registry.find('module-native-protocol-unix')))
+
+    def test_remove(self):
+        registry = self.registry
+        registry.remove(0)
+        registry.remove(0)
+        registry.remove(2)
+        self.assertEqual([1], self.indexes(registry.find('module-null-sink')))
+        self.assertEqual([], registry.find('module-null-sink', sink_name='a'))
+        self.assertNotIn('module-loopback', registry)
+        self.assertEqual([1, 3], self.indexes(registry))
+        # No index entries are left behind
+        self.assertEqual(set([('module-null-sink', 'sink_name', 'b'),
+                              ('module-null-sink', 'rate', '48000')]),
+                         set(registry._args))
+
+    def test_replace(self):
+        registry = self.registry
+        registry.add(module(1, 'module-null-sink', sink_name='c'))
+        self.assertEqual([], registry.find('module-null-sink', sink_name='b'))
+        self.assertEqual([1], self.indexes(registry.find('module-null-sink', sink_name='c')))
+        self.assertEqual([0], self.indexes(registry.find('module-null-sink', rate='48000')))
+        self.assertEqual(4, len(registry))
+
+    def test_clear(self):
+        self.registry.clear()
+        self.assertEqual(0, len(self.registry))
+        self.assertEqual([], self.registry.find('module-null-sink'))
+
+
+class CachedModulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(latency=0.001)
+        self.pulse = PulseAudio('test', cache=True, backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def settle(self):
+        # Let the change notifications, and the cache's reads, arrive
+        self.pulse.process_events(0.05)
+
+    def test_find_modules_follows_server(self):
+        pulse = self.pulse
+        index = pulse.load_module('module-null-sink', {'sink_name': 'x y'})[0]
+        self.settle()
+        found = pulse.find_modules('module-null-sink', {'sink_name': 'x y'})
+        self.assertEqual([index], [m['index'] for m in found])
+        pulse.unload_module(index)
+        self.backend.add('module', name='module-loopback', argument='latency_msec=20')
+        self.settle()
+        self.assertEqual([], pulse.find_modules('module-null-sink'))
+        self.assertEqual(1, len(pulse.find_modules('module-loopback',
+                                                   {'latency_msec': 20})))
+
+
+class ObjectCacheTest(unittest.TestCase):
+    records = False
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=2, n_cards=1, latency=0.001)
+        self.pulse = PulseAudio('test', cache=True, records=self.records,
+                                backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def settle(self):
+        self.pulse.process_events(0.05)
+
+    def names(self):
+        return [sink['name'] for sink in self.pulse.get_sink_info_list()]
+
+    def test_events_update_cache(self):
+        pulse = self.pulse
+        self.assertEqual(['fake_output.0', 'fake_output.1'], self.names())
+        index = self.backend.add('sink')
+        self.settle()
+        self.assertEqual(3, len(self.names()))
+        self.backend.change('sink', index, name='renamed', mute=1)
+        self.settle()
+        self.assertEqual(True, pulse.get_sink_info_by_index(index)[0]['mute'])
+        self.assertEqual(index, pulse.get_sink_info_by_name('renamed')[0]['index'])
+        self.backend.remove('sink', index)
+        self.settle()
+        self.assertEqual(['fake_output.0', 'fake_output.1'], self.names())
+        self.backend.change('server', None, default_sink_name='fake_output.1')
+        self.settle()
+        self.assertEqual('fake_output.1', pulse.get_server_info()[0]['default_sink_name'])
+        # Every answer above came from the cache
+        self.backend.respond = False
+        self.assertEqual(2, len(pulse.get_sink_info_list(timeout=0.1)))
+
+    def test_results_are_copies(self):
+        pulse = self.pulse
+        self.backend.respond = False
+        sink = pulse.get_sink_info_by_index(0, timeout=0.1)[0]
+        sink['volume']['values'][0] = 0
+        for sink in pulse.get_sink_info_list(timeout=0.1):
+            sink['volume']['values'].append(0)
+        card = pulse.get_card_info_list(timeout=0.1)[0]
+        if (self.records):
+            card['profiles'][0].name = 'bogus'
+        else:
+            card['profiles'][0]['name'] = 'bogus'
+        del card['profiles'][1:]
+        self.assertEqual([PA_VOLUME_NORM] * 2,
+                         pulse.get_sink_info_by_name('fake_output.0',
+                                                     timeout=0.1)[0]['volume']['values'])
+        self.assertEqual([PA_VOLUME_NORM] * 2,
+                         pulse.get_sink_info_list(timeout=0.1)[1]['volume']['values'])
+        profiles = pulse.get_card_info_list(timeout=0.1)[0]['profiles']
+        self.assertNotEqual('bogus', profiles[0]['name'])
+        self.assertTrue(len(profiles) > 1)
+
+
+class RecordObjectCacheTest(ObjectCacheTest):
+    records = True
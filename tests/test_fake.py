@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+
+import select
+import threading
+import time
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+class PollFuncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(latency=0.2)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.polls = []
+        self.main_loop = self.pulse._main_loop
+        self.backend.pa_mainloop_set_poll_func(self.main_loop,
+                                               self.backend.pa_poll_func(self.poll),
+                                               None)
+
+    def poll(self, ufds, nfds, timeout, userdata):
+        fds = [(ufds[i].fd, ufds[i].events) for i in range(nfds)]
+        poller = select.poll()
+        for (fd, events) in fds:
+            poller.register(fd, events)
+        ready = poller.poll(timeout)
+        self.polls.append((fds, timeout, ready))
+        return len(ready)
+
+    def iterate(self):
+        self.backend.pa_mainloop_prepare(self.main_loop, -1)
+        count = self.backend.pa_mainloop_poll(self.main_loop)
+        self.backend.pa_mainloop_dispatch(self.main_loop)
+        return count
+
+    def test_timeout_until_next_call_due(self):
+        self.backend.pa_context_connect(self.pulse._context, None, 0, None)
+        self.assertEqual(PA_CONTEXT_CONNECTING, self.pulse.state)
+        start = time.time()
+        while (self.pulse.state != PA_CONTEXT_READY):
+            self.iterate()
+        self.assertGreaterEqual(time.time() - start, 0.19)
+        self.assertEqual(1, len(self.polls[0][0]))
+        self.assertTrue(0 < self.polls[-1][1] <= 200)
+
+    def test_wakeup_from_another_thread(self):
+        threading.Timer(0.05, self.backend.pa_mainloop_wakeup,
+                        (self.main_loop,)).start()
+        start = time.time()
+        self.assertEqual(0, self.iterate())
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(-1, self.polls[0][1])
+        self.assertEqual(1, len(self.polls[0][2]))
+
+    def test_prepare_timeout_in_milliseconds(self):
+        self.backend.pa_mainloop_prepare(self.main_loop, 30000)
+        self.backend.pa_mainloop_poll(self.main_loop)
+        self.assertEqual(30, self.polls[0][1])
@@ -0,0 +1,94 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.helper import HelperClient, HelperServer
+
+
+class HelperTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'helper')
+        self.server = HelperServer(self.path, backend=FakeBackend(n_sinks=2),
+                                   timeout=1.0)
+        self.server.start()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.client = HelperClient(self.path, timeout=2.0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        self.thread.join(2.0)
+        shutil.rmtree(self.directory)
+
+    def test_call(self):
+        sinks = self.client.get_sink_info_list()
+        self.assertEqual(['fake_output.0', 'fake_output.1'],
+                         [sink['name'] for sink in sinks])
+
+    def test_excluded_methods(self):
+        for method in ('snapshot', 'reconnect', 'disconnect', '_context'):
+            with self.assertRaises(Exception) as cm:
+                self.client.call(method)
+            self.assertIn('not allowed', '%s' % cm.exception)
+        self.assertEqual('pulseaudio',
+                         self.client.get_server_info()[0]['server_name'])
+
+    def test_unknown_method(self):
+        with self.assertRaises(Exception) as cm:
+            self.client.call('no_such_method')
+        self.assertIn('Unknown method', '%s' % cm.exception)
+
+    def test_unencodable_result_is_an_error_reply(self):
+        self.server.handle = lambda line: {'result': object()}
+        with self.assertRaises(Exception) as cm:
+            self.client.get_server_info()
+        self.assertIn('Cannot encode result', '%s' % cm.exception)
+        del self.server.handle
+        # The server keeps serving this and other clients
+        self.assertEqual(2, len(self.client.get_sink_info_list()))
+        with HelperClient(self.path, timeout=2.0) as other:
+            self.assertEqual(2, len(other.get_sink_info_list()))
+
+    def test_live_socket_is_not_replaced(self):
+        other = HelperServer(self.path, backend=FakeBackend(), timeout=1.0)
+        with self.assertRaises(Exception) as cm:
+            other.start()
+        self.assertIn('already listening', '%s' % cm.exception)
+        self.assertEqual(2, len(self.client.get_sink_info_list()))
+
+
+class StaleSocketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'helper')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_stale_socket_is_replaced(self):
+        # Left by a helper which exited without removing it
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        server = HelperServer(self.path, backend=FakeBackend(n_sinks=3), timeout=1.0)
+        server.start()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            with HelperClient(self.path, timeout=2.0) as client:
+                self.assertEqual(3, len(client.get_sink_info_list()))
+        finally:
+            server.close()
+            thread.join(2.0)
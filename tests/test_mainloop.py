@@ -0,0 +1,117 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.mainloop import MainLoop
+from pypulseaudio.subscription import Event
+
+
+class MainLoopTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=2, n_sources=1, latency=0.001)
+        self.loop = MainLoop(self.backend)
+        self.pulses = [PulseAudio('test.%d' % i, mainloop=self.loop)
+                       for i in range(3)]
+        for pulse in self.pulses:
+            pulse.connect(timeout=1)
+        self.events = []
+
+    def tearDown(self):
+        for pulse in self.pulses:
+            pulse.disconnect()
+        self.loop.free()
+
+    def iterate(self, count, timeout=1):
+        delivered = 0
+        deadline = time.time() + timeout
+        while (delivered < count and time.time() < deadline):
+            delivered += self.loop.iterate(0.05)
+        return delivered
+
+    def handler(self, pulse):
+        return lambda event: self.events.append((pulse, event))
+
+    def test_shared_loop(self):
+        self.assertEqual(set(self.pulses), set(self.loop.instances))
+        for pulse in self.pulses:
+            self.assertEqual(2, len(pulse.get_sink_info_list()))
+        self.assertEqual(3, len(self.backend.contexts))
+        with self.assertRaises(Exception):
+            PulseAudio('test', mainloop=self.loop, backend=FakeBackend())
+        with self.assertRaises(Exception):
+            PulseAudio('test', mainloop=self.loop, threaded=True)
+
+    def test_dispatch_to_every_instance(self):
+        for pulse in self.pulses:
+            pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.handler(pulse))
+        self.backend.change('sink', 1, mute=1)
+        self.assertEqual(3, self.iterate(3))
+        self.assertEqual(set(self.pulses), set(pulse for (pulse, event) in self.events))
+        self.assertEqual(set([Event('sink', 'change', 1)]),
+                         set(event for (pulse, event) in self.events))
+
+    def test_coalescing_window(self):
+        pulse = self.pulses[0]
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.handler(pulse), 0.1)
+        start = time.time()
+        self.backend.change('sink', 0, mute=1)
+        self.backend.change('sink', 0, mute=0)
+        # Without a timeout the loop still wakes once the window closes
+        for i in range(10):
+            if (self.loop.iterate(None)):
+                break
+        elapsed = time.time() - start
+        self.assertTrue(0.09 < elapsed < 0.5, elapsed)
+        self.assertEqual([(pulse, Event('sink', 'change', 0))], self.events)
+
+    def test_reentrant_calls(self):
+        (a, b, c) = self.pulses
+        names = []
+        def handler(event):
+            # Blocking calls on other instances run the same loop
+            names.append(b.get_sink_info_by_index(event.index)[0]['name'])
+            names.append(c.get_source_info_by_index(0)[0]['name'])
+        a.subscribe(PA_SUBSCRIPTION_MASK_SINK, handler)
+        b.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.handler(b))
+        self.backend.change('sink', 1, mute=1)
+        self.assertEqual(2, self.iterate(2))
+        self.assertEqual(['fake_output.1', 'fake_input.0'], names)
+        self.assertEqual([(b, Event('sink', 'change', 1))], self.events)
+
+    def test_detach(self):
+        (a, b, c) = self.pulses
+        a.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.handler(a))
+        b.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.handler(b))
+        self.loop.detach(a)
+        self.backend.change('sink', 0, mute=1)
+        self.assertEqual(1, self.iterate(1))
+        self.assertEqual(0, self.iterate(1, 0.1))
+        self.assertEqual([(b, Event('sink', 'change', 0))], self.events)
+
+    def test_run_forever(self):
+        pulse = self.pulses[0]
+        def handler(event):
+            self.events.append(event)
+            if (len(self.events) == 2):
+                self.loop.quit()
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, handler)
+        self.backend.change('sink', 0, mute=1)
+        self.backend.change('sink', 1, mute=1)
+        self.loop.run_forever()
+        self.assertEqual(2, len(self.events))
+
+    def test_quit_from_another_thread(self):
+        timer = threading.Timer(0.05, self.loop.quit)
+        start = time.time()
+        timer.start()
+        try:
+            self.loop.run_forever()
+        finally:
+            timer.cancel()
+        self.assertTrue(time.time() - start < 1)
@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.metrics import MetricsHook, PrometheusMetrics
+
+
+class Recorder(MetricsHook):
+    def __init__(self):
+        self.traces = []
+
+    def observe(self, trace):
+        self.traces.append(trace)
+
+
+class MetricsTest(unittest.TestCase):
+    def connect(self, metrics):
+        pulse = PulseAudio('test', backend=FakeBackend(n_sinks=3), metrics=metrics)
+        pulse.connect(timeout=1)
+        self.addCleanup(pulse.disconnect)
+        return pulse
+
+    def test_traces(self):
+        recorder = Recorder()
+        pulse = self.connect(recorder)
+        self.assertEqual(3, len(pulse.get_sink_info_list()))
+        self.assertEqual(['connect', 'get_sink_info_list'],
+                         [trace.name for trace in recorder.traces])
+        trace = recorder.traces[-1]
+        self.assertEqual('ok', trace.outcome)
+        self.assertEqual(3, trace.entries)
+
+    def test_base_hook_ignores_traces(self):
+        pulse = self.connect(MetricsHook())
+        self.assertEqual(3, len(pulse.get_sink_info_list()))
+
+    def test_hook_without_observe(self):
+        with self.assertRaises(Exception):
+            PulseAudio('test', backend=FakeBackend(), metrics=object())
+
+    def test_prometheus(self):
+        metrics = PrometheusMetrics()
+        pulse = self.connect(metrics)
+        pulse.get_sink_info_list()
+        text = metrics.render()
+        self.assertIn('pulseaudio_calls_total{method="get_sink_info_list",'
+                      'outcome="ok"} 1\n', text)
+        self.assertIn('pulseaudio_entries_total{method="get_sink_info_list"} 3\n',
+                      text)
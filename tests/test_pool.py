@@ -0,0 +1,73 @@
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+from pypulseaudio import PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def test_get_reuses_connection(self):
+        pool = ConnectionPool('test', backend=FakeBackend())
+        try:
+            pulse = pool.get(None)
+            self.assertEqual(PA_CONTEXT_READY, pulse.state)
+            self.assertIs(pulse, pool.get(None))
+            self.assertEqual([None], pool.servers())
+        finally:
+            pool.close()
+
+    def test_get_replaces_failed_connection(self):
+        backend = FakeBackend()
+        pool = ConnectionPool('test', backend=backend)
+        try:
+            pulse = pool.get(None)
+            backend.restart()
+            with pulse._locked():
+                pulse._wait_state(PA_CONTEXT_FAILED, pulse._deadline(1.0))
+            replacement = pool.get(None)
+            self.assertIsNot(pulse, replacement)
+            self.assertEqual(PA_CONTEXT_READY, replacement.state)
+        finally:
+            pool.close()
+
+    def test_failed_connections_hold_no_threads(self):
+        before = threading.active_count()
+        for backend in (FakeBackend(respond=False), FakeBackend()):
+            backend.restart(downtime=60)
+            pool = ConnectionPool('test', backend=backend, timeout=0.1)
+            for i in range(5):
+                (results, errors) = pool.fan_out(['tcp:a', 'tcp:b'], 'get_server_info')
+                self.assertEqual({}, results)
+                self.assertEqual(['tcp:a', 'tcp:b'], sorted(errors))
+            with self.assertRaises(Exception):
+                pool.get('tcp:a')
+            self.assertEqual([], pool.servers())
+        self.assertEqual(before, threading.active_count())
+
+    def test_discarded_connections_are_freed(self):
+        backend = FakeBackend()
+        pool = ConnectionPool('test', backend=backend)
+        for i in range(3):
+            pulse = pool.get(None)
+            backend.restart()
+            with pulse._locked():
+                pulse._wait_state(PA_CONTEXT_FAILED, pulse._deadline(1.0))
+        pool.get('tcp:a')
+        self.assertEqual(2, len(backend.contexts))
+        self.assertEqual(2, len(backend.threaded_mainloops))
+        backend.restart(downtime=60)
+        pool.fan_out([None, 'tcp:a', 'tcp:b'], 'get_server_info')
+        pool.close()
+        self.assertEqual([], backend.contexts)
+        self.assertEqual([], backend.threaded_mainloops)
+
+    def test_unresponsive_server_times_out(self):
+        pool = ConnectionPool('test', backend=FakeBackend(respond=False), timeout=0.1)
+        with self.assertRaises(PulseAudioTimeout):
+            pool.get(None)
+        self.assertEqual([], pool.servers())
@@ -0,0 +1,126 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.profiles import choose_profile, profile_available, profile_channels
+
+
+def profile(name, priority, n_sinks=1, n_sources=0, available=True):
+    return {'name': name, 'desc': name, 'n_sinks': n_sinks, 'n_sources': n_sources,
+            'priority': priority, 'available': available}
+
+
+def port(name, direction, profiles, available=PA_PORT_AVAILABLE_UNKNOWN):
+    return {'name': name, 'desc': name, 'priority': 0, 'available': available,
+            'direction': direction, 'profiles': profiles}
+
+
+class ProfileChannelsTest(unittest.TestCase):
+
+    def test_channels(self):
+        self.assertEqual((2, 0), profile_channels('output:analog-stereo'))
+        self.assertEqual((0, 1), profile_channels('input:analog-mono'))
+        self.assertEqual((6, 1), profile_channels('output:analog-surround-51+input:analog-mono'))
+        self.assertEqual((2, 2), profile_channels('output:hdmi-stereo-extra1+input:iec958-stereo'))
+        self.assertEqual((None, 0), profile_channels('output:iec958-ac3-surround'))
+        self.assertEqual((2, 0), profile_channels('a2dp_sink_aac'))
+        self.assertEqual((1, 1), profile_channels('headset-head-unit'))
+        self.assertEqual((0, 0), profile_channels('off'))
+        self.assertEqual((None, None), profile_channels('pro-audio'))
+
+
+class ChooseProfileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.card = {
+            'name': 'card', 'index': 0, 'active_profile': 'output:analog-stereo',
+            'profiles': [
+                profile('output:analog-stereo', 6500),
+                profile('output:analog-stereo+input:analog-stereo', 6565, n_sources=1),
+                profile('output:analog-surround-51', 1300),
+                profile('output:hdmi-stereo', 9000, available=False),
+                profile('output:iec958-ac3-surround', 7000),
+                profile('input:analog-stereo', 65, n_sinks=0, n_sources=1),
+                profile('off', 0, n_sinks=0),
+            ],
+            'ports': [
+                port('speaker', PA_DIRECTION_OUTPUT,
+                     ['output:analog-stereo', 'output:analog-stereo+input:analog-stereo',
+                      'output:analog-surround-51']),
+                port('mic', PA_DIRECTION_INPUT,
+                     ['output:analog-stereo+input:analog-stereo', 'input:analog-stereo']),
+            ],
+        }
+
+    def choose(self, output_channels=0, input_channels=0):
+        chosen = choose_profile(self.card, output_channels, input_channels)
+        return chosen['name'] if chosen is not None else None
+
+    def test_ranking(self):
+        # Unavailable profiles are never chosen, whatever their priority
+        self.assertEqual('output:iec958-ac3-surround', self.choose())
+        # Profiles of unknown channels only satisfy a single channel
+        self.assertEqual('output:iec958-ac3-surround', self.choose(1))
+        self.assertEqual('output:analog-stereo+input:analog-stereo', self.choose(2))
+        self.assertEqual('output:analog-surround-51', self.choose(6))
+        self.assertEqual(None, self.choose(8))
+        self.assertEqual('output:analog-stereo+input:analog-stereo', self.choose(0, 2))
+        self.assertEqual(None, self.choose(0, 3))
+
+    def test_active_profile_wins_ties(self):
+        self.card['profiles'][2]['priority'] = 6565
+        self.assertEqual('output:analog-stereo+input:analog-stereo', self.choose(2))
+        self.card['active_profile'] = 'output:analog-surround-51'
+        self.assertEqual('output:analog-surround-51', self.choose(2))
+
+    def test_unplugged_ports(self):
+        self.card['ports'][1]['available'] = PA_PORT_AVAILABLE_NO
+        self.assertFalse(profile_available(self.card, self.card['profiles'][1]))
+        self.assertTrue(profile_available(self.card, self.card['profiles'][0]))
+        self.assertEqual(None, self.choose(0, 1))
+        self.assertEqual('output:analog-stereo', self.choose(2))
+        self.card['ports'][0]['available'] = PA_PORT_AVAILABLE_NO
+        self.assertEqual(None, self.choose(2))
+        # Profiles served by no port are unaffected
+        self.assertEqual('output:iec958-ac3-surround', self.choose(1))
+
+
+class SelectCardProfileTest(unittest.TestCase):
+    records = False
+
+    def setUp(self):
+        self.backend = FakeBackend(n_cards=1, latency=0.001)
+        self.pulse = PulseAudio('test', cache=True, records=self.records,
+                                backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def active(self):
+        return self.backend.objects['card'][0].active_profile.contents.name
+
+    def test_select(self):
+        pulse = self.pulse
+        self.assertEqual('output:analog-stereo+input:analog-stereo', self.active())
+        self.assertEqual('output:analog-surround-51+input:analog-mono',
+                         pulse.select_card_profile('fake_card.0', output_channels=6))
+        self.assertEqual('output:analog-surround-51+input:analog-mono', self.active())
+        self.assertEqual(None, pulse.select_card_profile(0, output_channels=8))
+        self.assertEqual('output:analog-surround-51+input:analog-mono', self.active())
+        with self.assertRaises(Exception):
+            pulse.select_card_profile('no_such_card')
+
+    def test_active_profile_sends_nothing(self):
+        self.backend.respond = False
+        self.assertEqual('output:analog-stereo+input:analog-stereo',
+                         self.pulse.select_card_profile(0, output_channels=2,
+                                                        input_channels=2,
+                                                        timeout=0.1))
+
+
+class RecordSelectCardProfileTest(SelectCardProfileTest):
+    records = True
@@ -0,0 +1,124 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+class KeywordArgumentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def test_keyword_arguments(self):
+        index = self.pulse.load_module(module_name='module-null-sink',
+                                       module_args={'sink_name': 'x y'})[0]
+        module = self.pulse.get_module_info(index=index)[0]
+        self.assertEqual({'sink_name': 'x y'}, dict(module['argument']))
+        self.assertEqual([1], self.pulse.set_default_sink(name='fake_output.1'))
+        self.assertEqual('fake_output.1',
+                         self.pulse.get_server_info()[0]['default_sink_name'])
+
+    def test_mixed_arguments_and_timeout(self):
+        index = self.pulse.load_module('module-null-sink',
+                                       module_args='sink_name=mixed', timeout=1)[0]
+        module = self.pulse.get_module_info(index, timeout=1)[0]
+        self.assertEqual({'sink_name': 'mixed'}, dict(module['argument']))
+
+    def test_batch_keyword_arguments(self):
+        batch = self.pulse.batch()
+        batch.get_sink_info_by_name(name='fake_output.0')
+        batch.set_default_source(name='fake_input.1')
+        (sinks, ok) = batch.execute()
+        self.assertEqual('fake_output.0', sinks[0]['name'])
+        self.assertEqual([1], ok)
+
+    def test_unexpected_keyword_argument(self):
+        with self.assertRaises(TypeError):
+            self.pulse.set_default_sink(sink='fake_output.1')
+        with self.assertRaises(TypeError):
+            self.pulse.set_default_sink('fake_output.1', name='fake_output.0')
+        with self.assertRaises(TypeError):
+            self.pulse.get_sink_info_list(cb=None)
+        self.assertEqual({}, self.pulse._operations)
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=3, latency=0.02)
+        self.pulse = PulseAudio('test', cache=True, backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def test_results_in_queued_order(self):
+        batch = self.pulse.batch()
+        batch.set_sink_mute_by_index(0, True)
+        batch.get_sink_info_by_index(0)
+        batch.set_sink_mute_by_index(99, True)
+        batch.get_sink_info_by_index(99)
+        batch.get_sink_info_list()
+        self.assertEqual(5, len(batch))
+        results = batch.execute()
+        self.assertIs(results, batch.results)
+        self.assertEqual(0, len(batch))
+        self.assertEqual([True], results[0])
+        self.assertEqual(True, results[1][0]['mute'])
+        self.assertEqual([False], results[2])
+        self.assertEqual([], results[3])
+        self.assertEqual(['fake_output.0', 'fake_output.1', 'fake_output.2'],
+                         [sink['name'] for sink in results[4]])
+        self.assertEqual({}, self.pulse._operations)
+
+    def test_operations_are_pipelined(self):
+        batch = self.pulse.batch()
+        for i in range(10):
+            batch.get_sink_info_by_index(i % 3)
+        start = time.time()
+        results = batch.execute()
+        elapsed = time.time() - start
+        self.assertEqual([i % 3 for i in range(10)], [r[0]['index'] for r in results])
+        # One round trip, not ten
+        self.assertTrue(elapsed < 0.1, elapsed)
+
+    def test_getters_are_sent_to_server(self):
+        self.backend.respond = False
+        self.assertEqual(3, len(self.pulse.get_sink_info_list(timeout=0.1)))
+        with self.assertRaises(PulseAudioTimeout):
+            self.pulse.batch().get_sink_info_list().execute(timeout=0.1)
+        self.assertEqual({}, self.pulse._operations)
+
+    def test_context_manager(self):
+        with self.pulse.batch() as batch:
+            batch.set_default_sink('fake_output.2').get_server_info()
+        self.assertEqual('fake_output.2', batch.results[1][0]['default_sink_name'])
+        with self.assertRaises(ValueError):
+            with self.pulse.batch() as batch:
+                batch.set_default_sink('fake_output.0')
+                raise ValueError()
+        self.assertIsNone(batch.results)
+        self.assertEqual('fake_output.2', self.backend.server.default_sink_name)
+
+    def test_unknown_method(self):
+        batch = self.pulse.batch()
+        with self.assertRaises(AttributeError):
+            batch.no_such_method
+        with self.assertRaises(AttributeError):
+            batch.process_events
+
+    def test_disconnected(self):
+        batch = self.pulse.batch()
+        batch.get_sink_info_list()
+        self.pulse.disconnect()
+        self.assertIsNone(batch.execute())
+        self.assertEqual(0, len(batch))
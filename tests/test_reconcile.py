@@ -0,0 +1,89 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.reconcile import Action, Reconciler
+from pypulseaudio.snapshot import diff
+
+DESIRED = {
+    'modules': [
+        {'name': 'module-null-sink', 'args': {'sink_name': 'recorder'}},
+        {'name': 'module-fake', 'args': {'index': 0, 'rate': 48000, 'channels': 2}},
+    ],
+    'card_profiles': {'fake_card.0': 'off'},
+    'default_sink': 'fake_output.1',
+    'default_source': 'fake_input.0',
+    'sinks': {
+        'fake_output.0': {'volume': 32768, 'mute': True},
+        'fake_output.1': {'volume': [PA_VOLUME_NORM, PA_VOLUME_NORM], 'mute': False},
+    },
+}
+
+
+class ReconcilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=2, n_sources=1, n_cards=1, n_modules=2,
+                                   latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def plan(self, desired, prune=False):
+        return [(a.method, a.args)
+                for a in Reconciler(self.pulse, prune).plan(desired, self.pulse.snapshot())]
+
+    def test_plan(self):
+        self.assertEqual([
+            ('set_card_profile_by_name', ('fake_card.0', 'off')),
+            ('load_module', ('module-null-sink', {'sink_name': 'recorder'})),
+            ('set_default_sink', ('fake_output.1',)),
+            ('set_sink_volume_by_name', ('fake_output.0', [32768, 32768])),
+            ('set_sink_mute_by_name', ('fake_output.0', True)),
+        ], self.plan(DESIRED))
+        self.assertEqual([], self.plan({}))
+
+    def test_prune(self):
+        desired = {'modules': [{'name': 'module-fake',
+                                'args': {'index': 1, 'rate': 48000, 'channels': 2}}]}
+        self.assertEqual([], self.plan(desired))
+        self.assertEqual([('unload_module', (0,))], self.plan(desired, prune=True))
+
+    def test_dry_run(self):
+        before = self.pulse.snapshot()
+        actions = Reconciler(self.pulse).apply(DESIRED, dry_run=True)
+        self.assertEqual(5, len(actions))
+        self.assertEqual([None] * 5, [a.result for a in actions])
+        self.assertEqual({}, diff(before, self.pulse.snapshot()))
+
+    def test_apply(self):
+        reconciler = Reconciler(self.pulse)
+        actions = reconciler.apply(DESIRED)
+        self.assertEqual([True, 2, True, True, True], [a.result for a in actions])
+        self.assertEqual('off', self.backend.objects['card'][0].active_profile.contents.name)
+        sink = self.pulse.get_sink_info_by_name('fake_output.0')[0]
+        self.assertEqual([32768, 32768], sink['volume']['values'])
+        self.assertTrue(sink['mute'])
+        # The state reached needs no further operations
+        self.assertEqual([], reconciler.apply(DESIRED))
+
+    def test_failed_load(self):
+        self.backend.failing_modules.add('module-null-sink')
+        actions = Reconciler(self.pulse).apply(
+            {'modules': DESIRED['modules'], 'default_sink': 'fake_output.1'})
+        self.assertEqual([Action('load_module',
+                                 ('module-null-sink', {'sink_name': 'recorder'}),
+                                 INVALID_INDEX),
+                          Action('set_default_sink', ('fake_output.1',), True)],
+                         actions)
+
+    def test_volume_of_missing_device(self):
+        self.assertEqual([('set_sink_volume_by_name', ('recorder', [1, 2]))],
+                         self.plan({'sinks': {'recorder': {'volume': [1, 2]}}}))
+        with self.assertRaises(Exception):
+            self.plan({'sinks': {'recorder': {'volume': 1}}})
@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio.records import format_module_argument, parse_module_argument
+
+
+class ModuleArgumentTest(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(None, parse_module_argument(None))
+        self.assertEqual({}, parse_module_argument(''))
+        self.assertEqual({'sink_name': 'x', 'rate': '48000'},
+                         parse_module_argument('  sink_name=x   rate=48000 '))
+        self.assertEqual({'record': None, 'channels': '2'},
+                         parse_module_argument('record channels=2'))
+
+    def test_parse_quotes(self):
+        self.assertEqual(
+            {'sink_name': 'x',
+             'sink_properties': "device.description='My Sink'"},
+            parse_module_argument(
+                'sink_name=x sink_properties="device.description=\'My Sink\'"'))
+        self.assertEqual({'a': 'b c', 'd': ''},
+                         parse_module_argument("a='b c' d=\"\""))
+
+    def test_parse_escapes(self):
+        self.assertEqual({'a': 'b c', 'd': 'say "hi"', 'e': 'back\\slash'},
+                         parse_module_argument(
+                             'a=b\\ c d="say \\"hi\\"" e=back\\\\slash'))
+
+    def test_parse_equals_in_value(self):
+        self.assertEqual({'sink_properties': 'device.description=x'},
+                         parse_module_argument('sink_properties=device.description=x'))
+
+    def test_format(self):
+        self.assertEqual('sink_name=x', format_module_argument({'sink_name': 'x'}))
+        self.assertEqual('rate=48000', format_module_argument({'rate': 48000}))
+        self.assertEqual('record', format_module_argument({'record': None}))
+        self.assertEqual('a=""', format_module_argument({'a': ''}))
+        self.assertEqual('a="b c"', format_module_argument({'a': 'b c'}))
+
+    def test_round_trip(self):
+        for args in ({'sink_name': 'x', 'channels': '2'},
+                     {'sink_properties': "device.description='My Sink'"},
+                     {'a': 'say "hi"', 'b': 'back\\slash', 'c': ''},
+                     {'a': 'x=y', 'b': 'tab\tand\nnewline', 'c': None},
+                     {'a': '\'"\\ \'"\\'}):
+            self.assertEqual(args, parse_module_argument(format_module_argument(args)))
@@ -0,0 +1,74 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.samples import SampleCache
+
+
+class SampleCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend, timeout=1.0)
+        self.pulse.connect()
+        self.uploads = []
+        upload_sample = self.pulse.upload_sample
+        def counted(name, *args):
+            self.uploads.append(name)
+            return upload_sample(name, *args)
+        self.pulse.upload_sample = counted
+        self.sounds = SampleCache(self.pulse, budget=3000)
+        for name in ('a', 'b', 'c'):
+            self.sounds.register(name, b'\0' * 1200, rate=48000, channels=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def played(self):
+        return [name for (name, sink, volume) in self.backend.played_samples]
+
+    def test_uploaded_once(self):
+        self.assertTrue(self.sounds.play('a'))
+        self.assertTrue(self.sounds.play('a', device='fake_output.1'))
+        self.assertEqual(['a'], self.uploads)
+        self.assertEqual(['a', 'a'], self.played())
+
+    def test_least_recently_played_evicted(self):
+        self.sounds.play('a')
+        self.sounds.play('b')
+        self.sounds.play('a')
+        self.sounds.play('c')
+        self.assertEqual(['a', 'c'], self.sounds.resident)
+        self.assertEqual(2400, self.sounds.size)
+        names = [s['name'] for s in self.pulse.get_sample_info_list()]
+        self.assertEqual(['a', 'c'], sorted(names))
+
+    def test_clip_lost_by_server_is_uploaded_again(self):
+        self.sounds.play('a')
+        sample = self.pulse.get_sample_info_by_name('a')[0]
+        self.backend.remove('sample_cache', sample['index'])
+        self.assertTrue(self.sounds.play('a'))
+        self.assertEqual(['a', 'a'], self.uploads)
+        self.assertEqual(['a', 'a'], self.played())
+
+    def test_missing_sink_is_not_uploaded_again(self):
+        self.sounds.play('a')
+        self.assertFalse(self.sounds.play('a', device='no_such_sink'))
+        self.assertEqual(['a'], self.uploads)
+        self.assertEqual(['a'], self.sounds.resident)
+
+    def test_timeout_propagates(self):
+        self.sounds.play('a')
+        self.backend.respond = False
+        with self.assertRaises(PulseAudioTimeout):
+            self.sounds.play('a', timeout=0.1)
+        self.assertEqual(['a'], self.uploads)
+
+    def test_disconnected(self):
+        self.sounds.play('a')
+        self.pulse.disconnect()
+        self.assertFalse(self.sounds.play('a'))
+        self.assertEqual(['a'], self.uploads)
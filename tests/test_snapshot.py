@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.snapshot import Snapshot, SnapshotFile, diff, facilities
+
+
+def sink(index, **fields):
+    ret = {'index': index, 'name': 'sink.%d' % index, 'mute': False,
+           'volume': {'channels': 2, 'values': [65536, 65536]}}
+    ret.update(fields)
+    return ret
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=3, n_sources=2, n_cards=1, n_modules=2,
+                                   latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.pulse.connect(timeout=1)
+        self.addCleanup(self.pulse.disconnect)
+
+    def assertSameObjects(self, a, b):
+        for facility in facilities:
+            self.assertEqual(a[facility], b[facility], facility)
+
+    def test_round_trip(self):
+        snapshot = self.pulse.snapshot()
+        self.assertEqual(3, len(snapshot['sink']))
+        self.assertEqual('fake_card.0', snapshot['card'][0]['name'])
+        encoded = SnapshotFile(snapshot.dumps())
+        self.assertSameObjects(snapshot, encoded)
+        self.assertEqual(snapshot.timestamp, encoded.timestamp)
+        self.assertEqual(3, encoded.count('sink'))
+        self.assertEqual(snapshot.get('sink', 2), encoded.get('sink', 2))
+        self.assertIsNone(encoded.get('sink', 99))
+        self.assertIsNone(snapshot.get('sink', 99))
+
+    def test_records(self):
+        pulse = PulseAudio('test', records=True, backend=self.backend)
+        pulse.connect(timeout=1)
+        self.addCleanup(pulse.disconnect)
+        self.assertSameObjects(self.pulse.snapshot(), pulse.snapshot())
+
+    def test_values(self):
+        values = {'index': 7, 'none': None, 'true': True, 'false': False,
+                  'zero': 0, 'negative': -1, 'large': 2 ** 40, 'small': -2 ** 40,
+                  'float': 0.25, 'text': 'Sortie analogique – ♪', 'empty': '',
+                  'list': [1, 'a', [None]], 'dict': {'b': {'c': [2.5]}, 'a': 1}}
+        encoded = SnapshotFile(Snapshot({'sink': [values]}).dumps())
+        self.assertEqual([values], encoded['sink'])
+        self.assertEqual(0, encoded.count('card'))
+        self.assertEqual([], encoded['card'])
+
+    def test_canonical(self):
+        a = Snapshot({'sink': [sink(1), sink(0)]}, timestamp=1.0)
+        b = Snapshot({'sink': [sink(0), dict(reversed(list(sink(1).items())))]},
+                     timestamp=1.0)
+        self.assertEqual(a.dumps(), b.dumps())
+        self.assertEqual([0, 1], [i['index'] for i in a['sink']])
+
+    def test_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'topology.pas')
+        snapshot = self.pulse.snapshot()
+        snapshot.save(path)
+        with SnapshotFile.open(path) as encoded:
+            self.assertSameObjects(snapshot, encoded)
+            self.assertEqual({}, diff(snapshot, encoded))
+        self.assertEqual([], encoded['sink'])
+
+    def test_invalid(self):
+        data = Snapshot({}).dumps()
+        with self.assertRaises(Exception):
+            SnapshotFile(b'XXXX' + data[4:])
+        with self.assertRaises(Exception):
+            SnapshotFile(data[:4] + struct.pack('<H', 99) + data[6:])
+
+
+class DiffTest(unittest.TestCase):
+
+    def test_diff(self):
+        old = Snapshot({'sink': [sink(0), sink(1), sink(3)],
+                        'server': [{'default_sink_name': 'sink.0'}]})
+        new = Snapshot({'sink': [sink(1, mute=True), sink(2), sink(3)],
+                        'server': [{'default_sink_name': 'sink.0'}]})
+        self.assertEqual({'sink': {'added': [sink(2)],
+                                   'removed': [sink(0)],
+                                   'changed': [(1, {'mute': (False, True)})]}},
+                         diff(old, new))
+        self.assertEqual(diff(old, new), diff(SnapshotFile(old.dumps()), new))
+        self.assertEqual({}, diff(new, SnapshotFile(new.dumps())))
+
+    def test_nested_and_new_fields(self):
+        old = Snapshot({'sink': [sink(0)]})
+        changed = sink(0, volume={'channels': 2, 'values': [1, 2]})
+        changed['latency'] = 10
+        self.assertEqual({'sink': {'added': [], 'removed': [],
+                                   'changed': [(0, {'volume': (sink(0)['volume'],
+                                                               changed['volume']),
+                                                    'latency': (None, 10)})]}},
+                         diff(old, Snapshot({'sink': [changed]})))
+
+    def test_empty(self):
+        self.assertEqual({'card': {'added': [{'index': 0, 'name': 'c'}],
+                                   'removed': [], 'changed': []}},
+                         diff(Snapshot({}), Snapshot({'card': [{'index': 0, 'name': 'c'}]})))
@@ -0,0 +1,98 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.stream import PlaybackStream, RecordStream
+
+
+def ramp(start, n):
+    return bytearray((start + i) % 256 for i in range(n))
+
+
+class PlaybackStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pulse = PulseAudio('test', backend=FakeBackend(), timeout=2.0)
+        self.pulse.connect()
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def test_write_and_drain(self):
+        stream = PlaybackStream(self.pulse, 'play', rate=8000, channels=1,
+                                format='u8', tlength=800, minreq=80)
+        stream.connect()
+        data = ramp(0, 1600)
+        stream.write(data)
+        stream.drain()
+        self.assertEqual(data, stream._stream.played)
+        stream.disconnect()
+
+
+class RecordStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pulse = PulseAudio('test', backend=FakeBackend(), timeout=2.0)
+        self.pulse.connect()
+        # 32000 bytes per second in 400 byte fragments
+        self.stream = RecordStream(self.pulse, 'record', rate=8000, channels=2,
+                                   format='s16le', fragsize=400)
+        self.stream.connect()
+
+    def tearDown(self):
+        self.stream.disconnect()
+        self.pulse.disconnect()
+
+    def fill(self, seconds=0.05):
+        """
+        Let data accumulate, then pause the source such that the amount
+        available no longer changes.
+        """
+        time.sleep(seconds)
+        self.stream.cork()
+
+    def test_read(self):
+        data = self.stream.read(1000)
+        data += self.stream.read(600)
+        self.assertEqual(ramp(0, 1600), data)
+
+    def test_readable_size_excludes_data_read(self):
+        self.fill()
+        available = self.stream.readable_size
+        self.assertGreaterEqual(available, 800)
+        self.assertEqual(ramp(0, 100), self.stream.read(100))
+        # 100 bytes of a 400 byte fragment have been read
+        self.assertEqual(available - 100, self.stream.readable_size)
+        self.assertEqual(ramp(100, 400), self.stream.read(400))
+        self.assertEqual(available - 500, self.stream.readable_size)
+
+    def test_read_available_does_not_block(self):
+        self.fill()
+        available = self.stream.readable_size
+        self.stream.read(100)
+        start = time.time()
+        data = self.stream.read_available()
+        self.assertLess(time.time() - start, 0.05)
+        self.assertEqual(ramp(100, available - 100), data)
+        self.assertEqual(0, self.stream.readable_size)
+        self.assertEqual(bytearray(), self.stream.read_available())
+
+    def test_read_times_out(self):
+        self.fill()
+        self.stream.read_available()
+        with self.assertRaises(PulseAudioTimeout):
+            self.stream.read(4, timeout=0.1)
+
+
+class ThreadedRecordStreamTest(RecordStreamTest):
+
+    def setUp(self):
+        self.pulse = PulseAudio('test', backend=FakeBackend(), timeout=2.0,
+                                threaded=True)
+        self.pulse.connect()
+        self.stream = RecordStream(self.pulse, 'record', rate=8000, channels=2,
+                                   format='s16le', fragsize=400)
+        self.stream.connect()
@@ -0,0 +1,103 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.subscription import Event, Subscription
+
+
+class SubscriptionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.subscription = Subscription(PA_SUBSCRIPTION_MASK_SINK, None, 1.0)
+
+    def add(self, type, index, now):
+        self.subscription.add(Event('sink', type, index), now)
+
+    def test_window(self):
+        self.assertIsNone(self.subscription.next_due())
+        self.add('change', 0, 10.0)
+        self.add('change', 1, 10.5)
+        self.assertEqual(11.0, self.subscription.next_due())
+        self.assertEqual([], self.subscription.pop_due(10.9))
+        self.assertEqual([Event('sink', 'change', 0)], self.subscription.pop_due(11.0))
+        self.assertEqual(11.5, self.subscription.next_due())
+        self.assertEqual([Event('sink', 'change', 1)], self.subscription.pop_due(12.0))
+        self.assertIsNone(self.subscription.next_due())
+
+    def test_coalescing(self):
+        # A later event does not extend the window of the first
+        self.add('change', 0, 10.0)
+        self.add('change', 0, 10.9)
+        self.add('new', 1, 10.0)
+        self.add('change', 1, 10.1)
+        self.add('new', 2, 10.0)
+        self.add('change', 2, 10.1)
+        self.add('remove', 2, 10.2)
+        self.add('change', 3, 10.0)
+        self.add('remove', 3, 10.1)
+        self.assertEqual([Event('sink', 'change', 0),
+                          Event('sink', 'new', 1),
+                          Event('sink', 'remove', 3)],
+                         self.subscription.pop_due(11.0))
+
+    def test_no_window(self):
+        subscription = Subscription(PA_SUBSCRIPTION_MASK_SINK, None, 0)
+        subscription.add(Event('sink', 'new', 0), 10.0)
+        self.assertEqual([Event('sink', 'new', 0)], subscription.pop_due(10.0))
+
+
+class SubscribeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=2, latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.pulse.connect(timeout=1)
+        self.events = []
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def test_coalesced_delivery(self):
+        pulse = self.pulse
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.events.append, 0.1)
+        start = time.time()
+        index = self.backend.add('sink')
+        self.backend.change('sink', index, mute=1)
+        self.backend.change('sink', 0, mute=1)
+        self.backend.change('sink', 0, mute=0)
+        self.assertEqual(0, pulse.process_events(0.05))
+        self.assertEqual(2, pulse.process_events(1))
+        self.assertTrue(time.time() - start >= 0.1)
+        self.assertEqual([Event('sink', 'new', index), Event('sink', 'change', 0)],
+                         self.events)
+
+    def test_mask(self):
+        pulse = self.pulse
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SOURCE, self.events.append)
+        self.backend.change('sink', 0, mute=1)
+        self.backend.change('source', 0, mute=1)
+        self.assertEqual(1, pulse.process_events(1))
+        self.assertEqual(0, pulse.process_events(0.05))
+        self.assertEqual([Event('source', 'change', 0)], self.events)
+
+    def test_handlers(self):
+        pulse = self.pulse
+        names = []
+        def handler(event):
+            # Handlers may call the connection
+            names.append(pulse.get_sink_info_by_index(event.index)[0]['name'])
+        pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, handler)
+        subscription = pulse.subscribe(PA_SUBSCRIPTION_MASK_SINK, self.events.append)
+        self.backend.change('sink', 1, mute=1)
+        self.assertEqual(2, pulse.process_events(1))
+        self.assertEqual(['fake_output.1'], names)
+        self.assertEqual([Event('sink', 'change', 1)], self.events)
+        pulse.unsubscribe(subscription)
+        self.backend.change('sink', 0, mute=1)
+        self.assertEqual(1, pulse.process_events(1))
+        self.assertEqual(['fake_output.1', 'fake_output.0'], names)
+        self.assertEqual(1, len(self.events))
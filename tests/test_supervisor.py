@@ -0,0 +1,104 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+import unittest
+
+from pypulseaudio import PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.supervisor import Supervisor
+
+
+class HangingBackend(FakeBackend):
+    """
+    Server which never replies to server info requests.
+    """
+    def pa_context_get_server_info(self, context, cb, userdata):
+        return self._request(context, lambda: None, delay=3600)
+
+
+class SupervisorTest(unittest.TestCase):
+    threaded = False
+
+    def setUp(self):
+        self.backend = FakeBackend(latency=0.002)
+        self.supervisor = Supervisor('test', replay=True, backend=self.backend,
+                                     threaded=self.threaded, timeout=2.0,
+                                     backoff=0.05)
+        self.supervisor.connect()
+
+    def tearDown(self):
+        self.supervisor.disconnect()
+
+    def restart(self, downtime):
+        self.backend.restart(downtime)
+        with self.supervisor.pulse._locked():
+            self.supervisor.pulse._wait_state(PA_CONTEXT_FAILED,
+                                              self.supervisor.pulse._deadline(1.0))
+
+    def test_call_held_until_server_is_back(self):
+        self.restart(0.3)
+        start = time.time()
+        self.assertEqual(1, len(self.supervisor.get_server_info()))
+        self.assertGreater(time.time() - start, 0.2)
+        self.assertEqual(1, self.supervisor.reconnects)
+
+    def test_replay(self):
+        supervisor = self.supervisor
+        index = supervisor.load_module('module-null-sink', {'sink_name': 'recorder'})[0]
+        supervisor.load_module('module-loopback', 'latency_msec=20')
+        supervisor.unload_module(index)
+        supervisor.set_default_sink('fake_output.1')
+        self.restart(0)
+        self.assertEqual('fake_output.1',
+                         supervisor.get_server_info()[0]['default_sink_name'])
+        modules = [(module['name'], dict(module['argument'] or {}))
+                   for module in supervisor.get_module_info_list()]
+        self.assertIn(('module-loopback', {'latency_msec': '20'}), modules)
+        self.assertNotIn('module-null-sink', [name for (name, args) in modules])
+
+    def test_failed_load_is_not_replayed(self):
+        supervisor = self.supervisor
+        self.backend.failing_modules.add('module-bogus')
+        self.assertEqual([INVALID_INDEX], supervisor.load_module('module-bogus', 'a=1'))
+        supervisor.load_module('module-loopback', 'latency_msec=20')
+        self.assertEqual([{'name': 'module-loopback', 'args': {'latency_msec': '20'}}],
+                         supervisor.desired['modules'])
+        self.backend.failing_modules.clear()
+        self.restart(0)
+        names = [module['name'] for module in supervisor.get_module_info_list()]
+        self.assertIn('module-loopback', names)
+        self.assertNotIn('module-bogus', names)
+
+    def test_timeout_while_server_is_down(self):
+        self.restart(60)
+        start = time.time()
+        with self.assertRaises(PulseAudioTimeout):
+            self.supervisor.get_sink_info_list(timeout=0.3)
+        self.assertLess(time.time() - start, 0.45)
+
+    def test_timeout_spans_retries(self):
+        supervisor = Supervisor('test', backend=HangingBackend(latency=0.002),
+                                threaded=self.threaded, timeout=2.0, backoff=0.05)
+        supervisor.connect()
+        try:
+            # The connection is lost while the first attempt is in flight,
+            # the retry being allowed only the time remaining
+            threading.Timer(0.3, supervisor.pulse._lib.restart).start()
+            start = time.time()
+            with self.assertRaises(PulseAudioTimeout):
+                supervisor.get_server_info(timeout=0.5)
+            self.assertLess(time.time() - start, 0.65)
+            self.assertEqual(1, supervisor.reconnects)
+        finally:
+            supervisor.disconnect()
+
+    def test_disconnected(self):
+        self.supervisor.disconnect()
+        with self.assertRaises(Exception):
+            self.supervisor.get_server_info()
+
+
+class ThreadedSupervisorTest(SupervisorTest):
+    threaded = True
@@ -0,0 +1,122 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.telemetry import LatencyAlert, LatencyRing, LatencySampler
+
+
+class LatencyRingTest(unittest.TestCase):
+
+    def test_empty(self):
+        ring = LatencyRing(4)
+        self.assertEqual(0, len(ring))
+        self.assertIsNone(ring.last())
+        self.assertIsNone(ring.percentile(50))
+        self.assertIsNone(ring.jitter())
+        self.assertEqual([], list(ring.latencies()))
+
+    def test_wraparound(self):
+        ring = LatencyRing(4)
+        for i in range(3):
+            ring.append(i, 10 * i, 100)
+        self.assertEqual(3, len(ring))
+        self.assertEqual([0, 10, 20], list(ring.latencies()))
+        for i in range(3, 10):
+            ring.append(i, 10 * i, 100 + i)
+        self.assertEqual(4, len(ring))
+        self.assertEqual([6, 7, 8, 9], list(ring.times()))
+        self.assertEqual([60, 70, 80, 90], list(ring.latencies()))
+        self.assertEqual([106, 107, 108, 109], list(ring.configured_latencies()))
+        self.assertEqual((9, 90, 109), ring.last())
+        ring.append(10, 100, 110)
+        self.assertEqual([70, 80, 90, 100], list(ring.latencies()))
+
+    def test_percentiles(self):
+        ring = LatencyRing(8)
+        for (i, latency) in enumerate([50, 10, 40, 20, 30]):
+            ring.append(i, latency, 0)
+        self.assertEqual(10, ring.percentile(0))
+        self.assertEqual(30, ring.percentile(50))
+        self.assertAlmostEqual(48, ring.percentile(95))
+        self.assertEqual(50, ring.percentile(100))
+        self.assertEqual(25, ring.jitter())
+        # Only the samples held count once the ring has wrapped
+        for i in range(8):
+            ring.append(5 + i, 1000, 0)
+        self.assertEqual(1000, ring.percentile(0))
+        self.assertEqual(0, ring.jitter())
+
+
+class LatencySamplerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=2, n_sources=1, latency=0.001)
+        self.pulse = PulseAudio('test', backend=self.backend)
+        self.pulse.connect(timeout=1)
+        self.alerts = []
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def set_latency(self, latency, configured_latency=10000):
+        self.backend.change('sink', 0, latency=latency,
+                            configured_latency=configured_latency)
+
+    def test_hysteresis(self):
+        sampler = LatencySampler(self.pulse, max_ratio=2.0, hold=2,
+                                 callback=self.alerts.append)
+        sampler.add('sink', 'fake_output.0')
+        states = []
+        for latency in (15000, 25000, 15000, 25000, 25000, 30000,
+                        15000, 25000, 15000, 15000, 15000):
+            self.set_latency(latency)
+            states.append([alert.raised for alert in sampler.sample()])
+        self.assertEqual([[], [], [], [], [True], [], [], [], [], [False], []], states)
+        self.assertEqual([LatencyAlert('sink', 'fake_output.0', True, 25000, 10000),
+                          LatencyAlert('sink', 'fake_output.0', False, 15000, 10000)],
+                         self.alerts)
+
+    def test_thresholds(self):
+        sampler = LatencySampler(self.pulse, max_latency=50000, max_ratio=2.0)
+        sampler.add('sink', 0)
+        # The ratio is not applied without a configured latency
+        self.set_latency(40000, 0)
+        self.assertEqual([], sampler.sample())
+        self.set_latency(60000, 0)
+        self.assertEqual([True], [alert.raised for alert in sampler.sample()])
+        self.set_latency(30000, 20000)
+        self.assertEqual([False], [alert.raised for alert in sampler.sample()])
+
+    def test_stats(self):
+        sampler = LatencySampler(self.pulse, size=4)
+        sampler.add('sink', 'fake_output.0')
+        sampler.add('source', 0)
+        sampler.add('sink', 'no_such_sink')
+        with self.assertRaises(Exception):
+            sampler.add('card', 0)
+        for latency in (1000, 2000, 3000, 4000, 5000):
+            self.set_latency(latency, 4000)
+            self.assertEqual([], sampler.sample())
+        stats = sampler.stats('sink', 'fake_output.0')
+        self.assertEqual((4, 3500, 2000, 5000, 3500, 1000, 4000),
+                         (stats.count, stats.mean, stats.min, stats.max, stats.p50,
+                          stats.jitter, stats.configured_latency))
+        self.assertEqual(4, sampler.stats('source', 0).count)
+        self.assertIsNone(sampler.stats('sink', 'no_such_sink'))
+        sampler.remove('sink', 'no_such_sink')
+        self.assertEqual([('sink', 'fake_output.0'), ('source', 0)], sampler.devices)
+
+    def test_run(self):
+        sampler = LatencySampler(self.pulse, rate=20)
+        sampler.add('sink', 0)
+        start = time.time()
+        self.assertEqual([], sampler.run(1))
+        self.assertIsNone(sampler.run(0))
+        for i in range(3):
+            self.assertEqual([], sampler.run(1))
+        elapsed = time.time() - start
+        self.assertTrue(0.14 < elapsed < 0.5, elapsed)
+        self.assertEqual(4, len(sampler.ring('sink', 0)))
@@ -0,0 +1,93 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+class ThreadedTest(unittest.TestCase):
+    cache = False
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=4, n_sources=2, latency=0.002)
+        self.pulse = PulseAudio('test', threaded=True, cache=self.cache,
+                                timeout=5, backend=self.backend)
+        self.pulse.connect(timeout=1)
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def run_threads(self, target, n):
+        errors = []
+        def run(i):
+            try:
+                target(i)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual([], errors)
+
+    def test_many_threads(self):
+        pulse = self.pulse
+        def target(i):
+            index = i % 4
+            for j in range(20):
+                mute = (i + j) % 2 == 0
+                self.assertEqual([True], pulse.set_sink_mute_by_index(index, mute))
+                sink = pulse.get_sink_info_by_index(index)[0]
+                self.assertEqual(index, sink['index'])
+                self.assertEqual(4, len(pulse.get_sink_info_list()))
+                self.assertEqual('fake_input.%d' % (i % 2),
+                                 pulse.get_source_info_by_name('fake_input.%d' % (i % 2))[0]['name'])
+                batch = pulse.batch()
+                batch.get_sink_info_by_index(index).get_server_info()
+                (sinks, server) = batch.execute()
+                self.assertEqual(index, sinks[0]['index'])
+                self.assertEqual(1, len(server))
+        self.run_threads(target, 16)
+        self.assertEqual({}, pulse._operations)
+        self.assertEqual(4, len(pulse.get_sink_info_list()))
+
+    def test_calls_overlap(self):
+        self.backend.latency = 0.05
+        start = time.time()
+        self.run_threads(lambda i: self.pulse.get_sink_info_list(), 8)
+        elapsed = time.time() - start
+        # The lock is released whilst each thread waits for its reply
+        self.assertTrue(elapsed < 0.3, elapsed)
+        self.assertEqual({}, self.pulse._operations)
+
+
+class CachedThreadedTest(ThreadedTest):
+    cache = True
+
+    def test_server_changes_during_reads(self):
+        pulse = self.pulse
+        done = threading.Event()
+        def target(i):
+            if (i == 0):
+                try:
+                    for j in range(20):
+                        index = self.backend.add('sink')
+                        time.sleep(0.002)
+                        self.backend.remove('sink', index)
+                finally:
+                    done.set()
+                return
+            while (not done.is_set()):
+                sinks = pulse.get_sink_info_list()
+                self.assertTrue(4 <= len(sinks) <= 5, len(sinks))
+        self.run_threads(target, 8)
+        deadline = time.time() + 2
+        while (len(pulse.get_sink_info_list()) != 4 and time.time() < deadline):
+            time.sleep(0.01)
+        self.assertEqual(4, len(pulse.get_sink_info_list()))
@@ -0,0 +1,78 @@
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from pypulseaudio import PulseAudio, PulseAudioTimeout
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+
+
+class TimeoutTest(unittest.TestCase):
+    threaded = False
+
+    def setUp(self):
+        self.backend = FakeBackend(n_sinks=3, latency=0.01)
+        self.pulse = PulseAudio('test', threaded=self.threaded, timeout=0.1,
+                                backend=self.backend)
+        self.pulse.connect(timeout=1)
+        # The server stops replying once connected
+        self.backend.respond = False
+
+    def tearDown(self):
+        self.pulse.disconnect()
+
+    def assertTimesOut(self, f, *args, **kwargs):
+        start = time.time()
+        with self.assertRaises(PulseAudioTimeout):
+            f(*args, **kwargs)
+        elapsed = time.time() - start
+        self.assertEqual({}, self.pulse._operations)
+        return elapsed
+
+    def assertResponsive(self):
+        self.backend.respond = True
+        self.assertEqual(3, len(self.pulse.get_sink_info_list()))
+        self.assertEqual({}, self.pulse._operations)
+
+    def test_instance_timeout(self):
+        elapsed = self.assertTimesOut(self.pulse.get_sink_info_list)
+        self.assertTrue(0.09 < elapsed < 0.5, elapsed)
+        self.assertResponsive()
+
+    def test_call_timeout(self):
+        elapsed = self.assertTimesOut(self.pulse.get_sink_info_list, timeout=0.3)
+        self.assertTrue(0.29 < elapsed < 0.7, elapsed)
+        self.assertResponsive()
+
+    def test_late_reply_is_dropped(self):
+        self.backend.respond = True
+        self.backend.latency = 0.2
+        self.assertTimesOut(self.pulse.get_sink_info_by_index, 0)
+        result = self.pulse.get_sink_info_by_index(1, timeout=1)
+        self.assertEqual(1, len(result))
+        self.assertEqual(1, result[0]['index'])
+
+    def test_batch_timeout(self):
+        batch = self.pulse.batch()
+        batch.get_sink_info_list()
+        batch.get_server_info()
+        self.assertTimesOut(batch.execute)
+        self.assertEqual(0, len(batch))
+        self.assertResponsive()
+
+    def test_iter_timeout(self):
+        self.assertTimesOut(list, self.pulse.iter_sink_info())
+        self.assertResponsive()
+
+    def test_connect_timeout(self):
+        pulse = PulseAudio('test', threaded=self.threaded, backend=self.backend)
+        start = time.time()
+        with self.assertRaises(PulseAudioTimeout):
+            pulse.connect(timeout=0.1)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertNotEqual(PA_CONTEXT_READY, pulse.state)
+
+
+class ThreadedTimeoutTest(TimeoutTest):
+    threaded = True
@@ -0,0 +1,91 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pypulseaudio import PulseAudio
+from pypulseaudio.constants import *
+from pypulseaudio.fake import FakeBackend
+from pypulseaudio.volume import (volume_from_db, volume_from_linear,
+                                 volume_to_db, volume_to_linear)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ConversionTest(unittest.TestCase):
+
+    def test_unity_and_silence(self):
+        self.assertEqual([PA_VOLUME_NORM, PA_VOLUME_MUTED],
+                         volume_from_db([0.0, float('-inf')]))
+        self.assertEqual([PA_VOLUME_NORM, PA_VOLUME_MUTED],
+                         volume_from_linear([1.0, 0.0]))
+        self.assertEqual([0.0, float('-inf')],
+                         volume_to_db([PA_VOLUME_NORM, PA_VOLUME_MUTED]))
+        self.assertEqual([1.0, 0.0],
+                         volume_to_linear([PA_VOLUME_NORM, PA_VOLUME_MUTED]))
+
+    def test_cubic_mapping(self):
+        self.assertEqual([PA_VOLUME_NORM // 2], volume_from_linear([0.125]))
+        (db,) = volume_to_db([PA_VOLUME_NORM // 2])
+        self.assertAlmostEqual(-18.06, db, places=2)
+
+    def test_round_trip(self):
+        for db in (-40.0, -6.0, 0.0, 6.0):
+            self.assertAlmostEqual(db, volume_to_db(volume_from_db([db]))[0], places=2)
+        for gain in (0.01, 0.5, 1.0, 2.0):
+            self.assertAlmostEqual(gain, volume_to_linear(volume_from_linear([gain]))[0],
+                                   places=4)
+
+    def test_clamped(self):
+        self.assertEqual([PA_VOLUME_MUTED], volume_from_linear([-1.0]))
+        self.assertEqual([PA_VOLUME_MAX], volume_from_db([10000.0]))
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        # A numpy which records being imported
+        with open(os.path.join(self.path, 'numpy.py'), 'w') as f:
+            f.write('import sys\nsys.stderr.write("numpy imported")\n'
+                    'raise ImportError("numpy")\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def run_python(self, code):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([self.path, ROOT]))
+        process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (out, err) = process.communicate()
+        self.assertEqual(0, process.returncode, err)
+        return err
+
+    def test_import_does_not_load_numpy(self):
+        self.assertNotIn(b'numpy imported', self.run_python('import pypulseaudio'))
+
+    def test_numpy_loaded_on_first_conversion(self):
+        err = self.run_python('from pypulseaudio.volume import volume_from_db\n'
+                              'assert volume_from_db([0.0]) == [65536]')
+        self.assertIn(b'numpy imported', err)
+
+
+class SetVolumesTest(unittest.TestCase):
+
+    def test_set_volumes(self):
+        pulse = PulseAudio('test', backend=FakeBackend(latency=0.001))
+        pulse.connect(timeout=1)
+        try:
+            self.assertEqual([True, True],
+                             pulse.set_volumes([('sink', 0), ('source', 1)],
+                                               [[0.0, -6.0], [0.0, 0.0]]))
+            values = pulse.get_sink_info_by_index(0)[0]['volume']['values']
+            self.assertEqual(volume_from_db([0.0, -6.0]), values)
+            with self.assertRaises(Exception):
+                pulse.set_volumes([('sink', 0)], [])
+        finally:
+            pulse.disconnect()